@@ -1,16 +1,63 @@
+import functools
+import os
+
 from flask import Flask, render_template, request, jsonify
 from models import (
     UsuarioService,
-    Livro, adicionar_livro, listar_livros, remover_livro, buscar_livro_por_id,
+    Livro, adicionar_livro, adicionar_livros, listar_livros, paginar_livros, remover_livro, buscar_livro_por_id,
+    versao_livros,
     LoanController, LoanError, ValidationError, NotFoundError,
-    RelatorioService
+    RelatorioService, usar_sqlite
 )
 
 app = Flask(__name__)
 
-service = UsuarioService()
-loan_controller = LoanController(service)
-relatorio_service = RelatorioService(loan_controller, service)
+if os.getenv('BIBLIOTECA_DB'):
+    # Dados gravados em SQLite, compartilháveis entre processos
+    service, loan_controller, relatorio_service = usar_sqlite(os.getenv('BIBLIOTECA_DB'))
+else:
+    service = UsuarioService()
+    loan_controller = LoanController(service)
+    relatorio_service = RelatorioService(loan_controller, service)
+
+# Máximo de itens por requisição nas rotas /lote
+LIMITE_LOTE = 100_000
+
+# Máximo de itens por página nas listagens com limit
+LIMITE_PAGINA = 1000
+
+# Versão de cada repositório (lidas na hora: os testes trocam os globais)
+VERSOES = {
+    'usuarios': lambda: service.versao(),
+    'livros': versao_livros,
+    'emprestimos': lambda: loan_controller.versao(),
+}
+
+
+def condicional(*lojas):
+    """
+    GET condicional: o ETag é a combinação das versões dos repositórios de
+    que a resposta depende. Se o cliente já tem essa versão (If-None-Match),
+    responde 304 sem executar a rota.
+    """
+    def decorador(rota):
+        @functools.wraps(rota)
+        def envolvida(*args, **kwargs):
+            # Lidas antes de montar a resposta: uma alteração no meio do
+            # caminho gera um ETag velho, e o cliente só busca de novo
+            etag = '.'.join(VERSOES[loja]() for loja in lojas)
+            # If-None-Match usa comparação fraca (RFC 9110): W/"…" também vale
+            if request.if_none_match.contains_weak(etag):
+                resposta = app.response_class(status=304)
+            else:
+                resposta = app.make_response(rota(*args, **kwargs))
+                if resposta.status_code != 200:
+                    return resposta
+            resposta.set_etag(etag)
+            resposta.headers['Cache-Control'] = 'no-cache'
+            return resposta
+        return envolvida
+    return decorador
 
 
 @app.route('/')
@@ -31,9 +78,28 @@ def index():
 
 
 @app.route('/api/usuarios', methods=['GET'])
+@condicional('usuarios')
 def listar_usuarios():
-    usuarios = service.listar()
-    return jsonify([u.to_dict() for u in usuarios])
+    # Consulta por matrícula ou email vai direto ao índice do serviço
+    matricula = request.args.get('matricula')
+    email = request.args.get('email')
+    if matricula is not None or email is not None:
+        if matricula is not None:
+            usuario = service.buscar_por_matricula(matricula)
+        else:
+            usuario = service.buscar_por_email(email)
+        if email is not None and usuario is not None and usuario.email != email:
+            usuario = None
+        return jsonify([usuario.to_dict()] if usuario else [])
+
+    if not _quer_pagina('tipo', 'status'):
+        return jsonify([u.to_dict() for u in service.listar()])
+    try:
+        usuarios, proximo = service.paginar(request.args.get('tipo') or None, request.args.get('status') or None,
+                                            **_parametros_de_pagina())
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    return _com_cursor(jsonify([u.to_dict() for u in usuarios]), proximo)
 
 
 @app.route('/api/usuarios', methods=['POST'])
@@ -56,6 +122,17 @@ def cadastrar_usuario():
         return jsonify({'erro': 'Erro interno do servidor'}), 500
 
 
+@app.route('/api/usuarios/lote', methods=['POST'])
+def cadastrar_usuarios_lote():
+    try:
+        itens = _itens_do_lote('usuarios')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    
+    resultados = service.cadastrar_lote([item if isinstance(item, dict) else {} for item in itens])
+    return _resposta_lote(resultados, lambda u: {'id': u.id, 'matricula': u.matricula})
+
+
 @app.route('/api/usuarios/<int:usuario_id>', methods=['GET'])
 def buscar_usuario(usuario_id):
     usuario = service.buscar_por_id(usuario_id)
@@ -94,10 +171,131 @@ def remover_usuario(usuario_id):
     return jsonify({'mensagem': 'Usuário removido com sucesso'})
 
 
+def _parametro_inteiro(nome):
+    valor = request.args.get(nome)
+    if valor is None or valor == '':
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"Parâmetro {nome} deve ser inteiro")
+
+
+def _quer_pagina(*filtros):
+    """Sem paginação nem filtros a listagem continua completa, como antes"""
+    return any(nome in request.args for nome in ('limit', 'cursor', 'sort', *filtros))
+
+
+def _parametros_de_pagina():
+    """
+    limit, cursor e sort da query string, como argumentos de paginar. A
+    ordem é sempre a do id (sort=id ou -id), que é a ordem dos índices.
+    """
+    limite = _parametro_inteiro('limit')
+    if limite is not None and not 0 < limite <= LIMITE_PAGINA:
+        raise ValueError(f"limit deve estar entre 1 e {LIMITE_PAGINA}")
+    ordem = request.args.get('sort', 'id')
+    if ordem not in ('id', '-id'):
+        raise ValueError("sort deve ser id ou -id")
+    return {'limite': limite, 'apos': _parametro_inteiro('cursor'), 'decrescente': ordem == '-id'}
+
+
+def _com_cursor(resposta, proximo):
+    """Cursor da próxima página no cabeçalho X-Next-Cursor (ausente na última)"""
+    if proximo is not None:
+        resposta.headers['X-Next-Cursor'] = str(proximo)
+    return resposta
+
+
+def _parametro_booleano(nome):
+    valor = request.args.get(nome, '').lower()
+    if valor == '':
+        return None
+    if valor in ('1', 'true', 'sim'):
+        return True
+    if valor in ('0', 'false', 'nao', 'não'):
+        return False
+    raise ValueError(f"Parâmetro {nome} deve ser true ou false")
+
+
+def _itens_do_lote(chave):
+    """Lista de itens do corpo: a própria lista ou {chave: [...]}"""
+    dados = request.get_json(silent=True)
+    if isinstance(dados, dict):
+        dados = dados.get(chave)
+    if not isinstance(dados, list):
+        raise ValueError(f"Corpo deve ser uma lista de {chave}")
+    if len(dados) > LIMITE_LOTE:
+        raise ValueError(f"Lote com mais de {LIMITE_LOTE} itens")
+    return dados
+
+
+def _preparar_lote(itens, converter):
+    """
+    Converte cada item com `converter`. Devolve os convertidos, os índices
+    deles no lote e a lista de resultados já com os erros de conversão.
+    """
+    resultados = [None] * len(itens)
+    convertidos, indices = [], []
+    for i, item in enumerate(itens):
+        try:
+            convertidos.append(converter(item))
+            indices.append(i)
+        except (KeyError, TypeError, ValueError) as e:
+            resultados[i] = ValueError(f"Campo ausente: {e.args[0]}" if isinstance(e, KeyError) else str(e))
+    return convertidos, indices, resultados
+
+
+def _resposta_lote(resultados, resumir):
+    """201 se todos os itens foram criados, 207 se algum foi recusado"""
+    itens = []
+    criados = 0
+    for i, resultado in enumerate(resultados):
+        if isinstance(resultado, Exception):
+            itens.append({'indice': i, 'erro': str(resultado)})
+        else:
+            criados += 1
+            itens.append({'indice': i, **resumir(resultado)})
+    corpo = {'criados': criados, 'recusados': len(itens) - criados, 'resultados': itens}
+    return jsonify(corpo), 201 if criados == len(itens) else 207
+
+
+def _filtrar_por_ativo(loans, ativo):
+    """?ativo= ausente devolve todos; true só os em aberto, false só os devolvidos"""
+    if ativo is None:
+        return loans
+    return [l for l in loans if (l.returned_at is None) == ativo]
+
+
+@app.route('/api/usuarios/<int:usuario_id>/emprestimos', methods=['GET'])
+def emprestimos_do_usuario(usuario_id):
+    if not service.buscar_por_id(usuario_id):
+        return jsonify({'erro': 'Usuário não encontrado'}), 404
+
+    try:
+        ativo = _parametro_booleano('ativo')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    if ativo:
+        loans = loan_controller.emprestimos_ativos_do_usuario(usuario_id)
+    else:
+        loans = _filtrar_por_ativo(loan_controller.emprestimos_do_usuario(usuario_id), ativo)
+    return jsonify([l.to_dict() for l in loans])
+
+
 @app.route('/api/livros', methods=['GET'])
+@condicional('livros')
 def livros_listar():
-    livros = listar_livros()
-    return jsonify([
+    proximo = None
+    if _quer_pagina('autor', 'status'):
+        try:
+            livros, proximo = paginar_livros(request.args.get('autor'), request.args.get('status'),
+                                             **_parametros_de_pagina())
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+    else:
+        livros = listar_livros()
+    return _com_cursor(jsonify([
         {
             'id': l.get_id(),
             'titulo': l.get_titulo(),
@@ -106,7 +304,7 @@ def livros_listar():
             'status': l.get_status(),
         }
         for l in livros
-    ])
+    ]), proximo)
 
 
 @app.route('/api/livros', methods=['POST'])
@@ -131,6 +329,24 @@ def livros_criar():
         return jsonify({'erro': str(e)}), 400
 
 
+@app.route('/api/livros/lote', methods=['POST'])
+def livros_criar_lote():
+    try:
+        itens = _itens_do_lote('livros')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    
+    livros, indices, resultados = _preparar_lote(itens, lambda dados: Livro(
+        id=int(dados['id']),
+        titulo=dados['titulo'],
+        autor=dados['autor'],
+        estoque=int(dados['estoque'])
+    ))
+    for i, resultado in zip(indices, adicionar_livros(livros)):
+        resultados[i] = resultado
+    return _resposta_lote(resultados, lambda l: {'id': l.get_id()})
+
+
 @app.route('/api/livros/<int:livro_id>', methods=['GET'])
 def livros_buscar(livro_id: int):
     livro = buscar_livro_por_id(livro_id)
@@ -154,10 +370,34 @@ def livros_remover(livro_id: int):
     return jsonify({'mensagem': 'Livro removido com sucesso'})
 
 
+@app.route('/api/livros/<int:livro_id>/emprestimos', methods=['GET'])
+def emprestimos_do_livro(livro_id: int):
+    if not buscar_livro_por_id(livro_id):
+        return jsonify({'erro': 'Livro não encontrado'}), 404
+
+    try:
+        ativo = _parametro_booleano('ativo')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    if ativo:
+        loans = loan_controller.emprestimos_ativos_do_livro(livro_id)
+    else:
+        loans = _filtrar_por_ativo(loan_controller.emprestimos_do_livro(livro_id), ativo)
+    return jsonify([l.to_dict() for l in loans])
+
+
 @app.route('/api/emprestimos', methods=['GET'])
+@condicional('emprestimos')
 def emprestimos_listar():
-    loans = loan_controller.listar_emprestimos()
-    return jsonify([l.to_dict() for l in loans])
+    if not _quer_pagina('ativo', 'user_id', 'book_id'):
+        return jsonify([l.to_dict() for l in loan_controller.listar_emprestimos()])
+    try:
+        loans, proximo = loan_controller.paginar(
+            _parametro_booleano('ativo'), _parametro_inteiro('user_id'), _parametro_inteiro('book_id'),
+            **_parametros_de_pagina())
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    return _com_cursor(jsonify([l.to_dict() for l in loans]), proximo)
 
 
 @app.route('/api/emprestimos', methods=['POST'])
@@ -173,6 +413,21 @@ def emprestimos_criar():
         return jsonify({'erro': str(e)}), 400
 
 
+@app.route('/api/emprestimos/lote', methods=['POST'])
+def emprestimos_criar_lote():
+    try:
+        itens = _itens_do_lote('emprestimos')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    
+    pares, indices, resultados = _preparar_lote(
+        itens, lambda dados: (int(dados['user_id']), int(dados['book_id']))
+    )
+    for i, resultado in zip(indices, loan_controller.registrar_emprestimos_lote(pares)):
+        resultados[i] = resultado
+    return _resposta_lote(resultados, lambda loan: {'loan_id': loan.loan_id})
+
+
 @app.route('/api/devolucoes', methods=['POST'])
 def emprestimos_devolver():
     try:
@@ -187,30 +442,35 @@ def emprestimos_devolver():
 
 
 @app.route('/api/relatorios/livros-mais-emprestados', methods=['GET'])
+@condicional('emprestimos', 'livros')
 def relatorio_livros_mais_emprestados():
     relatorio = relatorio_service.gerar_relatorio_livros_mais_emprestados()
     return jsonify(relatorio)
 
 
 @app.route('/api/relatorios/usuarios-mais-ativos', methods=['GET'])
+@condicional('emprestimos', 'usuarios')
 def relatorio_usuarios_mais_ativos():
     relatorio = relatorio_service.gerar_relatorio_usuarios_mais_ativos()
     return jsonify(relatorio)
 
 
 @app.route('/api/relatorios/status-acervo', methods=['GET'])
+@condicional('livros')
 def relatorio_status_acervo():
     status = relatorio_service.contar_status_acervo()
     return jsonify(status)
 
 
 @app.route('/api/relatorios/emprestimos-detalhado', methods=['GET'])
+@condicional('emprestimos', 'usuarios', 'livros')
 def relatorio_emprestimos_detalhado():
     relatorio = relatorio_service.relatorio_detalhado_emprestimos()
     return jsonify(relatorio)
 
 
 @app.route('/api/relatorios/por-periodo', methods=['GET'])
+@condicional('emprestimos')
 def relatorio_por_periodo():
     try:
         data_inicio = request.args.get('inicio')
@@ -219,8 +479,10 @@ def relatorio_por_periodo():
         if not data_inicio or not data_fim:
             return jsonify({'erro': 'Parâmetros início e fim são obrigatórios'}), 400
         
-        relatorio = relatorio_service.filtrar_por_periodo(data_inicio, data_fim)
-        return jsonify(relatorio)
+        limite = _parametro_inteiro('limit')
+        cursor = _parametro_inteiro('cursor')
+        relatorio, proximo = relatorio_service.paginar_por_periodo(data_inicio, data_fim, limite, cursor)
+        return _com_cursor(jsonify(relatorio), proximo)
     except Exception as e:
         return jsonify({'erro': str(e)}), 400
 
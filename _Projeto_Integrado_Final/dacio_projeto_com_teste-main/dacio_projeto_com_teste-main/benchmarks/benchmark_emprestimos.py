@@ -0,0 +1,66 @@
+"""
+Benchmark de LoanController.registrar_emprestimo com um acervo grande
+
+Compara o repositório indexado por id com a busca linear antiga
+(simulada trocando buscar_livro_por_id por uma varredura da lista).
+
+Uso:
+    python benchmarks/benchmark_emprestimos.py [--livros 100000] [--emprestimos 2000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import models.livro as livro_module
+from models import Livro, LoanController, UsuarioService
+
+
+def _busca_linear(id):
+    for livro in livro_module._livros._por_id.values():
+        if livro.get_id() == id:
+            return livro
+    return None
+
+
+def medir(total_livros, total_emprestimos, linear=False):
+    livro_module._livros.clear()
+    for i in range(1, total_livros + 1):
+        livro_module.adicionar_livro(Livro(i, f"Livro {i}", f"Autor {i % 1000}", 5))
+
+    service = UsuarioService()
+    usuario = service.cadastrar("Leitor", "BENCH0001", "ALUNO")
+    controller = LoanController(service)
+    ids = random.Random(1).choices(range(1, total_livros + 1), k=total_emprestimos)
+
+    original = livro_module.buscar_livro_por_id
+    if linear:
+        livro_module.buscar_livro_por_id = _busca_linear
+    try:
+        inicio = time.perf_counter()
+        for book_id in ids:
+            controller.registrar_emprestimo(usuario.id, book_id)
+        decorrido = time.perf_counter() - inicio
+    finally:
+        livro_module.buscar_livro_por_id = original
+    return decorrido / total_emprestimos * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--livros", type=int, default=100_000)
+    parser.add_argument("--emprestimos", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"registrar_emprestimo com {args.livros} livros ({args.emprestimos} empréstimos)")
+    print(f"  repositório indexado: {medir(args.livros, args.emprestimos):10.1f} µs por empréstimo")
+    # A busca linear é ordens de grandeza mais lenta: menos empréstimos bastam
+    amostra = max(args.emprestimos // 20, 10)
+    print(f"  busca linear (antiga): {medir(args.livros, amostra, linear=True):10.1f} µs por empréstimo")
+
+
+if __name__ == "__main__":
+    main()
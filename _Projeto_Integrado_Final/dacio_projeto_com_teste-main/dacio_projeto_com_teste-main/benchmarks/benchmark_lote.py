@@ -0,0 +1,53 @@
+"""
+Importação de usuários pela API: POST /api/usuarios/lote contra um POST
+/api/usuarios por usuário (pelo cliente de teste do Flask, sem rede)
+
+Uso:
+    python benchmarks/benchmark_lote.py [--usuarios 50000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app as app_module
+from models import UsuarioService
+
+
+def _usuarios(total, prefixo):
+    return [
+        {'nome': f"Aluno {i}", 'matricula': f"{prefixo}{i:07d}", 'tipo': "ALUNO",
+         'email': f"aluno{i}.{prefixo.lower()}@universidade.br"}
+        for i in range(total)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--usuarios", type=int, default=50_000)
+    args = parser.parse_args()
+    client = app_module.app.test_client()
+
+    app_module.service = UsuarioService()
+    usuarios = _usuarios(args.usuarios, "LOTE")
+    inicio = time.perf_counter()
+    resposta = client.post('/api/usuarios/lote', json=usuarios)
+    decorrido = time.perf_counter() - inicio
+    criados = resposta.get_json()['criados']
+    print(f"lote:       {criados} usuários em {decorrido:.2f} s (HTTP {resposta.status_code})")
+
+    # Um POST por usuário: mede uma amostra e projeta para o total
+    app_module.service = UsuarioService()
+    amostra = _usuarios(min(args.usuarios, 2000), "UNIT")
+    inicio = time.perf_counter()
+    for usuario in amostra:
+        client.post('/api/usuarios', json=usuario)
+    por_usuario = (time.perf_counter() - inicio) / len(amostra)
+    print(f"um a um:    {por_usuario * 1e6:.0f} µs por usuário, "
+          f"~{por_usuario * args.usuarios:.1f} s para {args.usuarios}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Teste de estresse com várias threads sobre UsuarioService, livros e LoanController
+
+Cada thread cadastra usuários (parte com matrículas repetidas entre
+threads) e empresta e devolve livros sorteados de um acervo pequeno, para
+forçar disputa pelos mesmos exemplares. No fim confere os invariantes:
+nenhum exemplar emprestado duas vezes, ids únicos e contadores do acervo
+consistentes.
+
+Uso:
+    python benchmarks/stress_concorrencia.py [--threads 16] [--operacoes 5000] [--livros 50]
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import models.livro as livro_module
+from models import Livro, LoanController, LoanError, UsuarioService
+
+
+def executar(threads=16, operacoes=5000, livros=50, estoque=3, semente=1):
+    """Roda o estresse e devolve as estatísticas; AssertionError se algum invariante falhar"""
+    livro_module._livros.clear()
+    for i in range(1, livros + 1):
+        livro_module.adicionar_livro(Livro(i, f"Livro {i}", f"Autor {i % 7}", estoque))
+    service = UsuarioService()
+    controller = LoanController(service)
+    leitores = [service.cadastrar(f"Leitor {i}", f"LEITOR{i:04d}", "ALUNO") for i in range(threads)]
+
+    barreira = threading.Barrier(threads)
+    resultados = [None] * threads
+
+    def trabalhar(n):
+        aleatorio = random.Random(semente + n)
+        usuario = leitores[n]
+        emprestados = []
+        contagem = {'emprestimos': 0, 'devolucoes': 0, 'recusados': 0, 'cadastros': 0, 'duplicados': 0}
+        barreira.wait()
+        for i in range(operacoes):
+            sorteio = aleatorio.random()
+            if sorteio < 0.05:
+                # Matrículas compartilhadas entre threads: só uma pode vencer
+                try:
+                    service.cadastrar("Novo", f"NOVO{i:06d}", "ALUNO")
+                    contagem['cadastros'] += 1
+                except ValueError:
+                    contagem['duplicados'] += 1
+            elif emprestados and sorteio < 0.5:
+                book_id = emprestados.pop(aleatorio.randrange(len(emprestados)))
+                controller.registrar_devolucao(usuario.id, book_id)
+                contagem['devolucoes'] += 1
+            else:
+                book_id = aleatorio.randint(1, livros)
+                try:
+                    controller.registrar_emprestimo(usuario.id, book_id)
+                    emprestados.append(book_id)
+                    contagem['emprestimos'] += 1
+                except LoanError:
+                    contagem['recusados'] += 1
+        resultados[n] = contagem
+
+    trabalhadores = [threading.Thread(target=trabalhar, args=(n,)) for n in range(threads)]
+    inicio = time.perf_counter()
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    decorrido = time.perf_counter() - inicio
+
+    total = {chave: sum(r[chave] for r in resultados) for chave in resultados[0]}
+    loans = controller.listar_emprestimos()
+
+    # Ids de empréstimo e de usuário únicos e sem buracos
+    assert sorted(l.loan_id for l in loans) == list(range(1, len(loans) + 1))
+    assert len(loans) == total['emprestimos']
+    ids_usuarios = [u.id for u in service.listar()]
+    assert len(ids_usuarios) == len(set(ids_usuarios)) == threads + total['cadastros']
+    assert total['cadastros'] == len({u.matricula for u in service.listar()}) - threads
+
+    # Nenhum exemplar emprestado além do estoque
+    ativos = {}
+    for loan in loans:
+        if loan.returned_at is None:
+            ativos[loan.book_id] = ativos.get(loan.book_id, 0) + 1
+    assert sum(ativos.values()) == total['emprestimos'] - total['devolucoes']
+    for livro in livro_module.listar_livros():
+        assert livro.get_estoque() >= 0
+        assert livro.get_estoque() + ativos.get(livro.get_id(), 0) == estoque, livro
+    livro_module._livros.verificar_contadores()
+
+    total['segundos'] = decorrido
+    total['operacoes_por_segundo'] = threads * operacoes / decorrido
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--operacoes", type=int, default=5000)
+    parser.add_argument("--livros", type=int, default=50)
+    parser.add_argument("--estoque", type=int, default=3)
+    args = parser.parse_args()
+
+    # Trocas de thread mais frequentes expõem mais intercalações
+    sys.setswitchinterval(1e-6)
+    total = executar(args.threads, args.operacoes, args.livros, args.estoque)
+    print(f"{args.threads} threads x {args.operacoes} operações em {total['segundos']:.2f} s "
+          f"({total['operacoes_por_segundo']:,.0f} operações/s)")
+    print(f"  empréstimos {total['emprestimos']}, devoluções {total['devolucoes']}, "
+          f"recusados por falta de estoque {total['recusados']}")
+    print(f"  cadastros {total['cadastros']}, matrículas duplicadas recusadas {total['duplicados']}")
+    print("  invariantes conferidos: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
 # Sistema de Biblioteca Integrado - Models
 from .usuario import Usuario, UsuarioService, TipoUsuario, StatusUsuario
-from .livro import Livro, adicionar_livro, listar_livros, remover_livro, buscar_livro_por_id
+from .livro import (
+    Livro, LivroRepository, adicionar_livro, adicionar_livros, listar_livros, remover_livro, buscar_livro_por_id,
+    listar_livros_por_autor, listar_livros_por_status, paginar_livros, usar_repositorio,
+    contar_livros, contar_livros_por_status, total_exemplares, versao_livros
+)
 from .loan import Loan, LoanController, LoanError, NotFoundError, ValidationError
 from .relatorio import RelatorioService
+from .persistencia import (
+    BancoSQLite, UsuarioServiceSQLite, LivroRepositorySQLite, LoanControllerSQLite, RelatorioServiceSQLite,
+    usar_sqlite
+)
 
 __all__ = [
     'Usuario', 'UsuarioService', 'TipoUsuario', 'StatusUsuario',
-    'Livro', 'adicionar_livro', 'listar_livros', 'remover_livro', 'buscar_livro_por_id',
+    'Livro', 'LivroRepository', 'adicionar_livro', 'adicionar_livros', 'listar_livros', 'remover_livro', 'buscar_livro_por_id',
+    'listar_livros_por_autor', 'listar_livros_por_status', 'paginar_livros', 'usar_repositorio',
+    'contar_livros', 'contar_livros_por_status', 'total_exemplares', 'versao_livros',
     'Loan', 'LoanController', 'LoanError', 'NotFoundError', 'ValidationError',
-    'RelatorioService'
+    'RelatorioService',
+    'BancoSQLite', 'UsuarioServiceSQLite', 'LivroRepositorySQLite', 'LoanControllerSQLite',
+    'RelatorioServiceSQLite', 'usar_sqlite'
 ]
 
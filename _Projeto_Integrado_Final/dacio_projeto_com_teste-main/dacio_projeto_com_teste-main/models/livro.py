@@ -1,13 +1,46 @@
-from typing import List, Optional
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .paginacao import IndiceOrdenado, paginar
+from .versao import Versao
 
 
 class Livro:
 	def __init__(self, id: int, titulo: str, autor: str, estoque: int, status: str = "disponível"):
+		# Chamado com (livro, campo, antigo, novo) quando status ou estoque mudam;
+		# é assim que o repositório mantém o índice por status e os contadores
+		self._observador: Optional[Callable[["Livro", str, Any, Any], None]] = None
+		# Lock do livro: empréstimos de livros diferentes correm em paralelo
+		self.trava = threading.RLock()
 		self.id = id
 		self.titulo = titulo
 		self.autor = autor
-		self.estoque = estoque
-		self.status = status
+		self._estoque = estoque
+		self._status = status
+
+	@property
+	def status(self) -> str:
+		return self._status
+
+	@status.setter
+	def status(self, novo_status: str) -> None:
+		with self.trava:
+			antigo = self._status
+			self._status = novo_status
+			if self._observador is not None and antigo != novo_status:
+				self._observador(self, "status", antigo, novo_status)
+
+	@property
+	def estoque(self) -> int:
+		return self._estoque
+
+	@estoque.setter
+	def estoque(self, novo_estoque: int) -> None:
+		with self.trava:
+			antigo = self._estoque
+			self._estoque = novo_estoque
+			if self._observador is not None and antigo != novo_estoque:
+				self._observador(self, "estoque", antigo, novo_estoque)
 
 	def get_id(self) -> int:
 		return self.id
@@ -28,37 +61,280 @@ class Livro:
 		self.status = novo_status
 
 	def emprestar(self) -> None:
-		if self.estoque > 0:
-			self.estoque -= 1
-			if self.estoque == 0:
-				self.status = "emprestado"
-		else:
-			raise ValueError("Livro indisponível para empréstimo")
+		with self.trava:
+			if self.estoque > 0:
+				self.estoque -= 1
+				if self.estoque == 0:
+					self.status = "emprestado"
+			else:
+				raise ValueError("Livro indisponível para empréstimo")
 
 	def devolver(self) -> None:
-		self.estoque += 1
-		self.status = "disponível"
+		with self.trava:
+			self.estoque += 1
+			self.status = "disponível"
+
+
+class LivroRepository:
+	"""
+	Livros indexados por id, em ordem de inserção, com índices secundários
+	por autor e por status. Todas as operações por id são O(1).
+
+	O total de exemplares em estoque é mantido a cada empréstimo e
+	devolução, e as contagens por status saem dos tamanhos do índice.
+
+	Seguro entre threads: o estado de cada livro é protegido pelo lock do
+	próprio livro, e os índices compartilhados por um lock curto do
+	repositório, sempre tomado depois do lock do livro.
+	"""
+
+	def __init__(self):
+		self._por_id: Dict[int, Livro] = {}
+		# Índices secundários: dict como conjunto ordenado (id -> livro)
+		self._por_autor: Dict[str, Dict[int, Livro]] = {}
+		self._por_status: Dict[str, Dict[int, Livro]] = {}
+		# Os mesmos ids em ordem crescente, para paginar por cursor
+		self._ids = IndiceOrdenado()
+		self._ids_por_autor: Dict[str, IndiceOrdenado] = {}
+		self._ids_por_status: Dict[str, IndiceOrdenado] = {}
+		self._exemplares = 0
+		self._lock = threading.Lock()
+		self._versao = Versao()
+
+	def __len__(self) -> int:
+		return len(self._por_id)
+
+	def __iter__(self) -> Iterator[Livro]:
+		return iter(self.listar())
+
+	def __contains__(self, id: int) -> bool:
+		return id in self._por_id
+
+	def adicionar(self, livro: Livro) -> None:
+		with livro.trava, self._lock:
+			self._inserir(livro)
+
+	def adicionar_lote(self, livros: List[Livro]) -> List[Union[Livro, ValueError]]:
+		"""
+		Adiciona vários livros numa única seção crítica. Devolve, na ordem,
+		o livro adicionado ou o ValueError que o recusou (id repetido).
+		"""
+		resultados: List[Union[Livro, ValueError]] = []
+		vistos = set()
+		for livro in livros:
+			if livro.get_id() in vistos:
+				resultados.append(ValueError("Id repetido no lote"))
+			else:
+				vistos.add(livro.get_id())
+				resultados.append(livro)
+		# Livros novos ainda não são vistos por outras threads: basta o lock do repositório
+		with self._lock:
+			for i, livro in enumerate(resultados):
+				if isinstance(livro, ValueError):
+					continue
+				try:
+					self._inserir(livro)
+				except ValueError as e:
+					resultados[i] = e
+		return resultados
+
+	def _inserir(self, livro: Livro) -> None:
+		if livro.get_id() in self._por_id:
+			raise ValueError("Livro com este id já cadastrado")
+		self._versao.avancar()
+		self._por_id[livro.get_id()] = livro
+		self._indexar(self._por_autor, livro.get_autor(), livro)
+		self._indexar(self._por_status, livro.get_status(), livro)
+		self._ids.adicionar(livro.get_id())
+		self._ordenar(self._ids_por_autor, livro.get_autor(), livro.get_id())
+		self._ordenar(self._ids_por_status, livro.get_status(), livro.get_id())
+		self._exemplares += livro.get_estoque()
+		livro._observador = self._livro_alterado
+
+	def remover(self, id: int) -> Optional[Livro]:
+		livro = self._por_id.get(id)
+		if livro is None:
+			return None
+		with livro.trava, self._lock:
+			if self._por_id.get(id) is not livro:
+				return None  # Removido por outra thread
+			del self._por_id[id]
+			self._versao.avancar()
+			self._desindexar(self._por_autor, livro.get_autor(), livro)
+			self._desindexar(self._por_status, livro.get_status(), livro)
+			self._ids.remover(id)
+			self._desordenar(self._ids_por_autor, livro.get_autor(), id)
+			self._desordenar(self._ids_por_status, livro.get_status(), id)
+			self._exemplares -= livro.get_estoque()
+			livro._observador = None
+		return livro
+
+	def buscar(self, id: int) -> Optional[Livro]:
+		return self._por_id.get(id)
+
+	def listar(self) -> List[Livro]:
+		with self._lock:
+			return list(self._por_id.values())
+
+	def por_autor(self, autor: str) -> List[Livro]:
+		with self._lock:
+			return list(self._por_autor.get(autor, {}).values())
+
+	def por_status(self, status: str) -> List[Livro]:
+		with self._lock:
+			return list(self._por_status.get(status, {}).values())
+
+	def paginar(self, autor: Optional[str] = None, status: Optional[str] = None,
+				limite: Optional[int] = None, apos: Optional[int] = None,
+				decrescente: bool = False) -> Tuple[List[Livro], Optional[int]]:
+		"""
+		Livros em ordem de id depois do cursor `apos`, filtrados por autor e
+		status, e o cursor da próxima página (None na última). Percorre o
+		menor dos índices envolvidos.
+		"""
+		with self._lock:
+			indices = [self._ids]
+			if autor is not None:
+				indices.append(self._ids_por_autor.get(autor, IndiceOrdenado()))
+			if status is not None:
+				indices.append(self._ids_por_status.get(status, IndiceOrdenado()))
+			filtro = None
+			if autor is not None and status is not None:
+				filtro = lambda id: self._por_id[id].get_autor() == autor and self._por_id[id].get_status() == status
+			ids, proximo = paginar(min(indices, key=len).chaves, apos, limite, decrescente, filtro)
+			return [self._por_id[id] for id in ids], proximo
+
+	def contar_por_status(self, status: str) -> int:
+		return len(self._por_status.get(status, ()))
+
+	def total_exemplares(self) -> int:
+		"""Soma do estoque de todos os livros"""
+		return self._exemplares
+
+	def verificar_contadores(self) -> None:
+		"""Recalcula índices e contadores a partir dos livros; AssertionError se divergirem"""
+		with self._lock:
+			por_status: Dict[str, int] = {}
+			for livro in self._por_id.values():
+				por_status[livro.get_status()] = por_status.get(livro.get_status(), 0) + 1
+				assert livro.get_id() in self._por_status.get(livro.get_status(), {}), \
+					f"Livro {livro.get_id()} fora do índice de status {livro.get_status()!r}"
+			contados = {status: len(grupo) for status, grupo in self._por_status.items()}
+			assert contados == por_status, f"Contagem por status {contados} != {por_status}"
+			ordenados = {status: len(ids) for status, ids in self._ids_por_status.items()}
+			assert ordenados == por_status, f"Índice ordenado por status {ordenados} != {por_status}"
+			exemplares = sum(livro.get_estoque() for livro in self._por_id.values())
+			assert self._exemplares == exemplares, f"Exemplares {self._exemplares} != {exemplares}"
+
+	def clear(self) -> None:
+		with self._lock:
+			for livro in self._por_id.values():
+				livro._observador = None
+			self._por_id.clear()
+			self._por_autor.clear()
+			self._por_status.clear()
+			self._ids.clear()
+			self._ids_por_autor.clear()
+			self._ids_por_status.clear()
+			self._exemplares = 0
+			self._versao.avancar()
 
+	def versao(self) -> str:
+		"""Muda a cada livro incluído, removido, emprestado ou devolvido"""
+		return str(self._versao)
 
-_livros: List[Livro] = []
+	def _livro_alterado(self, livro: Livro, campo: str, antigo: Any, novo: Any) -> None:
+		# Chamado com o lock do livro já tomado
+		with self._lock:
+			self._versao.avancar()
+			if campo == "status":
+				self._desindexar(self._por_status, antigo, livro)
+				self._indexar(self._por_status, novo, livro)
+				self._desordenar(self._ids_por_status, antigo, livro.get_id())
+				self._ordenar(self._ids_por_status, novo, livro.get_id())
+			elif campo == "estoque":
+				self._exemplares += novo - antigo
+
+	@staticmethod
+	def _indexar(indice: Dict[str, Dict[int, Livro]], chave: str, livro: Livro) -> None:
+		indice.setdefault(chave, {})[livro.get_id()] = livro
+
+	@staticmethod
+	def _desindexar(indice: Dict[str, Dict[int, Livro]], chave: str, livro: Livro) -> None:
+		grupo = indice.get(chave)
+		if grupo is not None:
+			grupo.pop(livro.get_id(), None)
+			if not grupo:
+				del indice[chave]
+
+	@staticmethod
+	def _ordenar(indice: Dict[str, IndiceOrdenado], chave: str, id: int) -> None:
+		indice.setdefault(chave, IndiceOrdenado()).adicionar(id)
+
+	@staticmethod
+	def _desordenar(indice: Dict[str, IndiceOrdenado], chave: str, id: int) -> None:
+		ids = indice.get(chave)
+		if ids is not None:
+			ids.remover(id)
+			if not ids:
+				del indice[chave]
+
+
+_livros = LivroRepository()
+
+
+def usar_repositorio(repositorio) -> "LivroRepository":
+	"""Troca o repositório usado pelas funções do módulo; devolve o anterior"""
+	global _livros
+	anterior, _livros = _livros, repositorio
+	return anterior
 
 
 def adicionar_livro(livro: Livro) -> None:
-	_livros.append(livro)
+	_livros.adicionar(livro)
+
+
+def adicionar_livros(livros: List[Livro]) -> List[Union[Livro, ValueError]]:
+	return _livros.adicionar_lote(livros)
 
 
 def listar_livros() -> List[Livro]:
-	return _livros
+	return _livros.listar()
 
 
 def remover_livro(id: int) -> None:
-	global _livros
-	_livros = [l for l in _livros if l.get_id() != id]
+	_livros.remover(id)
 
 
 def buscar_livro_por_id(id: int) -> Optional[Livro]:
-	for livro in _livros:
-		if livro.get_id() == id:
-			return livro
-	return None
+	return _livros.buscar(id)
+
+
+def listar_livros_por_autor(autor: str) -> List[Livro]:
+	return _livros.por_autor(autor)
+
+
+def listar_livros_por_status(status: str) -> List[Livro]:
+	return _livros.por_status(status)
+
+
+def paginar_livros(autor: Optional[str] = None, status: Optional[str] = None,
+				   limite: Optional[int] = None, apos: Optional[int] = None,
+				   decrescente: bool = False) -> Tuple[List[Livro], Optional[int]]:
+	return _livros.paginar(autor, status, limite, apos, decrescente)
+
+
+def contar_livros_por_status(status: str) -> int:
+	return _livros.contar_por_status(status)
+
+
+def contar_livros() -> int:
+	return len(_livros)
+
+
+def total_exemplares() -> int:
+	return _livros.total_exemplares()
+
 
+def versao_livros() -> str:
+	return _livros.versao()
@@ -1,9 +1,14 @@
+import bisect
+import threading
+from contextlib import ExitStack
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 from .usuario import UsuarioService
 from . import livro as livros_store
+from .paginacao import IndiceOrdenado, paginar
+from .versao import Versao
 
 
 class LoanError(Exception):
@@ -51,6 +56,12 @@ class _BookStoreAdapter:
 			raise NotFoundError("Livro não encontrado")
 		return livro.get_estoque() > 0
 
+	def trava(self, book_id: int) -> threading.RLock:
+		livro = livros_store.buscar_livro_por_id(book_id)
+		if not livro:
+			raise NotFoundError("Livro não encontrado")
+		return livro.trava
+
 	def set_loaned(self, book_id: int, loaned: bool) -> None:
 		livro = livros_store.buscar_livro_por_id(book_id)
 		if not livro:
@@ -62,12 +73,33 @@ class _BookStoreAdapter:
 
 
 class LoanController:
+	"""
+	Seguro para requisições simultâneas. Verificar disponibilidade e
+	emprestar acontecem sob o lock do livro, então dois pedidos do mesmo
+	livro nunca levam o mesmo exemplar, e livros diferentes não se
+	bloqueiam. O registro do empréstimo (id, índices) usa um lock curto
+	do controlador, sempre tomado depois do lock do livro.
+	"""
 
 	def __init__(self, user_service: UsuarioService):
 		self.user_store = _UserStoreAdapter(user_service)
 		self.book_store = _BookStoreAdapter()
 		self._loans: Dict[int, Loan] = {}
 		self._next_id = 1
+		# Índices mantidos a cada empréstimo/devolução (ids em ordem de criação)
+		self._ativos: Dict[Tuple[int, int], List[int]] = {}
+		self._por_usuario: Dict[int, List[int]] = {}
+		self._por_livro: Dict[int, List[int]] = {}
+		# dict como conjunto ordenado: loan_id -> None
+		self._ativos_por_usuario: Dict[int, Dict[int, None]] = {}
+		self._ativos_por_livro: Dict[int, Dict[int, None]] = {}
+		# (borrowed_at, loan_id) em ordem, para consultas por período
+		self._linha_do_tempo: List[Tuple[datetime, int]] = []
+		# Todos os ids e os ids ativos em ordem, para paginar por cursor
+		self._ids = IndiceOrdenado()
+		self._ids_ativos = IndiceOrdenado()
+		self._lock = threading.Lock()
+		self._versao = Versao()
 
 	def _validate_ids(self, user_id: int, book_id: int):
 		if not isinstance(user_id, int) or not isinstance(book_id, int):
@@ -88,8 +120,51 @@ class LoanController:
 
 	def registrar_emprestimo(self, user_id: int, book_id: int) -> Loan:
 		self._validate_ids(user_id, book_id)
-		if not self.book_store.is_available(book_id):
-			raise LoanError("Livro não disponível para empréstimo")
+		with self.book_store.trava(book_id):
+			if not self.book_store.is_available(book_id):
+				raise LoanError("Livro não disponível para empréstimo")
+			self.book_store.set_loaned(book_id, True)
+			with self._lock:
+				return self._criar(user_id, book_id)
+
+	def registrar_emprestimos_lote(self, pares: Sequence[Tuple[int, int]]) -> List[Union[Loan, LoanError]]:
+		"""
+		Registra vários empréstimos (user_id, book_id). IDs, usuários e livros
+		são validados antes de qualquer alteração; depois os livros do lote
+		são travados juntos e os empréstimos saem numa única seção crítica,
+		na ordem dos pares. Devolve, na ordem, o empréstimo ou o LoanError
+		que o recusou.
+		"""
+		resultados: List[Union[Loan, LoanError, None]] = [None] * len(pares)
+		travas = {}
+		for i, (user_id, book_id) in enumerate(pares):
+			try:
+				self._validate_ids(user_id, book_id)
+				if book_id not in travas:
+					travas[book_id] = self.book_store.trava(book_id)
+			except LoanError as e:
+				resultados[i] = e
+
+		# Travas em ordem de id: dois lotes simultâneos não entram em deadlock
+		with ExitStack() as pilha:
+			for book_id in sorted(travas):
+				pilha.enter_context(travas[book_id])
+			with self._lock:
+				for i, (user_id, book_id) in enumerate(pares):
+					if resultados[i] is not None:
+						continue
+					try:
+						if not self.book_store.is_available(book_id):
+							raise LoanError("Livro não disponível para empréstimo")
+						self.book_store.set_loaned(book_id, True)
+					except LoanError as e:
+						resultados[i] = e
+						continue
+					resultados[i] = self._criar(user_id, book_id)
+		return resultados
+
+	def _criar(self, user_id: int, book_id: int) -> Loan:
+		"""Aloca o id e registra o empréstimo; chamado com self._lock tomado"""
 		loan = Loan(
 			loan_id=self._next_id,
 			user_id=user_id,
@@ -98,20 +173,132 @@ class LoanController:
 		)
 		self._loans[self._next_id] = loan
 		self._next_id += 1
-		self.book_store.set_loaned(book_id, True)
+		self._indexar(loan)
+		self._versao.avancar()
 		return loan
 
 	def registrar_devolucao(self, user_id: int, book_id: int) -> Loan:
 		self._validate_ids(user_id, book_id)
-		for loan in self._loans.values():
-			if loan.user_id == user_id and loan.book_id == book_id and loan.returned_at is None:
+		with self.book_store.trava(book_id):
+			# Os ativos de um par (usuário, livro) só mudam sob o lock do livro
+			ativos = self._ativos.get((user_id, book_id))
+			if not ativos:
+				raise LoanError("Empréstimo ativo não encontrado para devolução")
+			# O mais antigo primeiro, como na varredura por ordem de criação
+			loan = self._loans[ativos[0]]
+			self.book_store.set_loaned(book_id, False)
+			with self._lock:
 				loan.returned_at = datetime.now(timezone.utc)
-				self.book_store.set_loaned(book_id, False)
-				return loan
-		raise LoanError("Empréstimo ativo não encontrado para devolução")
+				self._desindexar_ativo(loan)
+				self._versao.avancar()
+		return loan
+
+	def _indexar(self, loan: Loan) -> None:
+		item = (loan.borrowed_at, loan.loan_id)
+		if not self._linha_do_tempo or item >= self._linha_do_tempo[-1]:
+			# Caso normal: borrowed_at cresce com a criação
+			self._linha_do_tempo.append(item)
+		else:
+			# Relógio ajustado para trás: mantém a ordem mesmo assim
+			bisect.insort(self._linha_do_tempo, item)
+		self._ativos.setdefault((loan.user_id, loan.book_id), []).append(loan.loan_id)
+		self._por_usuario.setdefault(loan.user_id, []).append(loan.loan_id)
+		self._por_livro.setdefault(loan.book_id, []).append(loan.loan_id)
+		self._ativos_por_usuario.setdefault(loan.user_id, {})[loan.loan_id] = None
+		self._ativos_por_livro.setdefault(loan.book_id, {})[loan.loan_id] = None
+		self._ids.adicionar(loan.loan_id)
+		self._ids_ativos.adicionar(loan.loan_id)
+
+	def _desindexar_ativo(self, loan: Loan) -> None:
+		chave = (loan.user_id, loan.book_id)
+		ativos = self._ativos[chave]
+		ativos.remove(loan.loan_id)
+		if not ativos:
+			del self._ativos[chave]
+		for indice, dono in ((self._ativos_por_usuario, loan.user_id), (self._ativos_por_livro, loan.book_id)):
+			del indice[dono][loan.loan_id]
+			if not indice[dono]:
+				del indice[dono]
+		self._ids_ativos.remover(loan.loan_id)
+
+	def versao(self) -> str:
+		"""Muda a cada empréstimo ou devolução"""
+		return str(self._versao)
 
 	def listar_emprestimos(self) -> List[Loan]:
-		return list(self._loans.values())
+		with self._lock:
+			return list(self._loans.values())
+
+	def _carregar(self, indice: Dict, chave) -> List[Loan]:
+		with self._lock:
+			return [self._loans[i] for i in indice.get(chave, ())]
+
+	def emprestimos_do_usuario(self, user_id: int) -> List[Loan]:
+		"""Todos os empréstimos do usuário, inclusive devolvidos"""
+		return self._carregar(self._por_usuario, user_id)
+
+	def emprestimos_ativos_do_usuario(self, user_id: int) -> List[Loan]:
+		return self._carregar(self._ativos_por_usuario, user_id)
+
+	def emprestimos_do_livro(self, book_id: int) -> List[Loan]:
+		"""Todos os empréstimos do livro, inclusive devolvidos"""
+		return self._carregar(self._por_livro, book_id)
+
+	def emprestimos_ativos_do_livro(self, book_id: int) -> List[Loan]:
+		return self._carregar(self._ativos_por_livro, book_id)
+
+	def emprestimo_ativo(self, user_id: int, book_id: int) -> Optional[Loan]:
+		"""Empréstimo ativo mais antigo do par (usuário, livro), se houver"""
+		with self._lock:
+			ativos = self._ativos.get((user_id, book_id))
+			return self._loans[ativos[0]] if ativos else None
+
+	def emprestimos_no_periodo(self, inicio: datetime, fim: datetime,
+							   limite: Optional[int] = None, apos: Optional[int] = None) -> List[Loan]:
+		"""
+		Empréstimos com inicio <= borrowed_at < fim, em ordem cronológica.
+		`apos` é o loan_id do último item da página anterior.
+		"""
+		with self._lock:
+			linha = self._linha_do_tempo
+			comeco = bisect.bisect_left(linha, (inicio,))
+			if apos is not None:
+				anterior = self._loans.get(apos)
+				if anterior is None:
+					raise NotFoundError("Cursor inválido")
+				comeco = max(comeco, bisect.bisect_right(linha, (anterior.borrowed_at, apos)))
+			termino = bisect.bisect_left(linha, (fim,))
+			if limite is not None:
+				termino = min(termino, comeco + limite)
+			return [self._loans[loan_id] for _, loan_id in linha[comeco:termino]]
+
+	def paginar(self, ativo: Optional[bool] = None, user_id: Optional[int] = None,
+				book_id: Optional[int] = None, limite: Optional[int] = None,
+				apos: Optional[int] = None, decrescente: bool = False) -> Tuple[List[Loan], Optional[int]]:
+		"""
+		Empréstimos em ordem de loan_id depois do cursor `apos`, filtrados por
+		situação, usuário e livro, e o cursor da próxima página (None na
+		última). Percorre o menor dos índices envolvidos.
+		"""
+		def filtro(loan_id: int) -> bool:
+			loan = self._loans[loan_id]
+			return ((ativo is None or (loan.returned_at is None) == ativo)
+					and (user_id is None or loan.user_id == user_id)
+					and (book_id is None or loan.book_id == book_id))
+
+		with self._lock:
+			indices: List[Sequence[int]] = [self._ids.chaves]
+			if ativo:
+				indices.append(self._ids_ativos.chaves)
+			if user_id is not None:
+				indices.append(self._por_usuario.get(user_id, []))
+			if book_id is not None:
+				indices.append(self._por_livro.get(book_id, []))
+			# Com um só índice de filtro, e não sendo "devolvidos", ele já basta
+			basta_o_indice = len(indices) <= 2 and ativo is not False
+			ids, proximo = paginar(min(indices, key=len), apos, limite, decrescente,
+								   None if basta_o_indice else filtro)
+			return [self._loans[loan_id] for loan_id in ids], proximo
 
 	def obter_emprestimo(self, loan_id: int) -> Loan:
 		if loan_id not in self._loans:
@@ -119,6 +306,15 @@ class LoanController:
 		return self._loans[loan_id]
 
 	def _clear_all(self):
-		self._loans.clear()
-		self._next_id = 1
-
+		with self._lock:
+			self._loans.clear()
+			self._next_id = 1
+			self._ativos.clear()
+			self._por_usuario.clear()
+			self._por_livro.clear()
+			self._ativos_por_usuario.clear()
+			self._ativos_por_livro.clear()
+			self._linha_do_tempo.clear()
+			self._ids.clear()
+			self._ids_ativos.clear()
+			self._versao.avancar()
@@ -0,0 +1,60 @@
+import bisect
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+class IndiceOrdenado:
+    """
+    Chaves em ordem crescente, para paginar por cursor com busca binária.
+    Inserir uma chave maior que todas (ids crescentes) é um append.
+    """
+
+    def __init__(self):
+        self.chaves: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.chaves)
+
+    def adicionar(self, chave) -> None:
+        chaves = self.chaves
+        if not chaves or chave > chaves[-1]:
+            chaves.append(chave)
+            return
+        i = bisect.bisect_left(chaves, chave)
+        if i == len(chaves) or chaves[i] != chave:
+            chaves.insert(i, chave)
+
+    def remover(self, chave) -> None:
+        chaves = self.chaves
+        i = bisect.bisect_left(chaves, chave)
+        if i < len(chaves) and chaves[i] == chave:
+            del chaves[i]
+
+    def clear(self) -> None:
+        self.chaves.clear()
+
+
+def paginar(chaves: Sequence, apos=None, limite: Optional[int] = None, decrescente: bool = False,
+            filtro: Optional[Callable[[Any], bool]] = None) -> Tuple[list, Optional[Any]]:
+    """
+    Página de `chaves` (sequência em ordem crescente) que começa logo depois
+    do cursor `apos`. Devolve as chaves e o cursor da próxima página, ou None
+    na última. Só percorre os itens da página (e os recusados por `filtro`).
+    """
+    if limite is not None and limite <= 0:
+        raise ValueError("limit deve ser positivo")
+    if decrescente:
+        fim = bisect.bisect_left(chaves, apos) if apos is not None else len(chaves)
+        posicoes = range(fim - 1, -1, -1)
+    else:
+        inicio = bisect.bisect_right(chaves, apos) if apos is not None else 0
+        posicoes = range(inicio, len(chaves))
+
+    pagina = []
+    for chave in (chaves[i] for i in posicoes):
+        if filtro is not None and not filtro(chave):
+            continue
+        if limite is not None and len(pagina) == limite:
+            # Ainda há item depois da página: o último dela vira o cursor
+            return pagina, pagina[-1]
+        pagina.append(chave)
+    return pagina, None
@@ -0,0 +1,654 @@
+"""
+Persistência em SQLite para usuários, livros e empréstimos
+
+As classes daqui têm a mesma interface das versões em memória e podem
+substituí-las (app.py usa SQLite quando BIBLIOTECA_DB aponta para um
+arquivo). O banco roda em modo WAL: leitores não bloqueiam o escritor, e
+vários processos podem servir o mesmo arquivo.
+
+As conexões vêm de um pool limitado, e o sqlite3 mantém compiladas as
+instruções já usadas em cada uma (cached_statements). Por isso todo SQL daqui é
+constante e recebe os valores como parâmetros. Operações em lote gravam
+tudo numa única transação.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import livro
+from .livro import Livro
+from .loan import Loan, LoanController, LoanError, NotFoundError
+from .relatorio import RelatorioService
+from .usuario import StatusUsuario, Usuario, UsuarioService
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome TEXT NOT NULL,
+    matricula TEXT NOT NULL UNIQUE,
+    tipo TEXT NOT NULL,
+    email TEXT UNIQUE,
+    data_registro TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS usuarios_tipo ON usuarios (tipo);
+CREATE INDEX IF NOT EXISTS usuarios_status ON usuarios (status);
+CREATE TABLE IF NOT EXISTS livros (
+    id INTEGER PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    autor TEXT NOT NULL,
+    estoque INTEGER NOT NULL CHECK (estoque >= 0),
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS livros_autor ON livros (autor);
+CREATE INDEX IF NOT EXISTS livros_status ON livros (status);
+CREATE TABLE IF NOT EXISTS emprestimos (
+    loan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    book_id INTEGER NOT NULL,
+    borrowed_at TEXT NOT NULL,
+    returned_at TEXT
+);
+CREATE INDEX IF NOT EXISTS emprestimos_usuario ON emprestimos (user_id, loan_id);
+CREATE INDEX IF NOT EXISTS emprestimos_livro ON emprestimos (book_id, loan_id);
+CREATE INDEX IF NOT EXISTS emprestimos_data ON emprestimos (borrowed_at, loan_id);
+CREATE INDEX IF NOT EXISTS emprestimos_ativos ON emprestimos (user_id, book_id, loan_id)
+    WHERE returned_at IS NULL;
+CREATE INDEX IF NOT EXISTS emprestimos_abertos ON emprestimos (loan_id) WHERE returned_at IS NULL;
+CREATE TABLE IF NOT EXISTS versoes (
+    loja TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO versoes (loja, versao) VALUES
+    ('epoca', abs(random()) % 4294967296), ('usuarios', 0), ('livros', 0), ('emprestimos', 0);
+"""
+
+
+def _gravar_data(valor: Optional[datetime]) -> Optional[str]:
+    """ISO 8601 em UTC com largura fixa: a ordem do texto é a ordem do tempo"""
+    if valor is None:
+        return None
+    return valor.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _ler_data(valor: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(valor) if valor else None
+
+
+def _pagina(banco: "BancoSQLite", select: str, chave: str, condicoes: Sequence[Tuple[str, tuple]],
+            limite: Optional[int], apos, decrescente: bool) -> Tuple[List[tuple], Optional[Any]]:
+    """
+    Página por cursor: linhas de `select` em ordem de `chave` (a primeira
+    coluna) depois de `apos`, e o cursor da próxima página. `condicoes` são
+    pares (fragmento SQL, parâmetros) dos filtros presentes; como as
+    combinações são poucas, todas cabem no cache de instruções. Índices com
+    o id por último (ou implícito, via rowid) servem filtro e ordem juntos.
+    """
+    if limite is not None and limite <= 0:
+        raise ValueError("limit deve ser positivo")
+    condicoes = list(condicoes)
+    if apos is not None:
+        condicoes.append((f"{chave} {'<' if decrescente else '>'} ?", (apos,)))
+    sql = select
+    if condicoes:
+        sql += " WHERE " + " AND ".join(fragmento for fragmento, _ in condicoes)
+    sql += f" ORDER BY {chave}{' DESC' if decrescente else ''} LIMIT ?"
+    parametros = [valor for _, valores in condicoes for valor in valores]
+    # Uma linha a mais diz se existe próxima página
+    linhas = banco.consultar(sql, parametros + [-1 if limite is None else limite + 1])
+    if limite is not None and len(linhas) > limite:
+        return linhas[:limite], linhas[limite - 1][0]
+    return linhas, None
+
+
+class BancoSQLite:
+    """
+    Arquivo SQLite em modo WAL com um pool limitado de conexões.
+
+    Cada operação toma uma conexão livre e a devolve ao terminar, então o
+    número de conexões abertas nunca passa de `conexoes`, por mais threads
+    que o servidor crie. Dentro de uma operação a thread reutiliza a mesma
+    conexão (uma consulta no meio de uma transação enxerga o que ela gravou).
+    """
+
+    def __init__(self, caminho: str, instrucoes_em_cache: int = 256, conexoes: int = 8,
+                 espera: float = 5.0):
+        self.caminho = caminho
+        self._instrucoes_em_cache = instrucoes_em_cache
+        self._espera = espera
+        self._livres: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._vagas = threading.BoundedSemaphore(conexoes)
+        self._local = threading.local()
+        self._conexoes: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        with self.conexao() as conexao:
+            conexao.executescript(ESQUEMA)
+
+    def _abrir(self) -> sqlite3.Connection:
+        # isolation_level=None: as transações são abertas explicitamente.
+        # check_same_thread=False: a conexão passa de thread em thread pelo
+        # pool, mas só uma a usa de cada vez.
+        conexao = sqlite3.connect(self.caminho, timeout=5.0, isolation_level=None,
+                                  check_same_thread=False,
+                                  cached_statements=self._instrucoes_em_cache)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        conexao.execute("PRAGMA foreign_keys=ON")
+        with self._lock:
+            self._conexoes.append(conexao)
+        return conexao
+
+    @contextmanager
+    def conexao(self) -> Iterator[sqlite3.Connection]:
+        """
+        Conexão do pool durante o bloco. Abre uma nova só se todas estiverem
+        ocupadas e ainda houver vaga; senão espera uma ser devolvida.
+        """
+        em_uso = getattr(self._local, "conexao", None)
+        if em_uso is not None:
+            yield em_uso
+            return
+        if not self._vagas.acquire(timeout=self._espera):
+            raise sqlite3.OperationalError("Nenhuma conexão livre no pool")
+        try:
+            try:
+                conexao = self._livres.get_nowait()
+            except queue.Empty:
+                conexao = self._abrir()
+            self._local.conexao = conexao
+            try:
+                yield conexao
+            finally:
+                self._local.conexao = None
+                self._livres.put(conexao)
+        finally:
+            self._vagas.release()
+
+    def abertas(self) -> int:
+        """Quantas conexões o pool mantém abertas"""
+        with self._lock:
+            return len(self._conexoes)
+
+    @contextmanager
+    def transacao(self, *lojas: str) -> Iterator[sqlite3.Connection]:
+        """
+        Transação de escrita: BEGIN IMMEDIATE reserva o banco logo no início,
+        então leituras seguidas de escrita dentro dela não sofrem conflito
+        com outra conexão. Faz rollback se o bloco levantar exceção.
+
+        A versão de cada tabela em `lojas` avança na mesma transação, e
+        todos os processos que usam o arquivo enxergam a mudança.
+        """
+        with self.conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                yield conexao
+                conexao.executemany("UPDATE versoes SET versao = versao + 1 WHERE loja = ?",
+                                    [(loja,) for loja in lojas])
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+            conexao.execute("COMMIT")
+
+    def versao(self, loja: str) -> str:
+        """Época do arquivo e versão atual da tabela `loja`"""
+        epoca, versao = self.consultar(
+            "SELECT (SELECT versao FROM versoes WHERE loja = 'epoca'), versao FROM versoes WHERE loja = ?",
+            (loja,))[0]
+        return f"{epoca:08x}-{versao}"
+
+    def consultar(self, sql: str, parametros: Sequence = ()) -> List[tuple]:
+        with self.conexao() as conexao:
+            return conexao.execute(sql, parametros).fetchall()
+
+    def fechar(self) -> None:
+        """Fecha todas as conexões do pool"""
+        with self._lock:
+            for conexao in self._conexoes:
+                conexao.close()
+            self._conexoes.clear()
+        self._livres = queue.LifoQueue()
+
+
+class UsuarioServiceSQLite(UsuarioService):
+    """UsuarioService gravado na tabela usuarios; matrícula e email são UNIQUE no banco"""
+
+    _COLUNAS = "id, nome, matricula, tipo, email, data_registro, status"
+
+    def __init__(self, banco: BancoSQLite):
+        super().__init__()
+        self.banco = banco
+
+    @staticmethod
+    def _usuario(linha: tuple) -> Usuario:
+        return Usuario.de_registro(*linha)
+
+    @staticmethod
+    def _erro_de_unicidade(erro: sqlite3.IntegrityError) -> ValueError:
+        if "email" in str(erro):
+            return ValueError("Email já cadastrado")
+        return ValueError("Matrícula já cadastrada")
+
+    def _inserir(self, conexao, nome, matricula, tipo, email) -> Usuario:
+        data_registro = datetime.now().isoformat()
+        cursor = conexao.execute(
+            "INSERT INTO usuarios (nome, matricula, tipo, email, data_registro, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (nome, matricula, tipo.value, email or None, data_registro, StatusUsuario.ATIVO.value),
+        )
+        return Usuario.de_registro(cursor.lastrowid, nome, matricula, tipo.value, email,
+                                   data_registro, StatusUsuario.ATIVO.value)
+
+    def cadastrar(self, nome, matricula, tipo, email=None):
+        tipo = Usuario.validar(nome, matricula, tipo, email)
+        try:
+            with self.banco.transacao('usuarios') as conexao:
+                return self._inserir(conexao, nome, matricula, tipo, email)
+        except sqlite3.IntegrityError as e:
+            raise self._erro_de_unicidade(e)
+
+    def cadastrar_lote(self, itens):
+        resultados = [None] * len(itens)
+        validos = []
+        for i, item in enumerate(itens):
+            try:
+                tipo = Usuario.validar(item['nome'], item['matricula'], item['tipo'], item.get('email'))
+                validos.append((i, item['nome'], item['matricula'], tipo, item.get('email')))
+            except KeyError as e:
+                resultados[i] = ValueError(f"Campo ou tipo inválido: {e.args[0]}")
+            except (ValueError, TypeError, AttributeError) as e:
+                resultados[i] = ValueError(str(e))
+
+        # Uma transação para o lote todo; um INSERT recusado não desfaz os demais
+        with self.banco.transacao('usuarios') as conexao:
+            for i, nome, matricula, tipo, email in validos:
+                try:
+                    resultados[i] = self._inserir(conexao, nome, matricula, tipo, email)
+                except sqlite3.IntegrityError as e:
+                    resultados[i] = self._erro_de_unicidade(e)
+        return resultados
+
+    def versao(self):
+        return self.banco.versao('usuarios')
+
+    def listar(self):
+        return [self._usuario(l) for l in self.banco.consultar(
+            f"SELECT {self._COLUNAS} FROM usuarios ORDER BY id")]
+
+    def paginar(self, tipo=None, status=None, limite=None, apos=None, decrescente=False):
+        tipo, status = self._filtros(tipo, status)
+        condicoes = [(f"{coluna} = ?", (valor.value,))
+                     for coluna, valor in (("tipo", tipo), ("status", status)) if valor]
+        linhas, proximo = _pagina(self.banco, f"SELECT {self._COLUNAS} FROM usuarios", "id",
+                                  condicoes, limite, apos, decrescente)
+        return [self._usuario(l) for l in linhas], proximo
+
+    def _buscar(self, coluna: str, valor) -> Optional[Usuario]:
+        linhas = self.banco.consultar(f"SELECT {self._COLUNAS} FROM usuarios WHERE {coluna} = ?", (valor,))
+        return self._usuario(linhas[0]) if linhas else None
+
+    def buscar_por_id(self, usuario_id):
+        return self._buscar("id", usuario_id)
+
+    def buscar_por_matricula(self, matricula):
+        return self._buscar("matricula", matricula)
+
+    def buscar_por_email(self, email):
+        return self._buscar("email", email) if email else None
+
+    def atualizar(self, usuario_id, nome=None, email=None, status=None):
+        if nome and (len(nome) < 1 or len(nome) > 100):
+            raise ValueError("Nome deve ter entre 1 e 100 caracteres")
+        if email and not Usuario._validar_email(email):
+            raise ValueError("Email inválido")
+        if isinstance(status, str) and status:
+            status = StatusUsuario[status]
+
+        try:
+            with self.banco.transacao('usuarios') as conexao:
+                cursor = conexao.execute(
+                    "UPDATE usuarios SET nome = coalesce(?, nome), "
+                    "email = CASE WHEN ? THEN ? ELSE email END, status = coalesce(?, status) WHERE id = ?",
+                    (nome or None, email is not None, email or None, status.value if status else None, usuario_id),
+                )
+                if cursor.rowcount == 0:
+                    raise ValueError("Usuário não encontrado")
+        except sqlite3.IntegrityError as e:
+            raise self._erro_de_unicidade(e)
+        return self.buscar_por_id(usuario_id)
+
+    def remover(self, usuario_id):
+        with self.banco.transacao('usuarios') as conexao:
+            return conexao.execute("DELETE FROM usuarios WHERE id = ?", (usuario_id,)).rowcount > 0
+
+
+class LivroRepositorySQLite:
+    """
+    Mesma interface de LivroRepository sobre a tabela livros.
+
+    Os Livro devolvidos são cópias do registro: empréstimo e devolução
+    passam pelo LoanControllerSQLite, que altera o estoque no banco.
+    """
+
+    _COLUNAS = "id, titulo, autor, estoque, status"
+
+    def __init__(self, banco: BancoSQLite):
+        self.banco = banco
+
+    def _livros(self, sql: str, parametros: Sequence = ()) -> List[Livro]:
+        return [Livro(*linha) for linha in self.banco.consultar(sql, parametros)]
+
+    def __len__(self) -> int:
+        return self.banco.consultar("SELECT count(*) FROM livros")[0][0]
+
+    def __iter__(self) -> Iterator[Livro]:
+        return iter(self.listar())
+
+    def __contains__(self, id: int) -> bool:
+        return bool(self.banco.consultar("SELECT 1 FROM livros WHERE id = ?", (id,)))
+
+    @staticmethod
+    def _inserir(conexao, livro: Livro) -> None:
+        try:
+            conexao.execute(
+                "INSERT INTO livros (id, titulo, autor, estoque, status) VALUES (?, ?, ?, ?, ?)",
+                (livro.get_id(), livro.get_titulo(), livro.get_autor(), livro.get_estoque(), livro.get_status()),
+            )
+        except sqlite3.IntegrityError as e:
+            if "UNIQUE" in str(e):
+                raise ValueError("Livro com este id já cadastrado")
+            if "CHECK" in str(e):
+                raise ValueError("Estoque não pode ser negativo")
+            raise ValueError(str(e))
+
+    def adicionar(self, livro: Livro) -> None:
+        with self.banco.transacao('livros') as conexao:
+            self._inserir(conexao, livro)
+
+    def adicionar_lote(self, livros: List[Livro]) -> List[Union[Livro, ValueError]]:
+        resultados: List[Union[Livro, ValueError]] = []
+        vistos = set()
+        with self.banco.transacao('livros') as conexao:
+            for livro in livros:
+                if livro.get_id() in vistos:
+                    resultados.append(ValueError("Id repetido no lote"))
+                    continue
+                vistos.add(livro.get_id())
+                try:
+                    self._inserir(conexao, livro)
+                    resultados.append(livro)
+                except ValueError as e:
+                    resultados.append(e)
+        return resultados
+
+    def remover(self, id: int) -> Optional[Livro]:
+        livro = self.buscar(id)
+        if livro is not None:
+            with self.banco.transacao('livros') as conexao:
+                conexao.execute("DELETE FROM livros WHERE id = ?", (id,))
+        return livro
+
+    def buscar(self, id: int) -> Optional[Livro]:
+        livros = self._livros(f"SELECT {self._COLUNAS} FROM livros WHERE id = ?", (id,))
+        return livros[0] if livros else None
+
+    def listar(self) -> List[Livro]:
+        # rowid segue a ordem de inserção, como o repositório em memória
+        return self._livros(f"SELECT {self._COLUNAS} FROM livros ORDER BY rowid")
+
+    def por_autor(self, autor: str) -> List[Livro]:
+        return self._livros(f"SELECT {self._COLUNAS} FROM livros WHERE autor = ? ORDER BY rowid", (autor,))
+
+    def por_status(self, status: str) -> List[Livro]:
+        return self._livros(f"SELECT {self._COLUNAS} FROM livros WHERE status = ? ORDER BY rowid", (status,))
+
+    def paginar(self, autor: Optional[str] = None, status: Optional[str] = None,
+                limite: Optional[int] = None, apos: Optional[int] = None,
+                decrescente: bool = False) -> Tuple[List[Livro], Optional[int]]:
+        condicoes = [(f"{coluna} = ?", (valor,))
+                     for coluna, valor in (("autor", autor), ("status", status)) if valor is not None]
+        linhas, proximo = _pagina(self.banco, f"SELECT {self._COLUNAS} FROM livros", "id",
+                                  condicoes, limite, apos, decrescente)
+        return [Livro(*linha) for linha in linhas], proximo
+
+    def versao(self) -> str:
+        return self.banco.versao('livros')
+
+    def contar_por_status(self, status: str) -> int:
+        return self.banco.consultar("SELECT count(*) FROM livros WHERE status = ?", (status,))[0][0]
+
+    def total_exemplares(self) -> int:
+        return self.banco.consultar("SELECT coalesce(sum(estoque), 0) FROM livros")[0][0]
+
+    def verificar_contadores(self) -> None:
+        """Contadores saem do banco; confere só o que o esquema não garante"""
+        esgotados = self.banco.consultar(
+            "SELECT count(*) FROM livros WHERE estoque = 0 AND status = 'disponível'")[0][0]
+        assert esgotados == 0, f"{esgotados} livros sem estoque marcados como disponíveis"
+
+    def clear(self) -> None:
+        with self.banco.transacao('livros') as conexao:
+            conexao.execute("DELETE FROM livros")
+
+
+class LoanControllerSQLite(LoanController):
+    """
+    LoanController gravado na tabela emprestimos. Empréstimo e devolução
+    alteram estoque e empréstimo na mesma transação, e o UPDATE condicional
+    (estoque > 0) impede emprestar o mesmo exemplar duas vezes, mesmo entre
+    processos.
+    """
+
+    _COLUNAS = "loan_id, user_id, book_id, borrowed_at, returned_at"
+
+    def __init__(self, user_service: UsuarioService, banco: BancoSQLite):
+        super().__init__(user_service)
+        self.banco = banco
+
+    @staticmethod
+    def _loan(linha: tuple) -> Loan:
+        loan_id, user_id, book_id, borrowed_at, returned_at = linha
+        return Loan(loan_id, user_id, book_id, _ler_data(borrowed_at), _ler_data(returned_at))
+
+    def _loans_sql(self, sql: str, parametros: Sequence = ()) -> List[Loan]:
+        return [self._loan(linha) for linha in self.banco.consultar(sql, parametros)]
+
+    def _emprestar(self, conexao, user_id: int, book_id: int) -> Loan:
+        cursor = conexao.execute(
+            "UPDATE livros SET estoque = estoque - 1, "
+            "status = CASE WHEN estoque = 1 THEN 'emprestado' ELSE status END "
+            "WHERE id = ? AND estoque > 0",
+            (book_id,),
+        )
+        if cursor.rowcount == 0:
+            raise LoanError("Livro não disponível para empréstimo")
+        agora = datetime.now(timezone.utc)
+        cursor = conexao.execute(
+            "INSERT INTO emprestimos (user_id, book_id, borrowed_at) VALUES (?, ?, ?)",
+            (user_id, book_id, _gravar_data(agora)),
+        )
+        return Loan(cursor.lastrowid, user_id, book_id, agora)
+
+    def registrar_emprestimo(self, user_id: int, book_id: int) -> Loan:
+        self._validate_ids(user_id, book_id)
+        with self.banco.transacao('emprestimos', 'livros') as conexao:
+            return self._emprestar(conexao, user_id, book_id)
+
+    def registrar_emprestimos_lote(self, pares: Sequence[Tuple[int, int]]) -> List[Union[Loan, LoanError]]:
+        resultados: List[Union[Loan, LoanError, None]] = [None] * len(pares)
+        for i, (user_id, book_id) in enumerate(pares):
+            try:
+                self._validate_ids(user_id, book_id)
+            except LoanError as e:
+                resultados[i] = e
+        with self.banco.transacao('emprestimos', 'livros') as conexao:
+            for i, (user_id, book_id) in enumerate(pares):
+                if resultados[i] is None:
+                    try:
+                        resultados[i] = self._emprestar(conexao, user_id, book_id)
+                    except LoanError as e:
+                        resultados[i] = e
+        return resultados
+
+    def registrar_devolucao(self, user_id: int, book_id: int) -> Loan:
+        self._validate_ids(user_id, book_id)
+        with self.banco.transacao('emprestimos', 'livros') as conexao:
+            linha = conexao.execute(
+                f"SELECT {self._COLUNAS} FROM emprestimos "
+                "WHERE user_id = ? AND book_id = ? AND returned_at IS NULL ORDER BY loan_id LIMIT 1",
+                (user_id, book_id),
+            ).fetchone()
+            if linha is None:
+                raise LoanError("Empréstimo ativo não encontrado para devolução")
+            loan = self._loan(linha)
+            loan.returned_at = datetime.now(timezone.utc)
+            conexao.execute("UPDATE emprestimos SET returned_at = ? WHERE loan_id = ?",
+                            (_gravar_data(loan.returned_at), loan.loan_id))
+            conexao.execute("UPDATE livros SET estoque = estoque + 1, status = 'disponível' WHERE id = ?",
+                            (book_id,))
+        return loan
+
+    def versao(self) -> str:
+        return self.banco.versao('emprestimos')
+
+    def listar_emprestimos(self) -> List[Loan]:
+        return self._loans_sql(f"SELECT {self._COLUNAS} FROM emprestimos ORDER BY loan_id")
+
+    def emprestimos_do_usuario(self, user_id: int) -> List[Loan]:
+        return self._loans_sql(
+            f"SELECT {self._COLUNAS} FROM emprestimos WHERE user_id = ? ORDER BY loan_id", (user_id,))
+
+    def emprestimos_ativos_do_usuario(self, user_id: int) -> List[Loan]:
+        return self._loans_sql(
+            f"SELECT {self._COLUNAS} FROM emprestimos WHERE user_id = ? AND returned_at IS NULL "
+            "ORDER BY loan_id", (user_id,))
+
+    def emprestimos_do_livro(self, book_id: int) -> List[Loan]:
+        return self._loans_sql(
+            f"SELECT {self._COLUNAS} FROM emprestimos WHERE book_id = ? ORDER BY loan_id", (book_id,))
+
+    def emprestimos_ativos_do_livro(self, book_id: int) -> List[Loan]:
+        return self._loans_sql(
+            f"SELECT {self._COLUNAS} FROM emprestimos WHERE book_id = ? AND returned_at IS NULL "
+            "ORDER BY loan_id", (book_id,))
+
+    def emprestimo_ativo(self, user_id: int, book_id: int) -> Optional[Loan]:
+        loans = self._loans_sql(
+            f"SELECT {self._COLUNAS} FROM emprestimos "
+            "WHERE user_id = ? AND book_id = ? AND returned_at IS NULL ORDER BY loan_id LIMIT 1",
+            (user_id, book_id))
+        return loans[0] if loans else None
+
+    def emprestimos_no_periodo(self, inicio: datetime, fim: datetime,
+                               limite: Optional[int] = None, apos: Optional[int] = None) -> List[Loan]:
+        # Posição de partida: logo depois do cursor (borrowed_at, loan_id), se
+        # ele estiver dentro do período; senão, o início do período
+        desde, depois_de = _gravar_data(inicio), 0
+        if apos is not None:
+            anterior = self.banco.consultar("SELECT borrowed_at FROM emprestimos WHERE loan_id = ?", (apos,))
+            if not anterior:
+                raise NotFoundError("Cursor inválido")
+            if anterior[0][0] >= desde:
+                desde, depois_de = anterior[0][0], apos
+        return self._loans_sql(
+            f"SELECT {self._COLUNAS} FROM emprestimos "
+            "WHERE (borrowed_at, loan_id) > (?, ?) AND borrowed_at >= ? AND borrowed_at < ? "
+            "ORDER BY borrowed_at, loan_id LIMIT ?",
+            (desde, depois_de, _gravar_data(inicio), _gravar_data(fim), -1 if limite is None else limite))
+
+    def paginar(self, ativo: Optional[bool] = None, user_id: Optional[int] = None,
+                book_id: Optional[int] = None, limite: Optional[int] = None,
+                apos: Optional[int] = None, decrescente: bool = False) -> Tuple[List[Loan], Optional[int]]:
+        condicoes = [(f"{coluna} = ?", (valor,))
+                     for coluna, valor in (("user_id", user_id), ("book_id", book_id)) if valor is not None]
+        if ativo is not None:
+            condicoes.append((f"returned_at IS {'' if ativo else 'NOT '}NULL", ()))
+        linhas, proximo = _pagina(self.banco, f"SELECT {self._COLUNAS} FROM emprestimos", "loan_id",
+                                  condicoes, limite, apos, decrescente)
+        return [self._loan(linha) for linha in linhas], proximo
+
+    def obter_emprestimo(self, loan_id: int) -> Loan:
+        loans = self._loans_sql(f"SELECT {self._COLUNAS} FROM emprestimos WHERE loan_id = ?", (loan_id,))
+        if not loans:
+            raise NotFoundError("Empréstimo não encontrado")
+        return loans[0]
+
+    def _clear_all(self):
+        with self.banco.transacao('emprestimos', 'livros') as conexao:
+            conexao.execute("DELETE FROM emprestimos")
+            conexao.execute("DELETE FROM sqlite_sequence WHERE name = 'emprestimos'")
+
+
+class RelatorioServiceSQLite(RelatorioService):
+    """Relatórios calculados pelo SQLite (agregações e junções nos índices)"""
+
+    def __init__(self, loan_controller: LoanControllerSQLite, usuario_service: UsuarioService):
+        super().__init__(loan_controller, usuario_service)
+        self.banco = loan_controller.banco
+
+    def gerar_relatorio_livros_mais_emprestados(self) -> List[Dict]:
+        # Empate: o livro emprestado primeiro vem antes, como na versão em memória
+        linhas = self.banco.consultar(
+            "SELECT coalesce(l.titulo, 'Livro Desconhecido'), coalesce(l.autor, 'N/A'), e.total "
+            "FROM (SELECT book_id, count(*) AS total, min(loan_id) AS primeiro "
+            "      FROM emprestimos GROUP BY book_id) e "
+            "LEFT JOIN livros l ON l.id = e.book_id ORDER BY e.total DESC, e.primeiro")
+        return [{'titulo': titulo, 'autor': autor, 'totalEmprestimos': total}
+                for titulo, autor, total in linhas]
+
+    def gerar_relatorio_usuarios_mais_ativos(self) -> List[Dict]:
+        linhas = self.banco.consultar(
+            "SELECT coalesce(u.nome, 'Usuário Desconhecido'), coalesce(u.matricula, e.user_id), e.total "
+            "FROM (SELECT user_id, count(*) AS total, min(loan_id) AS primeiro "
+            "      FROM emprestimos GROUP BY user_id) e "
+            "LEFT JOIN usuarios u ON u.id = e.user_id ORDER BY e.total DESC, e.primeiro")
+        return [{'nome': nome, 'matricula': str(matricula), 'totalEmprestimos': total}
+                for nome, matricula, total in linhas]
+
+    def contar_status_acervo(self) -> Dict[str, int]:
+        disponivel, emprestado, total, exemplares = self.banco.consultar(
+            "SELECT count(*) FILTER (WHERE status = 'disponível'), "
+            "       count(*) FILTER (WHERE status = 'emprestado'), "
+            "       count(*), coalesce(sum(estoque), 0) FROM livros")[0]
+        return {'disponivel': disponivel, 'emprestado': emprestado, 'total': total, 'exemplares': exemplares}
+
+    def relatorio_detalhado_emprestimos(self) -> List[Dict]:
+        linhas = self.banco.consultar(
+            "SELECT e.loan_id, e.user_id, u.nome, u.matricula, e.book_id, l.titulo, l.autor, "
+            "       e.borrowed_at, e.returned_at "
+            "FROM emprestimos e LEFT JOIN usuarios u ON u.id = e.user_id "
+            "LEFT JOIN livros l ON l.id = e.book_id ORDER BY e.loan_id")
+        detalhes = []
+        for loan_id, user_id, nome, matricula, book_id, titulo, autor, borrowed_at, returned_at in linhas:
+            detalhes.append({
+                'loan_id': loan_id,
+                'usuario': {
+                    'id': user_id,
+                    'nome': nome if nome is not None else 'Usuário Desconhecido',
+                    'matricula': matricula if matricula is not None else 'N/A'
+                },
+                'livro': {
+                    'id': book_id,
+                    'titulo': titulo if titulo is not None else 'Livro Desconhecido',
+                    'autor': autor if autor is not None else 'N/A'
+                },
+                'borrowed_at': _ler_data(borrowed_at).isoformat(),
+                'returned_at': _ler_data(returned_at).isoformat() if returned_at else None,
+                'status': 'Devolvido' if returned_at else 'Em curso'
+            })
+        return detalhes
+
+
+def usar_sqlite(caminho: str) -> Tuple[UsuarioServiceSQLite, LoanControllerSQLite, RelatorioServiceSQLite]:
+    """
+    Abre (ou cria) o banco em `caminho`, passa as funções de livro do
+    módulo models.livro para ele e devolve os serviços prontos para uso
+    """
+    banco = BancoSQLite(caminho)
+    livro.usar_repositorio(LivroRepositorySQLite(banco))
+    usuarios = UsuarioServiceSQLite(banco)
+    emprestimos = LoanControllerSQLite(usuarios, banco)
+    return usuarios, emprestimos, RelatorioServiceSQLite(emprestimos, usuarios)
@@ -1,10 +1,29 @@
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import List, Dict, Optional, Tuple, Union
+from datetime import date, datetime, timedelta, timezone
 from .loan import LoanController
 from .usuario import UsuarioService
 from . import livro
 
 
+def _parse_data(valor: Union[str, date, datetime], fim: bool = False) -> datetime:
+    """
+    Converte 'AAAA-MM-DD' ou data/hora ISO 8601 num datetime em UTC.
+    Como fim de período, uma data sem hora vale até o fim do dia.
+    """
+    if isinstance(valor, str):
+        texto = valor.strip()
+        try:
+            valor = date.fromisoformat(texto) if len(texto) == 10 else datetime.fromisoformat(texto)
+        except ValueError:
+            raise ValueError(f"Data inválida: {valor!r} (use AAAA-MM-DD ou ISO 8601)")
+    if not isinstance(valor, datetime):
+        valor = datetime(valor.year, valor.month, valor.day, tzinfo=timezone.utc)
+        return valor + timedelta(days=1) if fim else valor
+    # Sem fuso, a hora é tomada como UTC (o mesmo fuso de borrowed_at)
+    valor = valor.replace(tzinfo=timezone.utc) if valor.tzinfo is None else valor.astimezone(timezone.utc)
+    return valor + timedelta(microseconds=1) if fim else valor
+
+
 class RelatorioService:
     """Serviço para geração de relatórios do sistema de biblioteca"""
     
@@ -64,29 +83,41 @@ class RelatorioService:
         
         return relatorio
     
-    def filtrar_por_periodo(self, data_inicio: str, data_fim: str) -> List[Dict]:
-        """Filtra empréstimos por período"""
-        emprestimos = self.loan_controller.listar_emprestimos()
-        filtrados = []
-        
-        for emp in emprestimos:
-            emp_date = emp.borrowed_at.date().isoformat()
-            if data_inicio <= emp_date <= data_fim:
-                filtrados.append(emp.to_dict())
+    def filtrar_por_periodo(self, data_inicio, data_fim) -> List[Dict]:
+        """Filtra empréstimos por período (datas inclusivas)"""
+        emprestimos, _ = self.paginar_por_periodo(data_inicio, data_fim)
+        return emprestimos
+    
+    def paginar_por_periodo(self, data_inicio, data_fim, limite: Optional[int] = None,
+                            cursor: Optional[int] = None) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Página de empréstimos do período em ordem cronológica e o cursor da
+        próxima página (None na última)
+        """
+        inicio = _parse_data(data_inicio)
+        fim = _parse_data(data_fim, fim=True)
+        if inicio >= fim:
+            raise ValueError("Data de início deve ser anterior ao fim")
+        if limite is not None and limite <= 0:
+            raise ValueError("limit deve ser positivo")
         
-        return filtrados
+        # Um item a mais indica se há próxima página
+        pedidos = None if limite is None else limite + 1
+        emprestimos = self.loan_controller.emprestimos_no_periodo(inicio, fim, pedidos, cursor)
+        proximo = None
+        if limite is not None and len(emprestimos) > limite:
+            emprestimos = emprestimos[:limite]
+            proximo = emprestimos[-1].loan_id
+        return [emp.to_dict() for emp in emprestimos], proximo
     
     def contar_status_acervo(self) -> Dict[str, int]:
         """Conta status do acervo (disponível vs emprestado)"""
-        livros_list = livro.listar_livros()
-        disponivel = sum(1 for l in livros_list if l.status == 'disponível')
-        emprestado = sum(1 for l in livros_list if l.status == 'emprestado')
-        total = len(livros_list)
-        
+        # Contadores mantidos pelo repositório de livros: sem varrer o acervo
         return {
-            'disponivel': disponivel,
-            'emprestado': emprestado,
-            'total': total
+            'disponivel': livro.contar_livros_por_status('disponível'),
+            'emprestado': livro.contar_livros_por_status('emprestado'),
+            'total': livro.contar_livros(),
+            'exemplares': livro.total_exemplares()
         }
     
     def relatorio_detalhado_emprestimos(self) -> List[Dict]:
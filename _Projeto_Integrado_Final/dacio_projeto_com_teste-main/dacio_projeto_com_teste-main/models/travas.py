@@ -0,0 +1,40 @@
+import threading
+from contextlib import contextmanager
+from typing import ContextManager, Hashable, Iterator
+
+
+class TravasListradas:
+    """
+    Conjunto fixo de locks repartido por chave (lock striping).
+
+    Operações sobre chaves diferentes quase sempre caem em locks diferentes
+    e correm em paralelo; a mesma chave cai sempre no mesmo lock.
+    """
+
+    def __init__(self, quantidade: int = 64):
+        self._travas = [threading.RLock() for _ in range(quantidade)]
+
+    def _indice(self, chave: Hashable) -> int:
+        return hash(chave) % len(self._travas)
+
+    def __call__(self, chave: Hashable) -> threading.RLock:
+        """Lock da chave"""
+        return self._travas[self._indice(chave)]
+
+    def varias(self, *chaves: Hashable) -> ContextManager[None]:
+        """Trava todas as chaves, sempre na mesma ordem para não haver deadlock"""
+        return self._travar(sorted({self._indice(chave) for chave in chaves}))
+
+    def todas(self) -> ContextManager[None]:
+        """Trava o conjunto inteiro, para operações em lote"""
+        return self._travar(range(len(self._travas)))
+
+    @contextmanager
+    def _travar(self, indices) -> Iterator[None]:
+        for i in indices:
+            self._travas[i].acquire()
+        try:
+            yield
+        finally:
+            for i in reversed(indices):
+                self._travas[i].release()
@@ -1,6 +1,12 @@
 from enum import Enum
 from datetime import datetime
 import re
+import threading
+from contextlib import contextmanager
+
+from .paginacao import IndiceOrdenado, paginar
+from .travas import TravasListradas
+from .versao import Versao
 
 
 class TipoUsuario(Enum):
@@ -21,8 +27,40 @@ class Usuario:
     """Modelo de dados para Usuário"""
     
     _contador_id = 0
+    _lock_id = threading.Lock()
     
     def __init__(self, nome, matricula, tipo, email=None, status=None):
+        tipo = self.validar(nome, matricula, tipo, email)
+        
+        # Gerar ID (atômico: requisições simultâneas não repetem id)
+        with Usuario._lock_id:
+            Usuario._contador_id += 1
+            self.id = Usuario._contador_id
+        
+        # Atribuir valores
+        self.nome = nome
+        self.matricula = matricula
+        self.tipo = tipo
+        self.email = email
+        self.dataRegistro = datetime.now().isoformat()
+        self.status = status if status else StatusUsuario.ATIVO
+    
+    @classmethod
+    def de_registro(cls, id, nome, matricula, tipo, email, dataRegistro, status):
+        """Reconstrói um usuário já gravado (sem validar nem gerar novo id)"""
+        usuario = cls.__new__(cls)
+        usuario.id = id
+        usuario.nome = nome
+        usuario.matricula = matricula
+        usuario.tipo = TipoUsuario(tipo)
+        usuario.email = email
+        usuario.dataRegistro = dataRegistro
+        usuario.status = StatusUsuario(status)
+        return usuario
+    
+    @staticmethod
+    def validar(nome, matricula, tipo, email=None):
+        """Valida os dados de um usuário e devolve o tipo como TipoUsuario"""
         # Validar nome
         if not nome or len(nome) < 1 or len(nome) > 100:
             raise ValueError("Nome deve ter entre 1 e 100 caracteres")
@@ -33,24 +71,13 @@ class Usuario:
         
         # Validar email (se fornecido)
         if email is not None and email != "":
-            if not self._validar_email(email):
+            if not Usuario._validar_email(email):
                 raise ValueError("Email inválido")
         
         # Validar tipo
         if isinstance(tipo, str):
             tipo = TipoUsuario[tipo]
-        
-        # Gerar ID
-        Usuario._contador_id += 1
-        self.id = Usuario._contador_id
-        
-        # Atribuir valores
-        self.nome = nome
-        self.matricula = matricula
-        self.tipo = tipo
-        self.email = email
-        self.dataRegistro = datetime.now().isoformat()
-        self.status = status if status else StatusUsuario.ATIVO
+        return tipo
     
     @staticmethod
     def _validar_email(email):
@@ -79,45 +106,153 @@ class UsuarioService:
     
     def __init__(self):
         self.usuarios = {}
-        self.matriculas = set()
-        self.emails = set()
+        # Índices matrícula -> usuário e email -> usuário
+        self.matriculas = {}
+        self.emails = {}
+        # Locks por matrícula, email e id: cadastros de chaves diferentes não se
+        # bloqueiam. Leituras são uma consulta de dict e dispensam lock.
+        self._travas = TravasListradas()
+        self._versao = Versao()
+        # Ids em ordem, no total e por tipo e status, para paginar com filtro
+        self._ids = IndiceOrdenado()
+        self._por_tipo = {}
+        self._por_status = {}
+        self._lock_indices = threading.Lock()
         Usuario._contador_id = 0  # Reset para testes
     
     def cadastrar(self, nome, matricula, tipo, email=None):
         """Cadastra novo usuário"""
-        # Verificar matrícula duplicada
-        if matricula in self.matriculas:
-            raise ValueError("Matrícula já cadastrada")
+        with self._travas.varias(('matricula', matricula), ('email', email)):
+            # Verificar matrícula duplicada
+            if matricula in self.matriculas:
+                raise ValueError("Matrícula já cadastrada")
+            
+            # Verificar email duplicado (se fornecido)
+            if email and email in self.emails:
+                raise ValueError("Email já cadastrado")
+            
+            # Criar usuário
+            usuario = Usuario(nome, matricula, tipo, email)
+            
+            # Armazenar
+            self.usuarios[usuario.id] = usuario
+            self.matriculas[matricula] = usuario
+            if email:
+                self.emails[email] = usuario
+            self._indexar(usuario)
+            self._versao.avancar()
         
-        # Verificar email duplicado (se fornecido)
-        if email and email in self.emails:
-            raise ValueError("Email já cadastrado")
+        return usuario
+    
+    def cadastrar_lote(self, itens):
+        """
+        Cadastra vários usuários (dicts com nome, matricula, tipo e email).
         
-        # Criar usuário
-        usuario = Usuario(nome, matricula, tipo, email)
+        Todos os itens são validados antes de qualquer alteração, e os válidos
+        entram numa única seção crítica. Devolve, na ordem dos itens, o
+        usuário criado ou o ValueError que recusou o item.
+        """
+        resultados = [None] * len(itens)
+        validos = []
+        matriculas, emails = set(), set()
+        for i, item in enumerate(itens):
+            try:
+                nome, matricula, email = item['nome'], item['matricula'], item.get('email')
+                tipo = Usuario.validar(nome, matricula, item['tipo'], email)
+            except KeyError as e:
+                resultados[i] = ValueError(f"Campo ou tipo inválido: {e.args[0]}")
+                continue
+            except (ValueError, TypeError, AttributeError) as e:
+                resultados[i] = ValueError(str(e))
+                continue
+            if matricula in matriculas:
+                resultados[i] = ValueError("Matrícula repetida no lote")
+            elif email and email in emails:
+                resultados[i] = ValueError("Email repetido no lote")
+            else:
+                matriculas.add(matricula)
+                if email:
+                    emails.add(email)
+                validos.append((i, nome, matricula, tipo, email))
         
-        # Armazenar
-        self.usuarios[usuario.id] = usuario
-        self.matriculas.add(matricula)
-        if email:
-            self.emails.add(email)
+        with self._travas.todas():
+            for i, nome, matricula, tipo, email in validos:
+                if matricula in self.matriculas:
+                    resultados[i] = ValueError("Matrícula já cadastrada")
+                elif email and email in self.emails:
+                    resultados[i] = ValueError("Email já cadastrado")
+                else:
+                    usuario = Usuario(nome, matricula, tipo, email)
+                    self.usuarios[usuario.id] = usuario
+                    self.matriculas[matricula] = usuario
+                    if email:
+                        self.emails[email] = usuario
+                    self._indexar(usuario)
+                    resultados[i] = usuario
+            self._versao.avancar()
         
-        return usuario
+        return resultados
+    
+    def versao(self):
+        """Muda a cada cadastro, atualização ou remoção"""
+        return str(self._versao)
     
     def listar(self):
         """Lista todos os usuários"""
         return list(self.usuarios.values())
     
+    def paginar(self, tipo=None, status=None, limite=None, apos=None, decrescente=False):
+        """
+        Usuários em ordem de id a partir do cursor `apos`, filtrados por tipo
+        e status, e o cursor da próxima página (None na última). Percorre o
+        menor dos índices envolvidos, nunca a lista inteira.
+        """
+        tipo, status = self._filtros(tipo, status)
+        with self._lock_indices:
+            indices = [self._ids]
+            if tipo:
+                indices.append(self._por_tipo.get(tipo, IndiceOrdenado()))
+            if status:
+                indices.append(self._por_status.get(status, IndiceOrdenado()))
+            filtro = None
+            if tipo and status:
+                filtro = lambda id: self.usuarios[id].tipo == tipo and self.usuarios[id].status == status
+            ids, proximo = paginar(min(indices, key=len).chaves, apos, limite, decrescente, filtro)
+            return [self.usuarios[id] for id in ids], proximo
+    
+    @staticmethod
+    def _filtros(tipo, status):
+        """Converte os filtros de paginar (nome ou enum) para TipoUsuario e StatusUsuario"""
+        try:
+            tipo = TipoUsuario[tipo] if isinstance(tipo, str) else tipo
+            status = StatusUsuario[status] if isinstance(status, str) else status
+        except KeyError as e:
+            raise ValueError(f"Valor inválido: {e.args[0]}")
+        return tipo, status
+    
+    def _indexar(self, usuario):
+        with self._lock_indices:
+            self._ids.adicionar(usuario.id)
+            self._por_tipo.setdefault(usuario.tipo, IndiceOrdenado()).adicionar(usuario.id)
+            self._por_status.setdefault(usuario.status, IndiceOrdenado()).adicionar(usuario.id)
+    
+    def _desindexar(self, usuario):
+        with self._lock_indices:
+            self._ids.remover(usuario.id)
+            self._por_tipo[usuario.tipo].remover(usuario.id)
+            self._por_status[usuario.status].remover(usuario.id)
+    
     def buscar_por_id(self, usuario_id):
         """Busca usuário por ID"""
         return self.usuarios.get(usuario_id)
     
     def buscar_por_matricula(self, matricula):
         """Busca usuário por matrícula"""
-        for usuario in self.usuarios.values():
-            if usuario.matricula == matricula:
-                return usuario
-        return None
+        return self.matriculas.get(matricula)
+    
+    def buscar_por_email(self, email):
+        """Busca usuário por email"""
+        return self.emails.get(email) if email else None
     
     def atualizar(self, usuario_id, nome=None, email=None, status=None):
         """Atualiza dados de usuário existente"""
@@ -126,32 +261,39 @@ class UsuarioService:
         if not usuario:
             raise ValueError("Usuário não encontrado")
         
-        # Atualizar campos fornecidos
-        if nome:
-            if len(nome) < 1 or len(nome) > 100:
-                raise ValueError("Nome deve ter entre 1 e 100 caracteres")
-            usuario.nome = nome
+        # Validar tudo antes de alterar: um erro não deixa o usuário pela metade
+        if nome and (len(nome) < 1 or len(nome) > 100):
+            raise ValueError("Nome deve ter entre 1 e 100 caracteres")
         
-        if email is not None:
-            # Remover email antigo do conjunto
-            if usuario.email:
-                self.emails.discard(usuario.email)
+        if email and not Usuario._validar_email(email):
+            raise ValueError("Email inválido")
+        
+        if isinstance(status, str) and status:
+            status = StatusUsuario[status]
+        
+        with self._travar_usuario(usuario, ('email', email)):
+            if email:
+                dono = self.emails.get(email)
+                if dono is not None and dono is not usuario:
+                    raise ValueError("Email já cadastrado")
             
-            # Validar e adicionar novo email
-            if email and not Usuario._validar_email(email):
-                raise ValueError("Email inválido")
+            # Atualizar campos fornecidos
+            if nome:
+                usuario.nome = nome
             
-            if email and email in self.emails:
-                raise ValueError("Email já cadastrado")
+            if email is not None:
+                if usuario.email:
+                    self.emails.pop(usuario.email, None)
+                usuario.email = email
+                if email:
+                    self.emails[email] = usuario
             
-            usuario.email = email
-            if email:
-                self.emails.add(email)
-        
-        if status:
-            if isinstance(status, str):
-                status = StatusUsuario[status]
-            usuario.status = status
+            if status and status != usuario.status:
+                with self._lock_indices:
+                    self._por_status[usuario.status].remover(usuario.id)
+                    self._por_status.setdefault(status, IndiceOrdenado()).adicionar(usuario.id)
+                    usuario.status = status
+            self._versao.avancar()
         
         return usuario
     
@@ -162,13 +304,31 @@ class UsuarioService:
         if not usuario:
             return False
         
-        # Remover dos conjuntos
-        self.matriculas.discard(usuario.matricula)
-        if usuario.email:
-            self.emails.discard(usuario.email)
-        
-        # Remover do dicionário
-        del self.usuarios[usuario_id]
+        with self._travar_usuario(usuario, ('matricula', usuario.matricula)):
+            if self.usuarios.get(usuario_id) is not usuario:
+                return False  # Removido por outra requisição
+            
+            # Remover dos índices
+            self._desindexar(usuario)
+            self.matriculas.pop(usuario.matricula, None)
+            if usuario.email:
+                self.emails.pop(usuario.email, None)
+            
+            # Remover do dicionário
+            del self.usuarios[usuario_id]
+            self._versao.avancar()
         
         return True
-
+    
+    @contextmanager
+    def _travar_usuario(self, usuario, *chaves):
+        """
+        Trava o usuário, o email atual dele e `chaves` de uma só vez. Se o
+        email mudar enquanto espera os locks, tenta de novo com o novo email.
+        """
+        while True:
+            email = usuario.email
+            with self._travas.varias(('id', usuario.id), ('email', email), *chaves):
+                if usuario.email == email:
+                    yield
+                    return
@@ -0,0 +1,27 @@
+import threading
+import uuid
+
+
+class Versao:
+    """
+    Versão de um repositório: cresce a cada alteração e vira o ETag das
+    respostas que dependem dele. A época aleatória distingue instâncias,
+    então um contador que recomeça do zero (reinício do processo) não
+    repete uma versão antiga.
+    """
+
+    def __init__(self):
+        self.epoca = uuid.uuid4().hex[:8]
+        self._valor = 0
+        self._lock = threading.Lock()
+
+    @property
+    def valor(self) -> int:
+        return self._valor
+
+    def avancar(self) -> None:
+        with self._lock:
+            self._valor += 1
+
+    def __str__(self) -> str:
+        return f"{self.epoca}-{self._valor}"
@@ -4,9 +4,10 @@ Testes básicos de integração do sistema de biblioteca
 import unittest
 from models import (
     UsuarioService, TipoUsuario, StatusUsuario,
-    Livro, adicionar_livro, listar_livros, remover_livro, buscar_livro_por_id,
+    Livro, LivroRepository, adicionar_livro, listar_livros, remover_livro, buscar_livro_por_id,
+    listar_livros_por_autor, listar_livros_por_status, paginar_livros,
     LoanController, LoanError, ValidationError, NotFoundError,
-    RelatorioService
+    RelatorioService, usar_sqlite, usar_repositorio
 )
 
 
@@ -141,8 +142,511 @@ class TestSistemaIntegrado(unittest.TestCase):
         self.assertEqual(status['disponivel'], 1)  # livro 2 ainda disponível
         self.assertEqual(status['emprestado'], 1)  # livro 1 emprestado (estoque 0)
         self.assertEqual(status['total'], 2)
+        self.assertEqual(status['exemplares'], 1)
 
 
+
+    def test_devolucao_pelo_indice_de_ativos(self):
+        """Devolução encontra o empréstimo ativo mais antigo do par usuário/livro"""
+        adicionar_livro(Livro(id=40, titulo="Livro", autor="Autor", estoque=5))
+        adicionar_livro(Livro(id=41, titulo="Outro", autor="Autor", estoque=5))
+        primeiro = self.loan_controller.registrar_emprestimo(self.usuario.id, 40)
+        segundo = self.loan_controller.registrar_emprestimo(self.usuario.id, 40)
+        self.loan_controller.registrar_emprestimo(self.usuario.id, 41)
+
+        devolvido = self.loan_controller.registrar_devolucao(self.usuario.id, 40)
+
+        self.assertEqual(devolvido.loan_id, primeiro.loan_id)
+        self.assertEqual(self.loan_controller.emprestimo_ativo(self.usuario.id, 40), segundo)
+        self.assertEqual([l.book_id for l in self.loan_controller.emprestimos_ativos_do_usuario(self.usuario.id)],
+                         [40, 41])
+        self.assertEqual(len(self.loan_controller.emprestimos_do_usuario(self.usuario.id)), 3)
+        self.assertEqual(self.loan_controller.emprestimos_ativos_do_livro(40), [segundo])
+        self.assertEqual(len(self.loan_controller.emprestimos_do_livro(40)), 2)
+
+        self.loan_controller.registrar_devolucao(self.usuario.id, 40)
+        with self.assertRaises(LoanError):
+            self.loan_controller.registrar_devolucao(self.usuario.id, 40)
+
+    def test_filtrar_por_periodo_paginado(self):
+        """Período por datas inclusivas, paginado por cursor"""
+        from datetime import datetime, timedelta, timezone
+        for i in range(60, 63):
+            adicionar_livro(Livro(id=i, titulo=f"Livro {i}", autor="Autor", estoque=1))
+            self.loan_controller.registrar_emprestimo(self.usuario.id, i)
+        hoje = datetime.now(timezone.utc).date()
+        ontem = (hoje - timedelta(days=1)).isoformat()
+
+        self.assertEqual(len(self.relatorio_service.filtrar_por_periodo(hoje.isoformat(), hoje.isoformat())), 3)
+        self.assertEqual(self.relatorio_service.filtrar_por_periodo(ontem, ontem), [])
+
+        pagina, cursor = self.relatorio_service.paginar_por_periodo(ontem, hoje.isoformat(), limite=2)
+        self.assertEqual([e['book_id'] for e in pagina], [60, 61])
+        pagina, cursor = self.relatorio_service.paginar_por_periodo(ontem, hoje.isoformat(), limite=2, cursor=cursor)
+        self.assertEqual([e['book_id'] for e in pagina], [62])
+        self.assertIsNone(cursor)
+
+        with self.assertRaises(ValueError):
+            self.relatorio_service.filtrar_por_periodo("31/12/2024", hoje.isoformat())
+
+
+class TestRotas(unittest.TestCase):
+
+    def setUp(self):
+        import app as app_module
+        import models.livro as livro_module
+        livro_module._livros.clear()
+        # Estado novo a cada teste: as rotas usam os globais do módulo
+        app_module.service = UsuarioService()
+        app_module.loan_controller = LoanController(app_module.service)
+        app_module.relatorio_service = RelatorioService(app_module.loan_controller, app_module.service)
+        self.client = app_module.app.test_client()
+        self.usuario = app_module.service.cadastrar("Rota Usuario", "ROTA00001", "ALUNO")
+        adicionar_livro(Livro(id=50, titulo="Livro", autor="Autor", estoque=2))
+
+    def test_emprestimos_por_usuario_e_por_livro(self):
+        """Rotas de empréstimos por usuário e por livro, com filtro de ativos"""
+        self.client.post('/api/emprestimos', json={'user_id': self.usuario.id, 'book_id': 50})
+        self.client.post('/api/emprestimos', json={'user_id': self.usuario.id, 'book_id': 50})
+        self.client.post('/api/devolucoes', json={'user_id': self.usuario.id, 'book_id': 50})
+
+        todos = self.client.get(f'/api/usuarios/{self.usuario.id}/emprestimos').get_json()
+        ativos = self.client.get('/api/livros/50/emprestimos?ativo=1').get_json()
+        devolvidos = self.client.get(f'/api/usuarios/{self.usuario.id}/emprestimos?ativo=false').get_json()
+
+        self.assertEqual(len(todos), 2)
+        self.assertEqual(len(ativos), 1)
+        self.assertIsNone(ativos[0]['returned_at'])
+        self.assertEqual(len(devolvidos), 1)
+        self.assertIsNotNone(devolvidos[0]['returned_at'])
+        for url in (f'/api/usuarios/{self.usuario.id}/emprestimos?ativo=talvez', '/api/livros/50/emprestimos?ativo=x'):
+            self.assertEqual(self.client.get(url).status_code, 400, url)
+        self.assertEqual(self.client.get('/api/usuarios/99999/emprestimos').status_code, 404)
+        self.assertEqual(self.client.get('/api/livros/99999/emprestimos').status_code, 404)
+
+    def test_busca_usuario_por_matricula(self):
+        """GET /api/usuarios?matricula= devolve só o usuário da matrícula"""
+        resposta = self.client.get('/api/usuarios?matricula=ROTA00001').get_json()
+        self.assertEqual([u['id'] for u in resposta], [self.usuario.id])
+        self.assertEqual(self.client.get('/api/usuarios?matricula=NADA00000').get_json(), [])
+
+    def test_relatorio_por_periodo_com_cursor(self):
+        """limit devolve X-Next-Cursor até a última página"""
+        from datetime import datetime, timezone
+        self.client.post('/api/emprestimos', json={'user_id': self.usuario.id, 'book_id': 50})
+        self.client.post('/api/emprestimos', json={'user_id': self.usuario.id, 'book_id': 50})
+        hoje = datetime.now(timezone.utc).date().isoformat()
+        url = f'/api/relatorios/por-periodo?inicio={hoje}&fim={hoje}&limit=1'
+
+        primeira = self.client.get(url)
+        segunda = self.client.get(url + '&cursor=' + primeira.headers['X-Next-Cursor'])
+        self.assertEqual(len(primeira.get_json()) + len(segunda.get_json()), 2)
+        self.assertNotIn('X-Next-Cursor', segunda.headers)
+        self.assertEqual(self.client.get(f'/api/relatorios/por-periodo?inicio=ontem&fim={hoje}').status_code, 400)
+
+    def test_rotas_de_lote(self):
+        """Rotas /lote devolvem o resultado por item: 201 se tudo entrou, 207 se não"""
+        resposta = self.client.post('/api/usuarios/lote', json=[
+            {'nome': "Lote Um", 'matricula': "LOTE00001", 'tipo': "ALUNO"},
+            {'nome': "Lote Dois", 'matricula': "LOTE00002", 'tipo': "PROFESSOR"},
+        ])
+        self.assertEqual(resposta.status_code, 201)
+        ids = [item['id'] for item in resposta.get_json()['resultados']]
+
+        resposta = self.client.post('/api/livros/lote', json={'livros': [
+            {'id': 51, 'titulo': "A", 'autor': "X", 'estoque': 1},
+            {'id': 50, 'titulo': "B", 'autor': "Y", 'estoque': 1},  # já existe
+            {'id': 52, 'titulo': "C", 'autor': "Z"},  # sem estoque
+        ]})
+        corpo = resposta.get_json()
+        self.assertEqual(resposta.status_code, 207)
+        self.assertEqual((corpo['criados'], corpo['recusados']), (1, 2))
+        self.assertIn('erro', corpo['resultados'][2])
+
+        resposta = self.client.post('/api/emprestimos/lote', json=[
+            {'user_id': ids[0], 'book_id': 51},
+            {'user_id': ids[1], 'book_id': 51},  # único exemplar já saiu no item anterior
+            {'user_id': 99999, 'book_id': 50},
+        ])
+        resultados = resposta.get_json()['resultados']
+        self.assertEqual(resposta.status_code, 207)
+        self.assertIn('loan_id', resultados[0])
+        self.assertEqual(resultados[2]['erro'], "Usuário não encontrado")
+        self.assertEqual(buscar_livro_por_id(51).get_estoque(), 0)
+        self.assertEqual(self.client.post('/api/emprestimos/lote', json={'x': 1}).status_code, 400)
+
+    def test_get_condicional_com_etag(self):
+        """If-None-Match com a versão atual dá 304 sem calcular o relatório"""
+        import app as app_module
+        primeira = self.client.get('/api/livros')
+        etag = primeira.headers['ETag']
+        self.assertEqual(self.client.get('/api/livros', headers={'If-None-Match': etag}).status_code, 304)
+        # Proxies que comprimem a resposta enfraquecem o ETag
+        self.assertEqual(self.client.get('/api/livros', headers={'If-None-Match': f'W/{etag}'}).status_code, 304)
+
+        relatorio = self.client.get('/api/relatorios/status-acervo')
+        calcular = app_module.relatorio_service.contar_status_acervo
+        app_module.relatorio_service.contar_status_acervo = None  # falharia se fosse chamado
+        try:
+            resposta = self.client.get('/api/relatorios/status-acervo',
+                                       headers={'If-None-Match': relatorio.headers['ETag']})
+        finally:
+            app_module.relatorio_service.contar_status_acervo = calcular
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(resposta.headers['ETag'], relatorio.headers['ETag'])
+
+        # Um empréstimo muda livros e empréstimos; usuários continuam iguais
+        usuarios = self.client.get('/api/usuarios').headers['ETag']
+        self.client.post('/api/emprestimos', json={'user_id': self.usuario.id, 'book_id': 50})
+        self.assertEqual(self.client.get('/api/livros', headers={'If-None-Match': etag}).status_code, 200)
+        self.assertEqual(self.client.get('/api/usuarios', headers={'If-None-Match': usuarios}).status_code, 304)
+
+    def test_listagens_paginadas_com_filtros(self):
+        """limit/cursor/sort e filtros nas listagens, com X-Next-Cursor até a última página"""
+        import app as app_module
+        for i in range(2, 6):
+            app_module.service.cadastrar(f"Rota {i}", f"ROTA0000{i}", "PROFESSOR" if i % 2 else "ALUNO")
+        app_module.service.atualizar(self.usuario.id, status="SUSPENSO")
+
+        ids, cursor = [], None
+        while True:
+            url = '/api/usuarios?tipo=ALUNO&limit=1' + (f'&cursor={cursor}' if cursor else '')
+            resposta = self.client.get(url)
+            ids += [u['id'] for u in resposta.get_json()]
+            cursor = resposta.headers.get('X-Next-Cursor')
+            if cursor is None:
+                break
+        self.assertEqual(ids, [1, 2, 4])
+        suspensos = self.client.get('/api/usuarios?tipo=ALUNO&status=SUSPENSO').get_json()
+        self.assertEqual([u['id'] for u in suspensos], [1])
+        decrescente = self.client.get('/api/usuarios?sort=-id&limit=2')
+        self.assertEqual([u['id'] for u in decrescente.get_json()], [5, 4])
+        self.assertEqual(decrescente.headers['X-Next-Cursor'], '4')
+
+        for i, autor in [(10, "Outro"), (30, "Autor"), (20, "Autor")]:
+            adicionar_livro(Livro(id=i, titulo="Livro", autor=autor, estoque=1))
+        livros = self.client.get('/api/livros?autor=Autor&limit=5').get_json()
+        self.assertEqual([l['id'] for l in livros], [20, 30, 50])
+
+        self.client.post('/api/emprestimos', json={'user_id': 2, 'book_id': 10})
+        self.client.post('/api/emprestimos', json={'user_id': 2, 'book_id': 20})
+        self.client.post('/api/devolucoes', json={'user_id': 2, 'book_id': 10})
+        ativos = self.client.get('/api/emprestimos?ativo=true').get_json()
+        devolvidos = self.client.get('/api/emprestimos?ativo=false&user_id=2').get_json()
+        self.assertEqual([l['book_id'] for l in ativos], [20])
+        self.assertEqual([l['book_id'] for l in devolvidos], [10])
+        self.assertEqual(self.client.get('/api/livros?status=emprestado').get_json()[0]['id'], 20)
+
+        for url in ('/api/usuarios?sort=nome', '/api/usuarios?tipo=REITOR', '/api/livros?limit=0',
+                    '/api/emprestimos?ativo=talvez', '/api/emprestimos?cursor=x'):
+            self.assertEqual(self.client.get(url).status_code, 400, url)
+
+
+class TestUsuarioService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = UsuarioService()
+        self.ana = self.service.cadastrar("Ana", "MAT00001", "ALUNO", "ana@email.com")
+        self.bia = self.service.cadastrar("Bia", "MAT00002", "PROFESSOR", "bia@email.com")
+
+    def test_busca_por_matricula_e_email(self):
+        """Índices de matrícula e email acompanham cadastro e remoção"""
+        self.assertIs(self.service.buscar_por_matricula("MAT00002"), self.bia)
+        self.assertIs(self.service.buscar_por_email("ana@email.com"), self.ana)
+        self.service.remover(self.ana.id)
+        self.assertIsNone(self.service.buscar_por_matricula("MAT00001"))
+        self.assertIsNone(self.service.buscar_por_email("ana@email.com"))
+        self.assertIsNotNone(self.service.cadastrar("Ana", "MAT00001", "ALUNO", "ana@email.com"))
+
+    def test_atualizar_email(self):
+        """Troca de email move o índice; erro de validação não perde o email antigo"""
+        self.service.atualizar(self.ana.id, email="ana@novo.com")
+        self.assertIs(self.service.buscar_por_email("ana@novo.com"), self.ana)
+        self.assertIsNone(self.service.buscar_por_email("ana@email.com"))
+
+        with self.assertRaises(ValueError):
+            self.service.atualizar(self.ana.id, email="bia@email.com")
+        with self.assertRaises(ValueError):
+            self.service.atualizar(self.ana.id, nome="Ana Maria", email="invalido")
+        self.assertEqual(self.ana.nome, "Ana")
+        self.assertIs(self.service.buscar_por_email("ana@novo.com"), self.ana)
+        # O próprio email atual pode ser reenviado
+        self.service.atualizar(self.ana.id, email="ana@novo.com")
+        self.assertIs(self.service.buscar_por_email("ana@novo.com"), self.ana)
+
+    def test_cadastrar_lote(self):
+        """Lote valida tudo antes e devolve o resultado de cada item"""
+        resultados = self.service.cadastrar_lote([
+            {'nome': "Caio", 'matricula': "MAT00003", 'tipo': "ALUNO"},
+            {'nome': "Dora", 'matricula': "MAT00001", 'tipo': "ALUNO"},  # já cadastrada
+            {'nome': "Eva", 'matricula': "MAT00003", 'tipo': "ALUNO"},  # repetida no lote
+            {'nome': "Fábio", 'matricula': "MAT00004", 'tipo': "REITOR"},
+            {'nome': "Gil", 'matricula': "MAT00005", 'tipo': "FUNCIONARIO", 'email': "gil@email.com"},
+        ])
+        self.assertEqual([type(r).__name__ for r in resultados],
+                         ["Usuario", "ValueError", "ValueError", "ValueError", "Usuario"])
+        self.assertIs(self.service.buscar_por_matricula("MAT00003"), resultados[0])
+        self.assertIs(self.service.buscar_por_email("gil@email.com"), resultados[4])
+        self.assertEqual(len(self.service.listar()), 4)
+
+
+class TestLivroRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = LivroRepository()
+        for i, autor in [(3, "Autor A"), (1, "Autor B"), (2, "Autor A")]:
+            self.repo.adicionar(Livro(id=i, titulo=f"Livro {i}", autor=autor, estoque=1))
+
+    def test_ordem_de_insercao_e_busca_por_id(self):
+        """Listagem mantém a ordem de inserção; busca e remoção por id"""
+        self.assertEqual([l.id for l in self.repo.listar()], [3, 1, 2])
+        self.assertEqual(self.repo.buscar(1).titulo, "Livro 1")
+        self.repo.remover(1)
+        self.assertIsNone(self.repo.buscar(1))
+        self.assertEqual([l.id for l in self.repo.listar()], [3, 2])
+        self.assertEqual([l.id for l in self.repo.por_autor("Autor B")], [])
+
+    def test_id_duplicado(self):
+        """Id repetido é recusado"""
+        with self.assertRaises(ValueError):
+            self.repo.adicionar(Livro(id=1, titulo="Outro", autor="X", estoque=1))
+
+    def test_indices_por_autor_e_status(self):
+        """Índice por status acompanha emprestar/devolver"""
+        self.assertEqual([l.id for l in self.repo.por_autor("Autor A")], [3, 2])
+        self.repo.buscar(2).emprestar()
+        self.assertEqual([l.id for l in self.repo.por_status("emprestado")], [2])
+        self.assertEqual([l.id for l in self.repo.por_status("disponível")], [3, 1])
+        self.repo.buscar(2).devolver()
+        self.assertEqual(self.repo.por_status("emprestado"), [])
+
+    def test_contadores_do_acervo(self):
+        """Contadores acompanham empréstimo, devolução, inclusão e remoção"""
+        self.assertEqual(self.repo.total_exemplares(), 3)
+        self.repo.buscar(3).emprestar()
+        self.repo.buscar(3).devolver()
+        self.repo.buscar(1).emprestar()
+        self.repo.adicionar(Livro(id=4, titulo="Livro 4", autor="Autor C", estoque=5))
+        self.repo.remover(2)
+
+        self.assertEqual(self.repo.contar_por_status("disponível"), 2)
+        self.assertEqual(self.repo.contar_por_status("emprestado"), 1)
+        self.assertEqual(self.repo.total_exemplares(), 6)
+        self.repo.verificar_contadores()
+
+        self.repo._exemplares += 1
+        with self.assertRaises(AssertionError):
+            self.repo.verificar_contadores()
+
+    def test_funcoes_do_modulo(self):
+        """As funções do módulo continuam funcionando sobre o repositório global"""
+        import models.livro as livro_module
+        livro_module._livros.clear()
+        adicionar_livro(Livro(id=7, titulo="Livro 7", autor="Autor C", estoque=1))
+        self.assertEqual(listar_livros_por_autor("Autor C")[0].id, 7)
+        self.assertEqual(listar_livros_por_status("disponível")[0].id, 7)
+        remover_livro(7)
+        self.assertEqual(listar_livros(), [])
+
+
+
+class TestPersistenciaSQLite(unittest.TestCase):
+
+    def setUp(self):
+        import models.livro as livro_module
+        import os
+        import tempfile
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.diretorio.name, "biblioteca.db")
+        self.repositorio_em_memoria = livro_module._livros
+        self.abrir()
+
+    def tearDown(self):
+        usar_repositorio(self.repositorio_em_memoria)
+        self.usuarios.banco.fechar()
+        self.diretorio.cleanup()
+
+    def abrir(self):
+        self.usuarios, self.emprestimos, self.relatorios = usar_sqlite(self.caminho)
+
+    def test_dados_sobrevivem_ao_reinicio(self):
+        """Usuários, livros e empréstimos continuam no arquivo após reabrir o banco"""
+        usuario = self.usuarios.cadastrar("Persistente", "PERS00001", "ALUNO", "p@email.com")
+        adicionar_livro(Livro(id=1, titulo="Livro", autor="Autor", estoque=1))
+        loan = self.emprestimos.registrar_emprestimo(usuario.id, 1)
+        self.usuarios.banco.fechar()
+
+        self.abrir()
+        self.assertEqual(self.usuarios.buscar_por_matricula("PERS00001").id, usuario.id)
+        self.assertEqual(self.usuarios.buscar_por_email("p@email.com").nome, "Persistente")
+        self.assertEqual(buscar_livro_por_id(1).get_status(), "emprestado")
+        self.assertEqual(self.emprestimos.emprestimo_ativo(usuario.id, 1).loan_id, loan.loan_id)
+        with self.assertRaises(LoanError):
+            self.emprestimos.registrar_emprestimo(usuario.id, 1)
+        self.emprestimos.registrar_devolucao(usuario.id, 1)
+        self.assertEqual(buscar_livro_por_id(1).get_estoque(), 1)
+        with self.assertRaises(ValueError):
+            self.usuarios.cadastrar("Outro", "PERS00001", "ALUNO")
+
+    def test_versoes_compartilhadas_pelo_arquivo(self):
+        """Outra conexão ao mesmo arquivo (outro processo) vê a versão avançar"""
+        from models import BancoSQLite
+        outro = BancoSQLite(self.caminho)
+        try:
+            antes = outro.versao('livros')
+            adicionar_livro(Livro(id=1, titulo="Livro", autor="Autor", estoque=1))
+            depois = outro.versao('livros')
+            self.assertNotEqual(antes, depois)
+            self.assertEqual(depois, self.usuarios.banco.versao('livros'))
+            self.assertEqual(outro.versao('usuarios'), self.usuarios.versao())
+        finally:
+            outro.fechar()
+
+    def test_relatorios_em_sql_iguais_aos_em_memoria(self):
+        """Os mesmos empréstimos geram os mesmos relatórios em memória e no SQLite"""
+        import models.livro as livro_module
+
+        def popular(usuarios, emprestimos):
+            ana = usuarios.cadastrar("Ana", "REL00001", "ALUNO")
+            bia = usuarios.cadastrar("Bia", "REL00002", "PROFESSOR")
+            for i, estoque in [(1, 1), (2, 3), (3, 2)]:
+                adicionar_livro(Livro(id=i, titulo=f"Livro {i}", autor="Autor", estoque=estoque))
+            for usuario, livro in [(ana, 2), (bia, 2), (bia, 1), (ana, 3), (bia, 3)]:
+                emprestimos.registrar_emprestimo(usuario.id, livro)
+            emprestimos.registrar_devolucao(bia.id, 2)
+
+        def relatorios(servico):
+            detalhado = servico.relatorio_detalhado_emprestimos()
+            for item in detalhado:
+                del item['borrowed_at'], item['returned_at']
+            return (servico.gerar_relatorio_livros_mais_emprestados(),
+                    servico.gerar_relatorio_usuarios_mais_ativos(),
+                    servico.contar_status_acervo(), detalhado)
+
+        popular(self.usuarios, self.emprestimos)
+        em_sql = relatorios(self.relatorios)
+
+        anterior = usar_repositorio(LivroRepository())
+        try:
+            usuarios = UsuarioService()
+            emprestimos = LoanController(usuarios)
+            popular(usuarios, emprestimos)
+            em_memoria = relatorios(RelatorioService(emprestimos, usuarios))
+        finally:
+            usar_repositorio(anterior)
+        self.assertEqual(em_sql, em_memoria)
+        livro_module._livros.verificar_contadores()
+
+    def test_pool_de_conexoes_limitado(self):
+        """Muitas threads curtas (uma por requisição) não abrem uma conexão cada"""
+        import threading
+        banco = self.usuarios.banco
+        self.usuarios.cadastrar("Pool", "POOL00001", "ALUNO")
+
+        nomes = []
+        def consultar():
+            nomes.append(self.usuarios.buscar_por_matricula("POOL00001").nome)
+        for _ in range(30):
+            threads = [threading.Thread(target=consultar) for _ in range(10)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(nomes, ["Pool"] * 300)
+        self.assertLessEqual(banco.abertas(), 8)
+
+    def test_paginacao_em_sql_igual_a_em_memoria(self):
+        """paginar dá as mesmas páginas e cursores em memória e no SQLite"""
+        def popular(usuarios, emprestimos):
+            for i in range(7):
+                usuarios.cadastrar(f"Leitor {i}", f"PAG{i:05d}", "ALUNO" if i % 3 else "PROFESSOR")
+            usuarios.atualizar(2, status="INATIVO")
+            for i in (5, 1, 3):
+                adicionar_livro(Livro(id=i, titulo=f"Livro {i}", autor=f"Autor {i % 2}", estoque=2))
+            for usuario, livro in [(1, 1), (2, 3), (3, 1), (1, 5)]:
+                emprestimos.registrar_emprestimo(usuario, livro)
+            emprestimos.registrar_devolucao(2, 3)
+
+        def paginas(usuarios, emprestimos, limite):
+            def todas(paginar, **filtros):
+                resultado, cursor = [], None
+                while True:
+                    itens, cursor = paginar(limite=limite, apos=cursor, **filtros)
+                    resultado.append(([getattr(i, 'loan_id', None) or i.id for i in itens], cursor))
+                    if cursor is None:
+                        return resultado
+            return [
+                todas(usuarios.paginar), todas(usuarios.paginar, tipo="ALUNO", status="ATIVO"),
+                todas(usuarios.paginar, status=StatusUsuario.INATIVO, decrescente=True),
+                todas(paginar_livros), todas(paginar_livros, autor="Autor 1", status="disponível"),
+                todas(emprestimos.paginar, ativo=True), todas(emprestimos.paginar, ativo=False),
+                todas(emprestimos.paginar, user_id=1, decrescente=True),
+            ]
+
+        popular(self.usuarios, self.emprestimos)
+        em_sql = [paginas(self.usuarios, self.emprestimos, limite) for limite in (None, 1, 2)]
+
+        anterior = usar_repositorio(LivroRepository())
+        try:
+            usuarios = UsuarioService()
+            emprestimos = LoanController(usuarios)
+            popular(usuarios, emprestimos)
+            em_memoria = [paginas(usuarios, emprestimos, limite) for limite in (None, 1, 2)]
+        finally:
+            usar_repositorio(anterior)
+        self.assertEqual(em_sql, em_memoria)
+        self.assertEqual(em_memoria[2][3], [([1, 3], 3), ([5], None)])
+
+    def test_lote_e_emprestimos_simultaneos(self):
+        """Lote numa transação; threads disputando o mesmo livro não passam do estoque"""
+        import threading
+        resultados = self.usuarios.cadastrar_lote(
+            [{'nome': f"Leitor {i}", 'matricula': f"SQL{i:05d}", 'tipo': "ALUNO"} for i in range(20)]
+            + [{'nome': "Repetido", 'matricula': "SQL00000", 'tipo': "ALUNO"}]
+        )
+        self.assertIsInstance(resultados[-1], ValueError)
+        adicionar_livro(Livro(id=9, titulo="Disputado", autor="Autor", estoque=5))
+
+        sucessos = []
+        def emprestar(usuario):
+            try:
+                sucessos.append(self.emprestimos.registrar_emprestimo(usuario.id, 9))
+            except LoanError:
+                pass
+        threads = [threading.Thread(target=emprestar, args=(u,)) for u in resultados[:-1]]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(sucessos), 5)
+        self.assertEqual(buscar_livro_por_id(9).get_estoque(), 0)
+        self.assertEqual(self.relatorios.contar_status_acervo()['emprestado'], 1)
+
+        hoje = sucessos[0].borrowed_at.date().isoformat()
+        pagina, cursor = self.relatorios.paginar_por_periodo(hoje, hoje, limite=3)
+        resto, fim = self.relatorios.paginar_por_periodo(hoje, hoje, limite=3, cursor=cursor)
+        self.assertEqual(len(pagina) + len(resto), 5)
+        self.assertIsNone(fim)
+
+
+class TestConcorrencia(unittest.TestCase):
+
+    def test_estresse_com_varias_threads(self):
+        """Empréstimos e cadastros simultâneos mantêm ids únicos e estoque consistente"""
+        import sys
+        from benchmarks.stress_concorrencia import executar
+        intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        try:
+            total = executar(threads=8, operacoes=1500, livros=10, estoque=2)
+        finally:
+            sys.setswitchinterval(intervalo)
+            import models.livro as livro_module
+            livro_module._livros.clear()
+        self.assertGreater(total['recusados'], 0)  # houve disputa pelos exemplares
+        self.assertGreater(total['duplicados'], 0)  # e pelas matrículas
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
 
@@ -0,0 +1,264 @@
+"""
+Busca textual no acervo: índice invertido com ranking BM25 e trie de prefixos
+
+Os termos são dobrados (sem acento, minúsculos), então "calculo" encontra
+"Cálculo". Uma consulta com vários termos retorna os livros que têm todos
+eles.
+
+As listas de cada termo também ficam agrupadas por (frequência no
+documento, comprimento do documento): todos os documentos de um grupo têm a
+mesma pontuação naquele termo. Como cada documento tem um só comprimento,
+os grupos dos termos da consulta só se cruzam quando têm o mesmo
+comprimento, e cada combinação tem uma pontuação exata. A busca cruza as
+combinações da mais à menos pontuada e para quando nenhuma restante pode
+superar os resultados já encontrados, então termos muito comuns não obrigam
+a percorrer a lista inteira.
+
+A trie guarda em cada nó os termos mais frequentes daquele prefixo, e as
+sugestões saem sem percorrer a subárvore.
+"""
+import bisect
+import heapq
+import itertools
+import math
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+# Parâmetros usuais do BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Sugestões mantidas em cada nó da trie
+SUGESTOES_POR_NO = 10
+
+STOPWORDS = frozenset(
+    "a o as os e é de da das do dos em no na nos nas num numa um uma uns umas "
+    "para por pela pelo pelas pelos com sem ao aos à às que ou se sua seu "
+    "the of and to in on for an".split()
+)
+
+_PALAVRA = re.compile(r"\w+")
+_NAO_ISBN = re.compile(r"[^0-9x]")
+_CONSULTA_ISBN = re.compile(r"[\d\s-]+[xX]?")
+
+
+class IndiceNaoPronto(Exception):
+    """O índice de busca ainda está sendo montado"""
+
+
+def dobrar(texto: str) -> str:
+    """Minúsculas sem acentos: 'Cálculo' -> 'calculo'"""
+    decomposto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def _palavras(texto: str) -> List[Tuple[str, str]]:
+    """(forma original em minúsculas, termo dobrado) de cada palavra que não é stopword"""
+    pares = []
+    for palavra in _PALAVRA.findall((texto or "").lower()):
+        termo = dobrar(palavra)
+        if termo not in STOPWORDS:
+            pares.append((palavra, termo))
+    return pares
+
+
+def termos(texto: str) -> List[str]:
+    """Termos indexáveis de `texto`, na ordem em que aparecem"""
+    return [termo for _, termo in _palavras(texto)]
+
+
+class _No:
+    __slots__ = ("filhos", "melhores")
+
+    def __init__(self):
+        self.filhos: Dict[str, "_No"] = {}
+        self.melhores: List[Tuple[int, str]] = []  # (-frequência, termo), em ordem
+
+
+class IndiceBusca:
+    """
+    Índice invertido em memória sobre os campos de texto de cada documento.
+
+    Seguro para uso por várias threads: buscas e atualizações passam pelo
+    mesmo lock, e cada operação é curta.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}  # termo -> {documento: frequência}
+        # termo -> {(frequência, comprimento): {documento: None}} (dict como conjunto ordenado)
+        self._grupos: Dict[str, Dict[Tuple[int, int], Dict[int, None]]] = {}
+        self._documentos: Dict[int, Tuple[Any, Dict[str, int], int]] = {}  # objeto, termos, comprimento
+        self._por_chave: Dict[str, int] = {}
+        self._proximo = 0
+        self._total_termos = 0
+        self._formas: Dict[str, str] = {}  # termo dobrado -> forma exibida nas sugestões
+        self._trie = _No()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._documentos)
+
+    def adicionar(self, chave: str, objeto: Any, *campos: Optional[str], isbn: Optional[str] = None):
+        """Indexa `objeto` sob `chave`; uma chave já indexada é substituída"""
+        frequencias: Dict[str, int] = {}
+        formas = {}
+        for campo in campos:
+            for palavra, termo in _palavras(campo):
+                frequencias[termo] = frequencias.get(termo, 0) + 1
+                formas.setdefault(termo, palavra)
+        comprimento = sum(frequencias.values())
+        # ISBN vira um único termo sem hífens ("978-85-333-0227-3" -> "9788533302273"),
+        # fora do comprimento usado pelo BM25
+        compacto = _NAO_ISBN.sub("", (isbn or "").lower())
+        if compacto:
+            frequencias.setdefault(compacto, 1)
+            formas.setdefault(compacto, compacto)
+
+        with self._lock:
+            self._remover(chave)
+            documento = self._proximo
+            self._proximo += 1
+            self._por_chave[chave] = documento
+            self._documentos[documento] = (objeto, frequencias, comprimento)
+            self._total_termos += comprimento
+            for termo, frequencia in frequencias.items():
+                lista = self._postings.setdefault(termo, {})
+                lista[documento] = frequencia
+                self._grupos.setdefault(termo, {}).setdefault((frequencia, comprimento), {})[documento] = None
+                self._formas.setdefault(termo, formas[termo])
+                self._atualizar_trie(termo, len(lista))
+
+    def remover(self, chave: str):
+        with self._lock:
+            self._remover(chave)
+
+    def _remover(self, chave: str):
+        documento = self._por_chave.pop(chave, None)
+        if documento is None:
+            return
+        _, frequencias, comprimento = self._documentos.pop(documento)
+        self._total_termos -= comprimento
+        for termo, frequencia in frequencias.items():
+            lista = self._postings[termo]
+            del lista[documento]
+            grupos = self._grupos[termo]
+            membros = grupos[(frequencia, comprimento)]
+            del membros[documento]
+            if not membros:
+                del grupos[(frequencia, comprimento)]
+            if not lista:
+                del self._postings[termo]
+                del self._grupos[termo]
+                del self._formas[termo]
+            self._atualizar_trie(termo, len(lista))
+
+    def _atualizar_trie(self, termo: str, frequencia: int):
+        """Reposiciona `termo` na lista de melhores de cada nó do seu caminho"""
+        item = (-frequencia, termo)
+        no = self._trie
+        for letra in termo:
+            filho = no.filhos.get(letra)
+            if filho is None:
+                filho = no.filhos[letra] = _No()
+            no = filho
+            melhores = no.melhores
+            for i, (_, existente) in enumerate(melhores):
+                if existente == termo:
+                    del melhores[i]
+                    break
+            # Uma remoção pode deixar o nó com menos sugestões do que a
+            # subárvore teria; elas voltam conforme novos livros chegam
+            if frequencia and (len(melhores) < SUGESTOES_POR_NO or item < melhores[-1]):
+                bisect.insort(melhores, item)
+                del melhores[SUGESTOES_POR_NO:]
+
+    def buscar(self, consulta: str, limite: int = 20) -> List[Tuple[Any, float]]:
+        """Documentos com todos os termos de `consulta`, do mais ao menos relevante (BM25)"""
+        procurados = list(dict.fromkeys(termos(consulta)))
+        if _CONSULTA_ISBN.fullmatch((consulta or "").strip()):
+            # Consulta que é um ISBN (10 ou 13 caracteres), com ou sem hífens,
+            # procura o termo compacto; outros números ("100 2020") são palavras
+            compacto = _NAO_ISBN.sub("", consulta.lower())
+            if len(compacto) in (10, 13):
+                procurados = [compacto]
+        with self._lock:
+            if not procurados or limite <= 0:
+                return []
+            listas = [self._postings.get(termo) for termo in procurados]
+            if not all(listas):
+                return []
+            grupos = [self._grupos[termo] for termo in procurados]
+
+            total = len(self._documentos)
+            media = max(self._total_termos / total, 1.0)
+            pesos = [math.log(1 + (total - len(lista) + 0.5) / (len(lista) + 0.5)) for lista in listas]
+            documentos = self._documentos
+
+            def parcial(peso, frequencia, comprimento):
+                normalizacao = BM25_K1 * (1 - BM25_B + BM25_B * comprimento / media)
+                return peso * frequencia * (BM25_K1 + 1) / (frequencia + normalizacao)
+
+            # Cada documento tem um só comprimento, então um grupo (f, c) de um
+            # termo só cruza com grupos de mesmo c dos outros. Cada combinação
+            # de grupos tem pontuação exata, e só as melhores são cruzadas
+            por_comprimento = []
+            for grupos_termo in grupos:
+                divididos: Dict[int, List[Tuple[int, Dict[int, None]]]] = {}
+                for (frequencia, comprimento), membros in grupos_termo.items():
+                    divididos.setdefault(comprimento, []).append((frequencia, membros))
+                por_comprimento.append(divididos)
+            comuns = set(por_comprimento[0]).intersection(*por_comprimento[1:])
+            candidatos = []
+            for comprimento in comuns:
+                for combinacao in itertools.product(*(divididos[comprimento] for divididos in por_comprimento)):
+                    pontos = sum(parcial(peso, f, comprimento) for peso, (f, _) in zip(pesos, combinacao))
+                    candidatos.append((pontos, [membros for _, membros in combinacao]))
+            candidatos.sort(key=lambda item: item[0], reverse=True)
+
+            # Heap mínimo com os `limite` melhores: (pontuação, -documento),
+            # então no empate fica o documento indexado primeiro
+            melhores: List[Tuple[float, int]] = []
+            for pontos, conjuntos in candidatos:
+                if len(melhores) == limite and pontos < melhores[0][0]:
+                    break
+                if len(conjuntos) == 1:
+                    # Os membros de um grupo já estão em ordem crescente
+                    encontrados = itertools.islice(conjuntos[0], limite)
+                else:
+                    # Interseção das views em C, a partir do menor grupo
+                    conjuntos.sort(key=len)
+                    comum = conjuntos[0].keys()
+                    for outro in conjuntos[1:]:
+                        comum = comum & outro.keys()
+                        if not comum:
+                            break
+                    encontrados = heapq.nsmallest(limite, comum)
+                for d in encontrados:
+                    item = (pontos, -d)
+                    if len(melhores) < limite:
+                        heapq.heappush(melhores, item)
+                    elif item > melhores[0]:
+                        heapq.heapreplace(melhores, item)
+                    else:
+                        # Mesma pontuação e documentos em ordem crescente:
+                        # nenhum dos próximos entra
+                        break
+
+            melhores.sort(reverse=True)
+            return [(documentos[-d][0], pontos) for pontos, d in melhores]
+
+    def sugerir(self, prefixo: str, limite: int = 8) -> List[str]:
+        """Termos mais frequentes que começam com a última palavra de `prefixo`"""
+        palavras = _PALAVRA.findall(dobrar(prefixo or ""))
+        if not palavras or not prefixo[-1:].isalnum():
+            # Palavra já terminada (espaço, pontuação): não há o que completar
+            return []
+        with self._lock:
+            no = self._trie
+            for letra in palavras[-1]:
+                no = no.filhos.get(letra)
+                if no is None:
+                    return []
+            return [self._formas[termo] for _, termo in no.melhores[:limite]]
@@ -0,0 +1,75 @@
+"""
+Classificação de livros em categorias por palavras-chave do título e do autor
+
+A tabela é compilada numa única expressão regular: cada livro é percorrido
+uma vez, qualquer que seja o número de palavras-chave. A categoria é
+calculada quando o Book é criado e gravada junto com ele no banco.
+
+A tabela padrão pode ser trocada por um JSON (lista de
+[categoria, [palavras...]]) indicado em CATEGORIAS_LIVROS.
+"""
+import functools
+import json
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+CATEGORIA_PADRAO = "Livro Técnico"
+
+# Em ordem de prioridade: se palavras de duas categorias aparecem, vale a primeira
+CATEGORIAS: List[Tuple[str, Sequence[str]]] = [
+    ("Programação", ("Python", "JavaScript", "Java", "Programação", "C++", "Rust")),
+    ("Banco de Dados", ("Banco", "MongoDB", "SQL", "NoSQL", "PostgreSQL", "MySQL")),
+    ("Matemática", ("Cálculo", "Matemática", "Estatística", "Álgebra", "Geometria")),
+    ("Engenharia de Software", ("Engenharia", "Scrum", "TDD", "Arquitetura", "Refatoração")),
+    ("Ciência da Computação", ("Algoritmos", "Estrutura", "Compiladores", "Sistemas Operacionais")),
+    ("Literatura", ("1984", "Dom Casmurro", "Machado de Assis", "Orwell", "Romance")),
+]
+
+
+class Classificador:
+    """
+    Palavras-chave de todas as categorias numa única regex com um grupo
+    por categoria. A busca ignora maiúsculas e exige início de palavra
+    ("Estrutura" casa "Estruturas", mas "SQL" não casa "PostgreSQL").
+    """
+
+    def __init__(self, tabela: Sequence[Tuple[str, Sequence[str]]] = CATEGORIAS,
+                 padrao: str = CATEGORIA_PADRAO):
+        self.categorias = [categoria for categoria, _ in tabela]
+        self.padrao = padrao
+        grupos = []
+        for _, palavras in tabela:
+            # Mais longas primeiro: "JavaScript" antes de "Java" na alternância
+            alternativas = sorted((p.strip() for p in palavras if p.strip()), key=len, reverse=True)
+            grupos.append("(" + "|".join(re.escape(p) for p in alternativas) + ")" if alternativas else "(?!)")
+        self._regex = re.compile(r"(?<!\w)(?:" + "|".join(grupos) + ")", re.IGNORECASE) if grupos else None
+        self.classificar = functools.lru_cache(maxsize=65536)(self._classificar)
+
+    def _classificar(self, titulo: str, autor: str = "") -> str:
+        if self._regex is None:
+            return self.padrao
+        melhor = None
+        for casamento in self._regex.finditer(f"{titulo or ''}\n{autor or ''}"):
+            indice = casamento.lastindex - 1
+            if melhor is None or indice < melhor:
+                melhor = indice
+                if melhor == 0:
+                    break
+        return self.padrao if melhor is None else self.categorias[melhor]
+
+
+def carregar_tabela(caminho: Optional[str]) -> List[Tuple[str, Sequence[str]]]:
+    """Tabela do JSON em `caminho`, ou a padrão se não houver arquivo"""
+    if not caminho:
+        return CATEGORIAS
+    with open(caminho, encoding="utf-8") as arquivo:
+        return [(categoria, tuple(palavras)) for categoria, palavras in json.load(arquivo)]
+
+
+classificador = Classificador(carregar_tabela(os.getenv("CATEGORIAS_LIVROS")))
+
+
+def classificar(titulo: str, autor: str = "") -> str:
+    """Categoria do livro (com cache por título e autor)"""
+    return classificador.classificar(titulo, autor)
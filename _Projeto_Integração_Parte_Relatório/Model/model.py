@@ -1,6 +1,15 @@
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
-from typing import Optional, List, Dict
+from typing import Any, Callable, Iterator, Optional, List, Dict
+from contextvars import ContextVar
+from operator import attrgetter
+import functools
+import heapq
+import threading
+import uuid
+
+from Model.busca import IndiceBusca, IndiceNaoPronto
+from Model.categorias import classificar
 
 # Import opcional do MongoDB - funciona sem ele
 try:
@@ -10,6 +19,44 @@ except ImportError:
     MONGODB_AVAILABLE = False
     print("MongoDB não disponível - usando banco de dados em memória")
 
+# Limites de paginação das listagens
+TAMANHO_PAGINA_PADRAO = 50
+TAMANHO_PAGINA_MAXIMO = 200
+
+# Documentos trazidos por ida ao servidor nos cursores usados em streaming
+LOTE_CURSOR = 1000
+
+# Campo de texto com pelo menos um caractere não branco (mesma regra da View)
+_PREENCHIDO = {"$regex": r"\S"}
+
+
+class ContadorConsultas:
+    """Consultas ao banco feitas durante uma requisição (usado pelas métricas da View)"""
+
+    def __init__(self):
+        self.total = 0
+        self.dentro = False  # chamadas internas de um método para outro contam uma vez só
+
+
+# Contador da requisição atual; None fora de uma requisição medida
+consultas_db: ContextVar[Optional[ContadorConsultas]] = ContextVar("consultas_db", default=None)
+
+
+def _conta_consulta(metodo):
+    """Soma 1 ao contador da requisição atual a cada chamada de `metodo`"""
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        contador = consultas_db.get()
+        if contador is None or contador.dentro:
+            return metodo(self, *args, **kwargs)
+        contador.total += 1
+        contador.dentro = True
+        try:
+            return metodo(self, *args, **kwargs)
+        finally:
+            contador.dentro = False
+    return envolvido
+
 
 @dataclass
 class User:
@@ -38,6 +85,13 @@ class Book:
     author: str
     isbn: str
     available: bool
+    category: Optional[str] = None
+
+    def __post_init__(self):
+        # Calculada na criação e gravada com o livro; documentos antigos sem
+        # o campo são classificados ao serem lidos (com cache)
+        if not self.category:
+            self.category = classificar(self.title, self.author)
 
     def to_dict(self):
         """Converte o objeto para dicionário (para MongoDB)"""
@@ -47,11 +101,25 @@ class Book:
     def from_dict(cls, data):
         """Cria um objeto Book a partir de um dicionário (do MongoDB)"""
         # Filtra apenas os campos válidos para a classe Book
-        valid_fields = {'id', 'title', 'author', 'isbn', 'available'}
+        valid_fields = {'id', 'title', 'author', 'isbn', 'available', 'category'}
         filtered_data = {k: v for k, v in data.items() if k in valid_fields}
         return cls(**filtered_data)
 
 
+@dataclass
+class Pagina:
+    """
+    Uma página de resultados ordenados por id.
+
+    `pagina` é o número da página no modo offset e None no modo cursor;
+    `proximo_cursor` é o id do último item quando existem mais resultados.
+    """
+    itens: List[Any]
+    tamanho: int
+    pagina: Optional[int] = None
+    proximo_cursor: Optional[str] = None
+
+
 @dataclass
 class Loan:
     id: str
@@ -97,18 +165,59 @@ class DatabaseManager:
         self.memory_books = []
         self.memory_loans = []
 
+        # Versão dos dados: incrementada a cada escrita feita por este processo
+        # (usada pela View para ETags sem consultar o banco). A época aleatória
+        # distingue processos, então um contador que recomeça do zero depois de
+        # um reinício não repete um ETag antigo. Escritas feitas por outros
+        # processos no mesmo MongoDB não mudam a versão deste.
+        self.data_epoch = uuid.uuid4().hex[:8]
+        self.data_version = 0
+        self._version_lock = threading.Lock()
+
+        # Índice de busca dos livros: montado em segundo plano por connect()
+        # e mantido por adicionar_livro. Até ficar pronto as buscas levantam
+        # IndiceNaoPronto. Livros gravados por outros processos só entram
+        # quando o índice é remontado
+        self._indice_livros: Optional[IndiceBusca] = None
+        self._indice_pendentes: Optional[List[Book]] = None  # adicionados durante a montagem
+        self._indice_lock = threading.Lock()
+        self._indice_montado = threading.Event()
+
+    def _bump_version(self):
+        with self._version_lock:
+            self.data_version += 1
+
     def connect(self):
         """Conecta ao banco de dados"""
         if self.using_memory:
             self.connected = True
             self.initialize_sample_data()
+            self.montar_indice_em_segundo_plano()
             return True
         else:
             self.connected = db_config.connect()
             if self.connected:
                 self.initialize_sample_data()
+                self._preparar_categorias()
+                self.montar_indice_em_segundo_plano()
             return self.connected
 
+    def _preparar_categorias(self):
+        """Índice em category e classificação dos livros gravados antes do campo existir"""
+        try:
+            db_config.books_collection.create_index("category")
+            antigos = db_config.books_collection.find(
+                {"$or": [{"category": {"$exists": False}}, {"category": None}]},
+                {"id": 1, "title": 1, "author": 1},
+            )
+            for doc in antigos:
+                db_config.books_collection.update_one(
+                    {"_id": doc["_id"]},
+                    {"$set": {"category": classificar(doc.get("title") or "", doc.get("author") or "")}}
+                )
+        except Exception as e:
+            print(f"ERRO: Falha ao preparar categorias dos livros: {e}")
+
     def disconnect(self):
         """Desconecta do banco de dados"""
         db_config.disconnect()
@@ -217,29 +326,118 @@ class DatabaseManager:
                             print(f"ERRO ao inserir emprestimo {loan.id}: {insert_error}")
 
 
+            self._indice_livros = None
+            self._bump_version()
+
         except Exception as e:
             print(f"ERRO: Falha na inicialização de dados: {e}")
             import traceback
             traceback.print_exc()
 
+    @_conta_consulta
     def adicionar_usuario(self, user: User):
         """Adiciona um novo usuário ao banco de dados"""
         try:
             result = db_config.users_collection.insert_one(user.to_dict())
+            self._bump_version()
             return result.inserted_id
         except Exception as e:
             print(f"ERRO: Falha ao adicionar usuario: {e}")
             return None
 
+    @_conta_consulta
     def adicionar_livro(self, book: Book):
         """Adiciona um novo livro ao banco de dados"""
         try:
-            result = db_config.books_collection.insert_one(book.to_dict())
-            return result.inserted_id
+            if self.using_memory:
+                self.memory_books.append(book)
+                inserted_id = book.id
+            else:
+                inserted_id = db_config.books_collection.insert_one(book.to_dict()).inserted_id
+            self._indexar_livro(book)
+            self._bump_version()
+            return inserted_id
         except Exception as e:
             print(f"ERRO: Falha ao adicionar livro: {e}")
             return None
 
+    def _indexar_livro(self, book: Book):
+        # Sob o lock: se o índice estiver sendo montado, o livro entra
+        # depois da montagem em vez de se perder entre a leitura e a troca
+        with self._indice_lock:
+            if self._indice_livros is not None:
+                self._indice_livros.adicionar(book.id, book, book.title, book.author, isbn=book.isbn)
+            elif self._indice_pendentes is not None:
+                self._indice_pendentes.append(book)
+
+    def montar_indice_busca(self):
+        """
+        Monta o índice de busca a partir do banco (segundos a minutos em
+        acervos grandes). Roda fora do lock: cadastros e buscas seguem
+        respondendo enquanto isso; se já montado ou em montagem, não faz nada.
+        """
+        with self._indice_lock:
+            if self._indice_livros is not None or self._indice_pendentes is not None:
+                return
+            self._indice_pendentes = []
+        indice = IndiceBusca()
+        try:
+            for book in self.iter_livros():
+                indice.adicionar(book.id, book, book.title, book.author, isbn=book.isbn)
+        except Exception as e:
+            print(f"ERRO: Falha ao montar indice de busca: {e}")
+            with self._indice_lock:
+                self._indice_pendentes = None
+            return
+        with self._indice_lock:
+            # Cadastrados durante a montagem; repetir um livro só o substitui
+            for book in self._indice_pendentes:
+                indice.adicionar(book.id, book, book.title, book.author, isbn=book.isbn)
+            self._indice_pendentes = None
+            self._indice_livros = indice
+        self._indice_montado.set()
+
+    def montar_indice_em_segundo_plano(self) -> threading.Thread:
+        thread = threading.Thread(target=self.montar_indice_busca, name="indice-busca", daemon=True)
+        thread.start()
+        return thread
+
+    def indice_busca_pronto(self) -> bool:
+        return self._indice_montado.is_set()
+
+    def aguardar_indice_busca(self, timeout: Optional[float] = None) -> bool:
+        """Espera a montagem do índice de busca; False se o tempo acabar antes"""
+        return self._indice_montado.wait(timeout)
+
+    def _indice_busca(self) -> IndiceBusca:
+        indice = self._indice_livros
+        if indice is None:
+            raise IndiceNaoPronto("O índice de busca ainda está sendo montado")
+        return indice
+
+    @_conta_consulta
+    def buscar_livros(self, consulta: str, limite: int = TAMANHO_PAGINA_PADRAO) -> List[Book]:
+        """Livros com todos os termos de `consulta` no título, autor ou ISBN, por relevância (BM25)"""
+        try:
+            return [book for book, _ in self._indice_busca().buscar(consulta, limite)]
+        except IndiceNaoPronto:
+            raise
+        except Exception as e:
+            print(f"ERRO: Falha ao buscar livros: {e}")
+            return []
+
+    @_conta_consulta
+    def sugerir_termos_livros(self, prefixo: str, limite: int = 8) -> List[str]:
+        """Termos do acervo que completam a última palavra de `prefixo`, dos mais frequentes"""
+        try:
+            return self._indice_busca().sugerir(prefixo, limite)
+        except IndiceNaoPronto:
+            raise
+        except Exception as e:
+            print(f"ERRO: Falha ao sugerir termos: {e}")
+            return []
+
+    @_conta_consulta
     def adicionar_emprestimo(self, loan: Loan):
         """Adiciona um novo empréstimo ao banco de dados"""
         try:
@@ -258,11 +456,13 @@ class DatabaseManager:
                     {"$set": {"available": False}}
                 )
 
+            self._bump_version()
             return result.inserted_id
         except Exception as e:
             print(f"ERRO: Falha ao adicionar emprestimo: {e}")
             return None
 
+    @_conta_consulta
     def get_usuarios(self) -> List[User]:
         """Retorna lista de todos os usuários"""
         if self.using_memory:
@@ -275,6 +475,7 @@ class DatabaseManager:
                 print(f"ERRO: Falha ao buscar usuarios: {e}")
                 return []
 
+    @_conta_consulta
     def get_livros(self) -> List[Book]:
         """Retorna lista de todos os livros"""
         if self.using_memory:
@@ -287,6 +488,7 @@ class DatabaseManager:
                 print(f"ERRO: Falha ao buscar livros: {e}")
                 return []
 
+    @_conta_consulta
     def get_emprestimos(self) -> List[Loan]:
         """Retorna lista de todos os empréstimos"""
         if self.using_memory:
@@ -299,6 +501,38 @@ class DatabaseManager:
                 print(f"ERRO: Falha ao buscar emprestimos: {e}")
                 return []
 
+    # Iteradores: percorrem a coleção sem materializá-la (cursor no MongoDB).
+    # Erros do banco são propagados para quem consome, que decide como
+    # interromper uma resposta já iniciada.
+
+    @_conta_consulta
+    def iter_usuarios(self) -> Iterator[User]:
+        """Percorre todos os usuários"""
+        if self.using_memory:
+            yield from self.memory_users
+            return
+        for user_data in db_config.users_collection.find().batch_size(LOTE_CURSOR):
+            yield User.from_dict(user_data)
+
+    @_conta_consulta
+    def iter_livros(self) -> Iterator[Book]:
+        """Percorre todos os livros"""
+        if self.using_memory:
+            yield from self.memory_books
+            return
+        for book_data in db_config.books_collection.find().batch_size(LOTE_CURSOR):
+            yield Book.from_dict(book_data)
+
+    @_conta_consulta
+    def iter_emprestimos(self) -> Iterator[Loan]:
+        """Percorre todos os empréstimos, inclusive o histórico de devolvidos"""
+        if self.using_memory:
+            yield from self.memory_loans
+            return
+        for loan_data in db_config.loans_collection.find().batch_size(LOTE_CURSOR):
+            yield Loan.from_dict(loan_data)
+
+    @_conta_consulta
     def get_livros_disponiveis(self) -> List[Book]:
         """Retorna lista de livros disponíveis"""
         try:
@@ -308,6 +542,7 @@ class DatabaseManager:
             print(f"ERRO: Falha ao buscar livros disponiveis: {e}")
             return []
 
+    @_conta_consulta
     def get_usuario_por_id(self, user_id: str) -> Optional[User]:
         """Busca um usuário por ID"""
         try:
@@ -317,6 +552,7 @@ class DatabaseManager:
             print(f"ERRO: Falha ao buscar usuario {user_id}: {e}")
             return None
 
+    @_conta_consulta
     def get_livro_por_id(self, book_id: str) -> Optional[Book]:
         """Busca um livro por ID"""
         try:
@@ -326,6 +562,7 @@ class DatabaseManager:
             print(f"ERRO: Falha ao buscar livro {book_id}: {e}")
             return None
 
+    @_conta_consulta
     def get_emprestimo_por_id(self, loan_id: str) -> Optional[Loan]:
         """Busca um empréstimo por ID"""
         try:
@@ -335,6 +572,7 @@ class DatabaseManager:
             print(f"ERRO: Falha ao buscar emprestimo {loan_id}: {e}")
             return None
 
+    @_conta_consulta
     def get_emprestimos_por_usuario(self, user_id: str) -> List[Loan]:
         """Retorna empréstimos de um usuário específico"""
         try:
@@ -344,6 +582,7 @@ class DatabaseManager:
             print(f"ERRO: Falha ao buscar emprestimos do usuario {user_id}: {e}")
             return []
 
+    @_conta_consulta
     def get_emprestimos_por_livro(self, book_id: str) -> List[Loan]:
         """Retorna empréstimos de um livro específico"""
         try:
@@ -353,6 +592,199 @@ class DatabaseManager:
             print(f"ERRO: Falha ao buscar emprestimos do livro {book_id}: {e}")
             return []
 
+    @_conta_consulta
+    def get_emprestimos_desde(self, since: Optional[datetime]) -> List[Loan]:
+        """Retorna empréstimos com loan_date >= since (todos se since for None)"""
+        if since is None:
+            return self.get_emprestimos()
+        if self.using_memory:
+            return [loan for loan in self.memory_loans if loan.loan_date >= since]
+        try:
+            loans_data = db_config.loans_collection.find({"loan_date": {"$gte": since.isoformat()}})
+            return [Loan.from_dict(loan_data) for loan_data in loans_data]
+        except Exception as e:
+            print(f"ERRO: Falha ao buscar emprestimos desde {since}: {e}")
+            return []
+
+    @_conta_consulta
+    def get_devolucoes_desde(self, since: Optional[datetime]) -> List[Loan]:
+        """Retorna empréstimos devolvidos com return_date >= since (todos se since for None)"""
+        if self.using_memory:
+            return [
+                loan for loan in self.memory_loans
+                if loan.return_date is not None and (since is None or loan.return_date >= since)
+            ]
+        query = {"return_date": {"$ne": None}}
+        if since is not None:
+            query = {"return_date": {"$gte": since.isoformat()}}
+        try:
+            loans_data = db_config.loans_collection.find(query)
+            return [Loan.from_dict(loan_data) for loan_data in loans_data]
+        except Exception as e:
+            print(f"ERRO: Falha ao buscar devolucoes desde {since}: {e}")
+            return []
+
+    @staticmethod
+    def _paginar_memoria(itens, valido: Callable[[Any], bool], chave: Callable[[Any], str],
+                         tamanho: int, cursor: Optional[str], pagina: int) -> Pagina:
+        """Seleciona só a janela pedida (heap de tamanho pular+tamanho+1, sem ordenar tudo)"""
+        pular = 0 if cursor is not None else (pagina - 1) * tamanho
+        candidatos = (i for i in itens if valido(i) and (cursor is None or chave(i) > cursor))
+        janela = heapq.nsmallest(pular + tamanho + 1, candidatos, key=chave)[pular:]
+        return DatabaseManager._montar_pagina(janela, tamanho, cursor, pagina, chave)
+
+    @staticmethod
+    def _montar_pagina(janela, tamanho: int, cursor: Optional[str], pagina: int,
+                       chave: Callable[[Any], str]) -> Pagina:
+        """`janela` traz até tamanho+1 itens; o excedente só indica que há próxima página"""
+        itens = janela[:tamanho]
+        proximo = chave(itens[-1]) if len(janela) > tamanho else None
+        return Pagina(itens, tamanho, None if cursor is not None else pagina, proximo)
+
+    @staticmethod
+    def _filtro_cursor(query: Dict, campo: str, cursor: Optional[str]) -> Dict:
+        if cursor is None:
+            return query
+        return {**query, campo: {**query.get(campo, {}), "$gt": cursor}}
+
+    @_conta_consulta
+    def get_usuarios_pagina(self, tamanho: int = TAMANHO_PAGINA_PADRAO, cursor: Optional[str] = None,
+                            pagina: int = 1, tipo: Optional[str] = None) -> Pagina:
+        """Usuários com todos os campos preenchidos, ordenados por id, opcionalmente de um tipo"""
+        if self.using_memory:
+            def valido(u):
+                return (all(v is not None and str(v).strip() for v in (u.id, u.name, u.email, u.type))
+                        and (tipo is None or u.type == tipo))
+            return self._paginar_memoria(self.memory_users, valido, attrgetter("id"), tamanho, cursor, pagina)
+
+        query = {"id": _PREENCHIDO, "name": _PREENCHIDO, "email": _PREENCHIDO, "type": _PREENCHIDO}
+        if tipo is not None:
+            query["type"] = tipo
+        query = self._filtro_cursor(query, "id", cursor)
+        pular = 0 if cursor is not None else (pagina - 1) * tamanho
+        try:
+            docs = db_config.users_collection.find(query).sort("id", 1).skip(pular).limit(tamanho + 1)
+            return self._montar_pagina([User.from_dict(d) for d in docs], tamanho, cursor, pagina,
+                                       attrgetter("id"))
+        except Exception as e:
+            print(f"ERRO: Falha ao paginar usuarios: {e}")
+            return Pagina([], tamanho, pagina if cursor is None else None)
+
+    @_conta_consulta
+    def get_livros_pagina(self, tamanho: int = TAMANHO_PAGINA_PADRAO, cursor: Optional[str] = None,
+                          pagina: int = 1, autor: Optional[str] = None,
+                          categoria: Optional[str] = None) -> Pagina:
+        """Livros com todos os campos preenchidos, ordenados por id, opcionalmente de um autor ou categoria"""
+        if self.using_memory:
+            def valido(b):
+                return (all(v is not None and str(v).strip() for v in (b.id, b.title, b.author, b.isbn))
+                        and (autor is None or b.author == autor)
+                        and (categoria is None or b.category == categoria))
+            return self._paginar_memoria(self.memory_books, valido, attrgetter("id"), tamanho, cursor, pagina)
+
+        query = {"id": _PREENCHIDO, "title": _PREENCHIDO, "author": _PREENCHIDO, "isbn": _PREENCHIDO}
+        if autor is not None:
+            query["author"] = autor
+        if categoria is not None:
+            query["category"] = categoria
+        query = self._filtro_cursor(query, "id", cursor)
+        pular = 0 if cursor is not None else (pagina - 1) * tamanho
+        try:
+            docs = db_config.books_collection.find(query).sort("id", 1).skip(pular).limit(tamanho + 1)
+            return self._montar_pagina([Book.from_dict(d) for d in docs], tamanho, cursor, pagina,
+                                       attrgetter("id"))
+        except Exception as e:
+            print(f"ERRO: Falha ao paginar livros: {e}")
+            return Pagina([], tamanho, pagina if cursor is None else None)
+
+    @_conta_consulta
+    def get_ids_livros_emprestados(self, book_ids: List[str]) -> set:
+        """Dentre `book_ids`, os que têm empréstimo ativo"""
+        if self.using_memory:
+            procurados = set(book_ids)
+            return {
+                loan.book_id for loan in self.memory_loans
+                if loan.return_date is None and loan.book_id in procurados
+            }
+        try:
+            docs = db_config.loans_collection.find(
+                {"return_date": None, "book_id": {"$in": list(book_ids)}}, {"book_id": 1}
+            )
+            return {d["book_id"] for d in docs}
+        except Exception as e:
+            print(f"ERRO: Falha ao buscar livros emprestados: {e}")
+            return set()
+
+    @_conta_consulta
+    def get_emprestimos_ativos_pagina(self, tamanho: int = TAMANHO_PAGINA_PADRAO,
+                                      cursor: Optional[str] = None, pagina: int = 1,
+                                      usuario: Optional[str] = None) -> Pagina:
+        """
+        Página de (empréstimo, livro, usuário) ativos, ordenada pelo id do empréstimo.
+        Só entram empréstimos de livros com todos os campos preenchidos.
+        """
+        def chave(item):
+            return item[0].id
+
+        if self.using_memory:
+            books_by_id = {book.id: book for book in self.memory_books}
+
+            def valido(loan):
+                livro = books_by_id.get(loan.book_id)
+                return (loan.return_date is None and livro is not None
+                        and (usuario is None or loan.user_id == usuario)
+                        and all(v is not None and str(v).strip()
+                                for v in (livro.id, livro.title, livro.author, livro.isbn)))
+
+            janela = self._paginar_memoria(self.memory_loans, valido, attrgetter("id"), tamanho, cursor, pagina)
+            users_by_id = {user.id: user for user in self.memory_users}
+            janela.itens = [(loan, books_by_id[loan.book_id], users_by_id.get(loan.user_id))
+                            for loan in janela.itens]
+            return janela
+
+        match = {"return_date": None}
+        if usuario is not None:
+            match["user_id"] = usuario
+        match = self._filtro_cursor(match, "id", cursor)
+        pular = 0 if cursor is not None else (pagina - 1) * tamanho
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"id": 1}},
+            {
+                "$lookup": {
+                    "from": "livros",
+                    "localField": "book_id",
+                    "foreignField": "id",
+                    "as": "livro"
+                }
+            },
+            {"$unwind": "$livro"},
+            {"$match": {"livro.id": _PREENCHIDO, "livro.title": _PREENCHIDO,
+                        "livro.author": _PREENCHIDO, "livro.isbn": _PREENCHIDO}},
+            {"$skip": pular},
+            {"$limit": tamanho + 1},
+            # Usuário só é buscado para os itens da página
+            {
+                "$lookup": {
+                    "from": "usuarios",
+                    "localField": "user_id",
+                    "foreignField": "id",
+                    "as": "usuario"
+                }
+            },
+            {"$unwind": {"path": "$usuario", "preserveNullAndEmptyArrays": True}}
+        ]
+        try:
+            janela = []
+            for item in db_config.loans_collection.aggregate(pipeline):
+                usuario_doc = User.from_dict(item["usuario"]) if item.get("usuario") else None
+                janela.append((Loan.from_dict(item), Book.from_dict(item["livro"]), usuario_doc))
+            return self._montar_pagina(janela, tamanho, cursor, pagina, chave)
+        except Exception as e:
+            print(f"ERRO: Falha ao paginar emprestimos ativos: {e}")
+            return Pagina([], tamanho, pagina if cursor is None else None)
+
+    @_conta_consulta
     def devolver_livro(self, loan_id: str) -> bool:
         """Marca um empréstimo como devolvido"""
         try:
@@ -379,6 +811,7 @@ class DatabaseManager:
                     {"id": loan.book_id},
                     {"$set": {"available": True}}
                 )
+                self._bump_version()
 
                 # Buscar o livro para mostrar o nome
                 book = self.get_livro_por_id(loan.book_id)
@@ -397,6 +830,7 @@ class DatabaseManager:
     # PIPELINES DE AGGREGATION - RELATÓRIOS
     # ========================================
 
+    @_conta_consulta
     def get_relatorio_livros_mais_emprestados(self, limit: int = 10) -> List[Dict]:
         """
         Pipeline: Livros mais emprestados
@@ -443,6 +877,7 @@ class DatabaseManager:
             print(f"ERRO: Falha na pipeline de livros mais emprestados: {e}")
             return []
 
+    @_conta_consulta
     def get_relatorio_usuarios_mais_ativos(self, limit: int = 10) -> List[Dict]:
         """
         Pipeline: Usuários que mais fizeram empréstimos
@@ -487,6 +922,7 @@ class DatabaseManager:
             print(f"ERRO: Falha na pipeline de usuarios mais ativos: {e}")
             return []
 
+    @_conta_consulta
     def get_estatisticas_gerais(self) -> Dict:
         """
         Pipeline: Estatísticas gerais da biblioteca
@@ -550,6 +986,7 @@ class DatabaseManager:
             print(f"ERRO: Falha ao gerar estatisticas gerais: {e}")
             return {}
 
+    @_conta_consulta
     def get_relatorio_emprestimos_por_periodo(self, start_date: datetime, end_date: datetime) -> List[Dict]:
         """
         Pipeline: Empréstimos realizados em um período específico
@@ -615,6 +1052,7 @@ class DatabaseManager:
             print(f"ERRO: Falha na pipeline de emprestimos por periodo: {e}")
             return []
 
+    @_conta_consulta
     def get_relatorio_livros_atrasados(self) -> List[Dict]:
         """
         Pipeline: Livros emprestados há mais de 30 dias (atrasados)
@@ -682,6 +1120,7 @@ class DatabaseManager:
             print(f"ERRO: Falha na pipeline de livros atrasados: {e}")
             return []
 
+    @_conta_consulta
     def get_relatorio_popularidade_por_categoria(self) -> List[Dict]:
         """
         Pipeline: Análise de popularidade por tipo de usuário
@@ -746,6 +1185,21 @@ def adicionar_livro(book: Book):
     return db_manager.adicionar_livro(book)
 
 
+def buscar_livros(consulta: str, limite: int = TAMANHO_PAGINA_PADRAO) -> List[Book]:
+    """Busca livros por título, autor ou ISBN"""
+    return db_manager.buscar_livros(consulta, limite)
+
+
+def sugerir_termos_livros(prefixo: str, limite: int = 8) -> List[str]:
+    """Sugestões para completar uma busca de livros"""
+    return db_manager.sugerir_termos_livros(prefixo, limite)
+
+
+def indice_busca_pronto() -> bool:
+    """False enquanto o índice de busca está sendo montado"""
+    return db_manager.indice_busca_pronto()
+
+
 def adicionar_emprestimo(loan: Loan):
     """Adiciona um novo empréstimo ao sistema"""
     return db_manager.adicionar_emprestimo(loan)
@@ -766,6 +1220,21 @@ def get_emprestimos() -> List[Loan]:
     return db_manager.get_emprestimos()
 
 
+def iter_usuarios() -> Iterator[User]:
+    """Percorre os usuários sem carregar a coleção inteira"""
+    return db_manager.iter_usuarios()
+
+
+def iter_livros() -> Iterator[Book]:
+    """Percorre os livros sem carregar a coleção inteira"""
+    return db_manager.iter_livros()
+
+
+def iter_emprestimos() -> Iterator[Loan]:
+    """Percorre os empréstimos sem carregar a coleção inteira"""
+    return db_manager.iter_emprestimos()
+
+
 def get_livros_disponiveis() -> List[Book]:
     """Retorna lista de livros disponíveis"""
     return db_manager.get_livros_disponiveis()
@@ -781,6 +1250,45 @@ def get_emprestimos_por_livro(book_id: str) -> List[Loan]:
     return db_manager.get_emprestimos_por_livro(book_id)
 
 
+def get_emprestimos_desde(since: Optional[datetime]) -> List[Loan]:
+    """Retorna empréstimos feitos a partir de uma data"""
+    return db_manager.get_emprestimos_desde(since)
+
+
+def get_devolucoes_desde(since: Optional[datetime]) -> List[Loan]:
+    """Retorna empréstimos devolvidos a partir de uma data"""
+    return db_manager.get_devolucoes_desde(since)
+
+
 def devolver_livro(loan_id: str) -> bool:
     """Marca um empréstimo como devolvido"""
     return db_manager.devolver_livro(loan_id)
+
+
+def get_usuarios_pagina(tamanho: int = TAMANHO_PAGINA_PADRAO, cursor: Optional[str] = None,
+                        pagina: int = 1, tipo: Optional[str] = None) -> Pagina:
+    """Retorna uma página de usuários"""
+    return db_manager.get_usuarios_pagina(tamanho, cursor, pagina, tipo)
+
+
+def get_livros_pagina(tamanho: int = TAMANHO_PAGINA_PADRAO, cursor: Optional[str] = None,
+                      pagina: int = 1, autor: Optional[str] = None,
+                      categoria: Optional[str] = None) -> Pagina:
+    """Retorna uma página de livros"""
+    return db_manager.get_livros_pagina(tamanho, cursor, pagina, autor, categoria)
+
+
+def get_ids_livros_emprestados(book_ids: List[str]) -> set:
+    """Retorna os ids, dentre os informados, de livros com empréstimo ativo"""
+    return db_manager.get_ids_livros_emprestados(book_ids)
+
+
+def get_emprestimos_ativos_pagina(tamanho: int = TAMANHO_PAGINA_PADRAO, cursor: Optional[str] = None,
+                                  pagina: int = 1, usuario: Optional[str] = None) -> Pagina:
+    """Retorna uma página de empréstimos ativos com livro e usuário"""
+    return db_manager.get_emprestimos_ativos_pagina(tamanho, cursor, pagina, usuario)
+
+
+def get_versao_dados() -> str:
+    """Retorna a versão atual dos dados, "época-contador" (muda a cada escrita deste processo)"""
+    return f"{db_manager.data_epoch}-{db_manager.data_version}"
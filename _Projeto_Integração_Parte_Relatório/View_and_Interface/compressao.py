@@ -0,0 +1,153 @@
+"""
+Negociação de Content-Encoding e cache das variantes comprimidas
+"""
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Import opcional do brotli - sem ele só gzip é oferecido
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Respostas menores que isso não compensam o custo de comprimir
+TAMANHO_MINIMO = 1024
+NIVEL_GZIP = 3  # páginas dinâmicas: velocidade importa mais que os últimos bytes
+GZIP_WBITS = 31  # zlib com cabeçalho e trailer gzip
+
+
+def escolher_codificacao(accept_encoding: Optional[str]) -> Optional[str]:
+    """Escolhe 'br', 'gzip' ou None a partir do header Accept-Encoding"""
+    if not accept_encoding:
+        return None
+
+    aceitas = {}
+    for item in accept_encoding.split(","):
+        nome, _, parametros = item.strip().partition(";")
+        q = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                q = float(parametros[2:])
+            except ValueError:
+                q = 0.0
+        aceitas[nome.strip().lower()] = q
+
+    def aceita(nome):
+        return aceitas.get(nome, aceitas.get("*", 0.0)) > 0
+
+    if BROTLI_AVAILABLE and aceita("br"):
+        return "br"
+    if aceita("gzip"):
+        return "gzip"
+    return None
+
+
+def etag_codificado(etag: str, codificacao: Optional[str]) -> str:
+    """
+    ETag da variante comprimida: '"abc"' vira '"abc-gzip"'. Um validador
+    forte identifica os bytes exatos, então cada Content-Encoding tem o seu.
+    """
+    if not codificacao:
+        return etag
+    return f'{etag[:-1]}-{codificacao}"'
+
+
+def etag_sem_codificacao(etag: str) -> str:
+    """Desfaz etag_codificado (e o W/ de um ETag enfraquecido por proxy)"""
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for codificacao in ("gzip", "br"):
+        sufixo = f'-{codificacao}"'
+        if etag.endswith(sufixo):
+            return etag[:-len(sufixo)] + '"'
+    return etag
+
+
+def comprimir(corpo: bytes, codificacao: str) -> bytes:
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=5)
+    compressor = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, GZIP_WBITS)
+    return compressor.compress(corpo) + compressor.flush()
+
+
+class ShellGzip:
+    """
+    Prefixo de template já comprimido.
+
+    O estado do compressor após o prefixo é guardado; cada resposta copia
+    esse estado e comprime apenas o conteúdo dinâmico e o sufixo.
+    """
+
+    def __init__(self, prefixo: bytes):
+        self._compressor = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, GZIP_WBITS)
+        self.prefixo_comprimido = self._compressor.compress(prefixo)
+
+    def comprimir(self, *partes: bytes) -> bytes:
+        compressor = self._compressor.copy()
+        saida = [self.prefixo_comprimido]
+        saida.extend(compressor.compress(parte) for parte in partes)
+        saida.append(compressor.flush())
+        return b"".join(saida)
+
+
+class CompressorIncremental:
+    """
+    Compressão de uma resposta transmitida aos poucos.
+
+    Cada chamada a comprimir() termina com um flush de sincronização, então o
+    cliente consegue descomprimir e exibir tudo o que já recebeu.
+    """
+
+    def __init__(self, codificacao: str, shell: Optional[ShellGzip] = None):
+        self._inicial = b""
+        if codificacao == "br":
+            self._brotli = brotli.Compressor(quality=5)
+            self._zlib = None
+        elif shell is not None:
+            # Continua do estado do shell: o prefixo do template não é recomprimido
+            self._brotli = None
+            self._zlib = shell._compressor.copy()
+            self._inicial = shell.prefixo_comprimido
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, GZIP_WBITS)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        inicial, self._inicial = self._inicial, b""
+        if self._brotli is not None:
+            return inicial + self._brotli.process(dados) + self._brotli.flush()
+        return inicial + self._zlib.compress(dados) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self, dados: bytes = b"") -> bytes:
+        """Comprime o restante e fecha o stream (trailer gzip)"""
+        inicial, self._inicial = self._inicial, b""
+        if self._brotli is not None:
+            return inicial + self._brotli.process(dados) + self._brotli.finish()
+        return inicial + self._zlib.compress(dados) + self._zlib.flush()
+
+
+class CacheComprimidos:
+    """LRU pequeno de corpos comprimidos, indexado por (chave, codificação)"""
+
+    def __init__(self, max_itens: int = 64):
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: str, codificacao: str, corpo: bytes) -> bytes:
+        with self._lock:
+            comprimido = self._itens.get((chave, codificacao))
+            if comprimido is not None:
+                self._itens.move_to_end((chave, codificacao))
+                return comprimido
+
+        comprimido = comprimir(corpo, codificacao)
+        with self._lock:
+            self._itens[(chave, codificacao)] = comprimido
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+        return comprimido
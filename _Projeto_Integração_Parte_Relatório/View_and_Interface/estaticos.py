@@ -0,0 +1,81 @@
+"""
+Arquivos estáticos (CSS, fontes, ícones) servidos de View_and_Interface/static
+
+Cada arquivo é publicado com o hash do conteúdo no nome
+(menu.css -> menu.3f2a9c01b4de.css). Como a URL muda quando o conteúdo
+muda, a resposta pode ser guardada pelo navegador para sempre
+(Cache-Control: immutable) sem nunca ficar desatualizada.
+"""
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+PREFIXO_URL = "/static/"
+
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+
+# Tipos que o mimetypes do sistema nem sempre conhece (Windows em especial)
+_TIPOS = {
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".svg": "image/svg+xml",
+    ".woff2": "font/woff2",
+    ".woff": "font/woff",
+}
+
+# href="/static/nome.ext" nos templates HTML
+_REFERENCIA = re.compile(r'(["\'])/static/([\w.-]+)\1')
+
+
+class Arquivo(NamedTuple):
+    caminho: Path
+    tamanho: int
+    content_type: str
+    etag: str
+    imutavel: bool  # True quando pedido pelo nome com hash
+
+
+class Estaticos:
+    """Índice nome lógico -> nome publicado, montado uma vez a partir do diretório"""
+
+    def __init__(self, diretorio: Path = STATIC_DIR):
+        self.diretorio = Path(diretorio)
+        self._publicados: Dict[str, str] = {}
+        self._arquivos: Dict[str, Arquivo] = {}
+        self.recarregar()
+
+    def recarregar(self):
+        publicados = {}
+        arquivos = {}
+        if self.diretorio.is_dir():
+            for caminho in sorted(self.diretorio.iterdir()):
+                if not caminho.is_file():
+                    continue
+                digest = hashlib.sha256(caminho.read_bytes()).hexdigest()[:12]
+                publicado = f"{caminho.stem}.{digest}{caminho.suffix}"
+                tipo = _TIPOS.get(caminho.suffix) or mimetypes.guess_type(caminho.name)[0] \
+                    or "application/octet-stream"
+                tamanho = caminho.stat().st_size
+                publicados[caminho.name] = publicado
+                arquivos[publicado] = Arquivo(caminho, tamanho, tipo, f'"{digest}"', True)
+                # O nome sem hash continua acessível, mas sem cache longo
+                arquivos[caminho.name] = Arquivo(caminho, tamanho, tipo, f'"{digest}"', False)
+        self._publicados, self._arquivos = publicados, arquivos
+
+    def url(self, nome: str) -> str:
+        """URL com hash de `nome`; nomes desconhecidos ficam como estão"""
+        return PREFIXO_URL + self._publicados.get(nome, nome)
+
+    def reescrever(self, html: str) -> str:
+        """Troca as referências /static/nome.ext do HTML pelas URLs com hash"""
+        return _REFERENCIA.sub(lambda m: f"{m.group(1)}{self.url(m.group(2))}{m.group(1)}", html)
+
+    def obter(self, nome_publicado: str) -> Optional[Arquivo]:
+        """Arquivo servido em /static/<nome_publicado>; só nomes do índice (sem ../)"""
+        return self._arquivos.get(nome_publicado)
+
+
+estaticos = Estaticos()
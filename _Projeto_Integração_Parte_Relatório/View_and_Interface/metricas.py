@@ -0,0 +1,185 @@
+"""
+Métricas por rota: latência, tamanho da resposta, status e consultas ao banco
+
+Exportadas em texto do Prometheus (/metrics) e numa página legível (/debug/stats).
+"""
+import bisect
+import threading
+import time
+from collections import Counter
+from html import escape
+from typing import Dict, Sequence
+
+from Model import model as md
+
+# Limites superiores dos buckets (o último, +Inf, é implícito)
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Requisições para caminhos desconhecidos (404) dividem um só rótulo, para
+# que URLs arbitrárias não criem séries novas
+ROTA_DESCONHECIDA = "desconhecida"
+
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histograma:
+    """Histograma com buckets fixos, no formato cumulativo do Prometheus"""
+
+    def __init__(self, limites: Sequence[float]):
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def cumulativos(self):
+        acumulado = 0
+        for limite, contagem in zip(self.limites + (float("inf"),), self.contagens):
+            acumulado += contagem
+            yield limite, acumulado
+
+    def quantil(self, q: float) -> float:
+        """Estimativa por interpolação linear dentro do bucket (como histogram_quantile)"""
+        if not self.total:
+            return 0.0
+        alvo = q * self.total
+        anterior_limite, anterior_acumulado = 0.0, 0
+        for limite, acumulado in self.cumulativos():
+            if acumulado >= alvo:
+                if limite == float("inf"):
+                    return anterior_limite
+                fracao = (alvo - anterior_acumulado) / (acumulado - anterior_acumulado)
+                return anterior_limite + (limite - anterior_limite) * fracao
+            anterior_limite, anterior_acumulado = limite, acumulado
+        return anterior_limite
+
+    @property
+    def media(self) -> float:
+        return self.soma / self.total if self.total else 0.0
+
+
+class _MetricasRota:
+    def __init__(self):
+        self.latencia = Histograma(BUCKETS_LATENCIA)
+        self.bytes = Histograma(BUCKETS_BYTES)
+        self.consultas = Histograma(BUCKETS_CONSULTAS)
+        self.status = Counter()
+
+
+class Medicao:
+    """
+    Uma requisição em andamento. Enquanto ativa, as chamadas ao
+    DatabaseManager feitas neste contexto são contadas.
+    """
+
+    def __init__(self, registro: "Metricas"):
+        self._registro = registro
+        self.rota = ROTA_DESCONHECIDA
+        self.status = 0
+        self.bytes = 0
+        self.consultas = md.ContadorConsultas()
+
+    def __enter__(self):
+        self._token = md.consultas_db.set(self.consultas)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duracao = time.perf_counter() - self._inicio
+        md.consultas_db.reset(self._token)
+        rota = self.rota if self.status != 404 else ROTA_DESCONHECIDA
+        self._registro.registrar(rota, self.status, duracao, self.bytes, self.consultas.total)
+        return False
+
+
+class Metricas:
+    """Registro de métricas por rota, compartilhado pelas threads do servidor"""
+
+    def __init__(self):
+        self._rotas: Dict[str, _MetricasRota] = {}
+        self._lock = threading.Lock()
+        self.inicio = time.time()
+
+    def medir(self) -> Medicao:
+        return Medicao(self)
+
+    def registrar(self, rota: str, status: int, duracao: float, tamanho: int, consultas: int):
+        with self._lock:
+            metricas = self._rotas.get(rota)
+            if metricas is None:
+                metricas = self._rotas[rota] = _MetricasRota()
+            metricas.latencia.observar(duracao)
+            metricas.bytes.observar(tamanho)
+            metricas.consultas.observar(consultas)
+            metricas.status[status] += 1
+
+    def texto_prometheus(self) -> str:
+        """Formato de exposição em texto do Prometheus (versão 0.0.4)"""
+        with self._lock:
+            rotas = sorted(self._rotas.items())
+            linhas = []
+
+            def histograma(nome, ajuda, atributo):
+                linhas.append(f"# HELP {nome} {ajuda}")
+                linhas.append(f"# TYPE {nome} histogram")
+                for rota, metricas in rotas:
+                    h = getattr(metricas, atributo)
+                    for limite, acumulado in h.cumulativos():
+                        le = "+Inf" if limite == float("inf") else repr(limite)
+                        linhas.append(f'{nome}_bucket{{rota="{rota}",le="{le}"}} {acumulado}')
+                    linhas.append(f'{nome}_sum{{rota="{rota}"}} {h.soma!r}')
+                    linhas.append(f'{nome}_count{{rota="{rota}"}} {h.total}')
+
+            histograma("biblioteca_requisicao_segundos", "Latência das requisições por rota", "latencia")
+            histograma("biblioteca_resposta_bytes", "Bytes enviados no corpo da resposta", "bytes")
+            histograma("biblioteca_consultas_db", "Chamadas ao DatabaseManager por requisição", "consultas")
+
+            linhas.append("# HELP biblioteca_requisicoes_total Requisições por rota e status")
+            linhas.append("# TYPE biblioteca_requisicoes_total counter")
+            for rota, metricas in rotas:
+                for status, total in sorted(metricas.status.items()):
+                    linhas.append(f'biblioteca_requisicoes_total{{rota="{rota}",status="{status}"}} {total}')
+        return "\n".join(linhas) + "\n"
+
+    def html_estatisticas(self) -> str:
+        """Tabela com percentis de latência, tamanho médio e consultas por rota"""
+        with self._lock:
+            linhas = []
+            for rota, m in sorted(self._rotas.items()):
+                status = ", ".join(f"{s}: {n}" for s, n in sorted(m.status.items()))
+                linhas.append(
+                    "<tr>"
+                    f"<td>{escape(rota)}</td>"
+                    f"<td>{m.latencia.total}</td>"
+                    f"<td>{m.latencia.quantil(0.5) * 1000:.1f}</td>"
+                    f"<td>{m.latencia.quantil(0.95) * 1000:.1f}</td>"
+                    f"<td>{m.latencia.quantil(0.99) * 1000:.1f}</td>"
+                    f"<td>{m.latencia.media * 1000:.1f}</td>"
+                    f"<td>{m.bytes.media:.0f}</td>"
+                    f"<td>{m.consultas.media:.1f}</td>"
+                    f"<td>{escape(status)}</td>"
+                    "</tr>"
+                )
+        ativo = time.time() - self.inicio
+        return (
+            "<!DOCTYPE html><html lang=\"pt-BR\"><head><meta charset=\"UTF-8\">"
+            "<title>Estatísticas do servidor</title>"
+            "<style>body{font-family:system-ui,sans-serif;margin:24px}"
+            "table{border-collapse:collapse}td,th{border:1px solid #e2e8f0;padding:6px 10px;text-align:right}"
+            "td:first-child,th:first-child{text-align:left}</style></head><body>"
+            f"<h1>Estatísticas por rota</h1><p>Ativo há {ativo:.0f} s. "
+            "Percentis estimados a partir dos buckets do histograma.</p>"
+            "<table><tr><th>Rota</th><th>Requisições</th><th>p50 ms</th><th>p95 ms</th>"
+            "<th>p99 ms</th><th>Média ms</th><th>Bytes médios</th><th>Consultas/req</th><th>Status</th></tr>"
+            + "".join(linhas) +
+            "</table></body></html>"
+        )
+
+
+registro = Metricas()
@@ -0,0 +1,505 @@
+"""
+Páginas e rotas da biblioteca, independentes do servidor HTTP
+
+Cada rota produz uma Resposta; BibliotecaController (threads) e
+servidor_async (asyncio) só diferem na forma de ler a requisição e
+escrever os bytes preparados por transmissao.preparar.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from html import escape
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qs, urlencode
+
+from Model import model as md
+import controler as ctl
+from src.report_service import ReportService
+from View_and_Interface.template_cache import Template, templates
+from View_and_Interface.estaticos import CACHE_IMUTAVEL, PREFIXO_URL, Arquivo, estaticos
+from View_and_Interface import paginas_relatorio as pr
+from View_and_Interface import metricas
+from View_and_Interface.compressao import etag_sem_codificacao
+from View_and_Interface.transmissao import json_array
+
+HTML = "text/html; charset=utf-8"
+JSON = "application/json; charset=utf-8"
+
+
+@dataclass
+class Resposta:
+    """
+    Resultado de uma rota.
+
+    `corpo` é enviado de uma vez, com Content-Length. Com `partes` a resposta
+    é transmitida em chunks à medida que o iterável é consumido (e é ele que
+    consulta o banco); `template`, se houver, envolve as partes com o
+    prefixo e o sufixo do HTML. `arquivo` é um estático enviado direto do
+    disco (sendfile), sem passar pela memória do processo.
+    """
+    status: int = 200
+    corpo: bytes = b""
+    partes: Optional[Iterable[bytes]] = None
+    template: Optional[Template] = None
+    content_type: str = HTML
+    etag: Optional[str] = None
+    cabecalhos: Dict[str, str] = field(default_factory=dict)
+    arquivo: Optional[Arquivo] = None
+
+
+def _esc(v):
+    return escape("" if v is None else str(v))
+
+
+# Instância do controller
+controller = ctl.Controler(login_required=False)
+
+# Serviço de relatórios incremental: com REPORT_CHECKPOINT definido, o estado
+# sobrevive a reinícios e só os empréstimos novos são reprocessados.
+REPORT_CHECKPOINT = os.getenv("REPORT_CHECKPOINT")
+report_service = ReportService.load_checkpoint(REPORT_CHECKPOINT) if REPORT_CHECKPOINT else ReportService()
+
+
+def _atualizar_relatorios():
+    if report_service.refresh(controller) and REPORT_CHECKPOINT:
+        report_service.save_checkpoint(REPORT_CHECKPOINT)
+
+
+def _etag(*partes):
+    """ETag forte derivado da versão do shell e, se houver, da versão dos dados"""
+    return '"' + hashlib.sha1(":".join(str(p) for p in partes).encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def _parametro(parametros, nome):
+    valores = parametros.get(nome)
+    return valores[0] if valores and valores[0].strip() else None
+
+
+def _paginacao(parametros):
+    """(tamanho, cursor, página) a partir de ?size=, ?cursor= e ?page="""
+    def inteiro(nome, padrao):
+        try:
+            return int(_parametro(parametros, nome) or padrao)
+        except ValueError:
+            return padrao
+
+    tamanho = min(max(inteiro("size", md.TAMANHO_PAGINA_PADRAO), 1), md.TAMANHO_PAGINA_MAXIMO)
+    return tamanho, _parametro(parametros, "cursor"), max(inteiro("page", 1), 1)
+
+
+def _links_paginacao(rota, pagina, filtros):
+    """Links anterior/próxima preservando filtros e tamanho da página"""
+    base = {nome: valor for nome, valor in filtros.items() if valor is not None}
+    if pagina.tamanho != md.TAMANHO_PAGINA_PADRAO:
+        base["size"] = pagina.tamanho
+
+    links = []
+    if pagina.pagina is None:
+        # Modo cursor só avança; o retorno é para o início da listagem
+        links.append(("← Início", base))
+    elif pagina.pagina > 1:
+        links.append(("← Anterior", {**base, "page": pagina.pagina - 1}))
+    if pagina.proximo_cursor is not None:
+        if pagina.pagina is None:
+            links.append(("Próxima →", {**base, "cursor": pagina.proximo_cursor}))
+        else:
+            links.append(("Próxima →", {**base, "page": pagina.pagina + 1}))
+
+    if not links:
+        return ""
+    ancoras = "".join(
+        f'<a href="{_esc(rota + ("?" + urlencode(query) if query else ""))}">{texto}</a>'
+        for texto, query in links
+    )
+    return f'<nav class="pagination">{ancoras}</nav>'
+
+
+def _card_usuario(usuario):
+    # Define o ícone e classe baseado no tipo de usuário
+    if usuario.type == "Professor":
+        icon = "👨‍🏫"
+        type_class = "type-professor"
+    elif usuario.type == "Funcionário":
+        icon = "👔"
+        type_class = "type-employee"
+    else:
+        icon = "🎓"
+        type_class = "type-student"
+
+    return f"""
+                    <div class="user-card">
+                        <div class="user-header">
+                            <div class="user-avatar">{icon}</div>
+                            <div class="user-info">
+                                <h3>{_esc(usuario.name)}</h3>
+                                <div class="user-role">Membro da Comunidade Acadêmica</div>
+                            </div>
+                        </div>
+
+                        <div class="user-details">
+                            <div class="detail-item">
+                                <div class="detail-label">Identificação</div>
+                                <div class="detail-value">{_esc(usuario.id)}</div>
+                            </div>
+                            <div class="detail-item">
+                                <div class="detail-label">Email Institucional</div>
+                                <div class="detail-value">{_esc(usuario.email)}</div>
+                            </div>
+                        </div>
+
+                        <div class="user-type-badge {type_class}">
+                            <span>{icon}</span>
+                            <span>{_esc(usuario.type)}</span>
+                        </div>
+                    </div>
+                    """
+
+
+def _card_livro(livro, is_borrowed):
+    status = "Emprestado" if is_borrowed else "Disponível"
+    status_class = "status-borrowed" if is_borrowed else "status-available"
+    icon = "🔒" if is_borrowed else "📚"
+
+    return f"""
+                    <div class="book-card">
+                        <div class="book-header">
+                            <div class="book-icon">{icon}</div>
+                            <div class="book-title-section">
+                                <h3>{_esc(livro.title)}</h3>
+                                <div class="book-category">{_esc(livro.category)}</div>
+                            </div>
+                        </div>
+
+                        <div class="book-details">
+                            <div class="detail-item">
+                                <div class="detail-label">Autor</div>
+                                <div class="detail-value">{_esc(livro.author)}</div>
+                            </div>
+                            <div class="detail-item">
+                                <div class="detail-label">Código ISBN</div>
+                                <div class="detail-value">{_esc(livro.isbn)}</div>
+                            </div>
+                        </div>
+
+                        <div class="status-section">
+                            <div class="status-badge {status_class}">
+                                <span>{icon}</span>
+                                <span>{status}</span>
+                            </div>
+                        </div>
+                    </div>
+                    """
+
+
+def _card_emprestimo(emprestimo_ativo, livro, usuario):
+    usuario_nome = usuario.name if usuario else "Usuário não encontrado"
+    status_class = "status-active"
+    status_text = "Em andamento"
+    icon = "📖"
+    emprestimo_id = emprestimo_ativo.id
+    data_emprestimo = emprestimo_ativo.loan_date.strftime("%d/%m/%Y")
+
+    return f"""
+                    <div class="loan-card">
+                        <div class="loan-header">
+                            <div class="loan-icon">{icon}</div>
+                            <div class="loan-info">
+                                <h3>{_esc(livro.title)}</h3>
+                                <div class="loan-id">Empréstimo {_esc(emprestimo_id)}</div>
+                            </div>
+                        </div>
+
+                        <div class="loan-details">
+                            <div class="detail-item">
+                                <div class="detail-label">Usuário Responsável</div>
+                                <div class="detail-value">{_esc(usuario_nome)}</div>
+                            </div>
+                            <div class="detail-item">
+                                <div class="detail-label">Data do Empréstimo</div>
+                                <div class="detail-value">{data_emprestimo}</div>
+                            </div>
+                        </div>
+
+                        <div class="status-section">
+                            <div class="status-badge {status_class}">
+                                <span>{icon}</span>
+                                <span>{status_text}</span>
+                            </div>
+                        </div>
+                    </div>
+                    """
+
+
+def _conteudo_usuarios(rota, tamanho, cursor, numero, tipo):
+    """Cartões de uma página de usuários; a consulta só roda quando o gerador é consumido"""
+    pagina = controller.get_usuarios_pagina(tamanho, cursor, numero, tipo)
+    if not pagina.itens:
+        yield '<div class="no-users">Nenhum usuário cadastrado com dados completos.</div>'
+    for usuario in pagina.itens:
+        yield _card_usuario(usuario)
+    yield _links_paginacao(rota, pagina, {"tipo": tipo})
+
+
+def _conteudo_livros(rota, tamanho, cursor, numero, autor, categoria):
+    """Cartões de uma página de livros"""
+    pagina = controller.get_livros_pagina(tamanho, cursor, numero, autor, categoria)
+
+    # FONTE DA VERDADE: empréstimos ativos determinam status dos livros
+    # (consultados apenas para os livros desta página)
+    emprestimos_ativos_set = {
+        str(book_id).strip()
+        for book_id in controller.get_ids_livros_emprestados([l.id for l in pagina.itens])
+    }
+
+    if not pagina.itens:
+        yield '<div class="no-users">Nenhum livro cadastrado com dados completos.</div>'
+    for livro in pagina.itens:
+        yield _card_livro(livro, str(livro.id).strip() in emprestimos_ativos_set)
+    yield _links_paginacao(rota, pagina, {"autor": autor, "categoria": categoria})
+
+
+def _conteudo_busca(consulta, limite):
+    """Cartões dos livros encontrados, do mais relevante para o menos"""
+    if consulta is None:
+        yield '<div class="search-summary">Digite um título, autor ou ISBN para buscar.</div>'
+        return
+    livros = controller.buscar_livros(consulta, limite)
+    emprestados = {
+        str(book_id).strip()
+        for book_id in controller.get_ids_livros_emprestados([l.id for l in livros])
+    } if livros else set()
+
+    if not livros:
+        yield f'<div class="no-users">Nenhum livro encontrado para “{_esc(consulta)}”.</div>'
+        return
+    plural = "livro encontrado" if len(livros) == 1 else "livros encontrados"
+    yield f'<div class="search-summary">{len(livros)} {plural} para “{_esc(consulta)}”</div>'
+    for livro in livros:
+        yield _card_livro(livro, str(livro.id).strip() in emprestados)
+
+
+def _conteudo_emprestimos(rota, tamanho, cursor, numero, usuario_filtro):
+    """Cartões de uma página de empréstimos ativos, um por livro"""
+    # Uma única consulta paginada traz empréstimo ativo + livro + usuário
+    pagina = controller.get_emprestimos_ativos_pagina(tamanho, cursor, numero, usuario_filtro)
+
+    livros_vistos = set()
+    for emprestimo, livro, usuario in pagina.itens:
+        if str(livro.id).strip() in livros_vistos:
+            continue
+        livros_vistos.add(str(livro.id).strip())
+        yield _card_emprestimo(emprestimo, livro, usuario)
+
+    if not livros_vistos:
+        yield '<div class="no-users">Nenhum livro emprestado no momento.</div>'
+    yield _links_paginacao(rota, pagina, {"usuario": usuario_filtro})
+
+
+def _nao_modificado(cabecalhos, etag):
+    """
+    ETag a devolver no 304 se o If-None-Match contém `etag` em alguma
+    codificação (comparação fraca), ou None. É o que o cliente já tem: a
+    variante gzip revalida com '"…-gzip"'.
+    """
+    if_none_match = cabecalhos.get("If-None-Match")
+    if not if_none_match:
+        return None
+    for candidato in (c.strip() for c in if_none_match.split(",")):
+        if candidato == "*":
+            return etag
+        if etag_sem_codificacao(candidato) == etag:
+            return candidato[2:] if candidato.startswith("W/") else candidato
+    return None
+
+
+def _pagina_template(nome, marcador, conteudo):
+    """Template com os pedaços de `conteudo` (strings) transmitidos no lugar do marcador"""
+    return Resposta(
+        partes=(parte.encode("utf-8") for parte in conteudo if parte),
+        template=templates.carregar(nome, marcador),
+    )
+
+
+def _relatorio_livros():
+    # Obter dados para o relatório (apenas o delta desde a última consulta)
+    _atualizar_relatorios()
+    relatorio_livros = report_service.get_current_most_borrowed_books(controller.get_livros())
+
+    partes = [pr.RELATORIO_LIVROS_PREFIXO]
+    if relatorio_livros:
+        linhas = []
+        for i, livro in enumerate(relatorio_livros, 1):
+            titulo = livro.get('title', f'ID: {livro.get("book_id", "N/A")}')
+            autor = livro.get('author', 'N/A')
+            emprestimos_count = livro.get('loan_count', 0)
+
+            linhas.append(
+                '<tr>'
+                f'<td><span class="position-badge">{i}</span></td>'
+                '<td>'
+                '<div class="book-info">'
+                f'<div class="book-details"><h4>{_esc(titulo)}</h4><p>Livro técnico</p></div>'
+                '</div>'
+                '</td>'
+                f'<td>{_esc(autor)}</td>'
+                f'<td><span class="loans-count">{emprestimos_count}</span></td>'
+                '</tr>'
+            )
+        partes += [pr.RELATORIO_LIVROS_TABELA_INICIO, "".join(linhas).encode("utf-8"), pr.RELATORIO_TABELA_FIM]
+    else:
+        partes.append(pr.RELATORIO_SEM_DADOS)
+    partes.append(pr.RELATORIO_SUFIXO)
+
+    return b"".join(partes)
+
+
+def _relatorio_usuarios():
+    # Obter dados para o relatório (apenas o delta desde a última consulta)
+    _atualizar_relatorios()
+    relatorio_usuarios = report_service.get_current_most_active_users(controller.get_usuarios())
+
+    partes = [pr.RELATORIO_USUARIOS_PREFIXO]
+    if relatorio_usuarios:
+        linhas = []
+        for i, usuario in enumerate(relatorio_usuarios, 1):
+            nome = usuario.get('name', f'ID: {usuario.get("user_id", "N/A")}')
+            email = usuario.get('email', 'N/A')
+            tipo = usuario.get('type', 'N/A')
+            emprestimos_count = usuario.get('loan_count', 0)
+
+            # Emoji baseado no tipo de usuário
+            avatar_emoji = "🎓" if tipo == "Estudante" else "👨‍🏫" if tipo == "Professor" else "👔"
+
+            linhas.append(
+                '<tr>'
+                f'<td><span class="position-badge">{i}</span></td>'
+                '<td>'
+                '<div class="user-info">'
+                f'<div class="user-avatar">{avatar_emoji}</div>'
+                f'<div class="user-details"><h4>{_esc(nome)}</h4><p>ID: {usuario.get("user_id", "N/A")}</p></div>'
+                '</div>'
+                '</td>'
+                f'<td>{_esc(email)}</td>'
+                f'<td><span class="user-type">{_esc(tipo)}</span></td>'
+                f'<td><span class="loans-count">{emprestimos_count}</span></td>'
+                '</tr>'
+            )
+        partes += [pr.RELATORIO_USUARIOS_TABELA_INICIO, "".join(linhas).encode("utf-8"), pr.RELATORIO_TABELA_FIM]
+    else:
+        partes.append(pr.RELATORIO_SEM_DADOS)
+    partes.append(pr.RELATORIO_SUFIXO)
+
+    return b"".join(partes)
+
+
+def responder(caminho, cabecalhos) -> Resposta:
+    """
+    Resposta para GET `caminho`. `cabecalhos` é qualquer mapeamento com
+    .get() sem distinção de maiúsculas (http.client.HTTPMessage).
+    """
+    rota, _, query = caminho.partition("?")
+    parametros = parse_qs(query)
+
+    if rota == "/":
+        return Resposta(302, cabecalhos={"Location": "/menu"})
+
+    if rota == "/menu":
+        template = templates.carregar("menu.html")
+        etag = _etag(template.versao)
+        validado = _nao_modificado(cabecalhos, etag)
+        if validado:
+            return Resposta(304, etag=validado)
+        return Resposta(corpo=template.prefixo, etag=etag)
+
+    if rota == "/relatorios":
+        # Página totalmente estática: o ETag depende só do shell
+        etag = _etag(pr.HASH_SHELLS)
+        validado = _nao_modificado(cabecalhos, etag)
+        if validado:
+            return Resposta(304, etag=validado)
+        return Resposta(corpo=pr.RELATORIOS, etag=etag)
+
+    if rota in ("/relatorios_livros", "/relatorios_usuarios"):
+        # A rota entra no ETag: os dois relatórios têm o mesmo shell e a mesma
+        # versão dos dados, mas corpos (e variantes comprimidas) diferentes
+        etag = _etag(rota, pr.HASH_SHELLS, controller.get_versao_dados())
+        validado = _nao_modificado(cabecalhos, etag)
+        if validado:
+            return Resposta(304, etag=validado)
+        gerar = _relatorio_livros if rota == "/relatorios_livros" else _relatorio_usuarios
+        return Resposta(corpo=gerar(), etag=etag)
+
+    if rota in ("/listar_usuarios", "/listar_livros", "/listar_emprestimos"):
+        # Paginação e filtros feitos no banco; a consulta só roda quando as
+        # partes são consumidas, depois do prefixo do template já ter saído
+        tamanho, cursor, numero = _paginacao(parametros)
+        if rota == "/listar_usuarios":
+            conteudo = _conteudo_usuarios(rota, tamanho, cursor, numero, _parametro(parametros, "tipo"))
+            return _pagina_template("listar_usuarios.html", "<!--USUARIOS-->", conteudo)
+        if rota == "/listar_livros":
+            conteudo = _conteudo_livros(rota, tamanho, cursor, numero, _parametro(parametros, "autor"),
+                                        _parametro(parametros, "categoria"))
+            return _pagina_template("listar_livros.html", "<!--LIVROS-->", conteudo)
+        conteudo = _conteudo_emprestimos(rota, tamanho, cursor, numero, _parametro(parametros, "usuario"))
+        return _pagina_template("listar_emprestimos.html", "<!--EMPRESTIMOS-->", conteudo)
+
+    if rota in ("/buscar", "/api/livros/sugestoes") and not controller.indice_busca_pronto():
+        # Índice ainda em montagem (logo após iniciar o servidor): responde já,
+        # sem segurar a requisição até o fim da montagem
+        mensagem = "O índice de busca ainda está sendo montado. Tente novamente em instantes."
+        if rota == "/buscar":
+            corpo, tipo = f"<h1>503 - {mensagem}</h1>".encode("utf-8"), HTML
+        else:
+            corpo, tipo = json.dumps({"erro": mensagem}, ensure_ascii=False).encode("utf-8"), JSON
+        return Resposta(503, corpo=corpo, content_type=tipo, cabecalhos={"Retry-After": "5"})
+
+    if rota == "/buscar":
+        # Mesma página do catálogo, com os resultados no lugar da listagem
+        tamanho = _paginacao(parametros)[0]
+        conteudo = _conteudo_busca(_parametro(parametros, "q"), tamanho)
+        return _pagina_template("listar_livros.html", "<!--LIVROS-->", conteudo)
+
+    if rota == "/api/livros/sugestoes":
+        termos = controller.sugerir_termos_livros(_parametro(parametros, "q") or "")
+        return Resposta(corpo=json.dumps(termos, ensure_ascii=False).encode("utf-8"), content_type=JSON)
+
+    if rota == "/api/usuarios":
+        return Resposta(partes=json_array(u.to_dict() for u in controller.iter_usuarios()), content_type=JSON)
+
+    if rota == "/api/livros":
+        return Resposta(partes=json_array(b.to_dict() for b in controller.iter_livros()), content_type=JSON)
+
+    if rota == "/api/emprestimos":
+        return Resposta(partes=json_array(l.to_dict() for l in controller.iter_emprestimos()), content_type=JSON)
+
+    if rota == "/api/relatorios/livros":
+        _atualizar_relatorios()
+        relatorio = report_service.get_current_most_borrowed_books(controller.get_livros())
+        return Resposta(partes=json_array(relatorio), content_type=JSON)
+
+    if rota == "/api/relatorios/usuarios":
+        _atualizar_relatorios()
+        relatorio = report_service.get_current_most_active_users(controller.get_usuarios())
+        return Resposta(partes=json_array(relatorio), content_type=JSON)
+
+    if rota.startswith(PREFIXO_URL):
+        arquivo = estaticos.obter(rota[len(PREFIXO_URL):])
+        if arquivo is None:
+            return Resposta(404, corpo="<h1>404 - Página não encontrada</h1>".encode("utf-8"))
+        # Nome com hash nunca muda de conteúdo; o nome simples revalida sempre
+        cache = {"Cache-Control": CACHE_IMUTAVEL if arquivo.imutavel else "no-cache"}
+        validado = _nao_modificado(cabecalhos, arquivo.etag)
+        if validado:
+            return Resposta(304, etag=validado, cabecalhos=cache)
+        return Resposta(content_type=arquivo.content_type, etag=arquivo.etag, cabecalhos=cache,
+                        arquivo=arquivo)
+
+    if rota == "/metrics":
+        return Resposta(corpo=metricas.registro.texto_prometheus().encode("utf-8"),
+                        content_type=metricas.CONTENT_TYPE_PROMETHEUS)
+
+    if rota == "/debug/stats":
+        return Resposta(corpo=metricas.registro.html_estatisticas().encode("utf-8"))
+
+    return Resposta(404, corpo="<h1>404 - Página não encontrada</h1>".encode("utf-8"))
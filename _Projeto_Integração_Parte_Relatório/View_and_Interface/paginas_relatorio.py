@@ -0,0 +1,157 @@
+"""
+Shells estáticos das páginas de relatório, montados e codificados uma única vez
+"""
+import hashlib
+
+from View_and_Interface.estaticos import estaticos
+
+RELATORIOS = "".join((
+    '<!DOCTYPE html>',
+    '<html lang="pt-BR">',
+    '<head>',
+    '<meta charset="UTF-8">',
+    '<meta name="viewport" content="width=device-width, initial-scale=1.0">',
+    '<title>Relatórios Executivos - Sistema de Biblioteca</title>',
+    f'<link rel="stylesheet" href="{estaticos.url("icones.css")}">',
+    f'<link rel="stylesheet" href="{estaticos.url("relatorios.css")}">',
+    '</head>',
+    '<body>',
+    '<div class="header">',
+    '<h1>Relatórios e Analytics</h1>',
+    '<p>Análises estatísticas e métricas do sistema bibliotecário</p>',
+    '</div>',
+    '<div class="container">',
+    '<div class="reports-grid">',
+    '<div class="report-card">',
+    '<span class="report-card-icon"><i class="fas fa-book"></i></span>',
+    '<h3>Análise de Acervo</h3>',
+    '<p>Relatório detalhado dos livros mais emprestados, identificando tendências de demanda e preferências dos usuários.</p>',
+    '<a href="/relatorios_livros"><i class="fas fa-chart-line"></i> Ver Relatório de Livros</a>',
+    '</div>',
+    '<div class="report-card">',
+    '<span class="report-card-icon"><i class="fas fa-users"></i></span>',
+    '<h3>Perfil dos Usuários</h3>',
+    '<p>Métricas sobre o comportamento dos usuários, destacando os mais ativos e padrões de utilização.</p>',
+    '<a href="/relatorios_usuarios"><i class="fas fa-chart-bar"></i> Ver Relatório de Usuários</a>',
+    '</div>',
+    '</div>',
+    '<div style="text-align:center">',
+    '<a href="/menu" class="back-btn"><i class="fas fa-arrow-left"></i> Retornar ao Portal</a>',
+    '</div>',
+    '</div>',
+    '</body>',
+    '</html>',
+)).encode("utf-8")
+
+
+RELATORIO_LIVROS_PREFIXO = "".join((
+    '<!DOCTYPE html>',
+    '<html lang="pt-BR">',
+    '<head>',
+    '<meta charset="UTF-8">',
+    '<meta name="viewport" content="width=device-width, initial-scale=1.0">',
+    '<title>Análise de Acervo - Sistema de Biblioteca</title>',
+    f'<link rel="stylesheet" href="{estaticos.url("icones.css")}">',
+    f'<link rel="stylesheet" href="{estaticos.url("relatorio.css")}">',
+    '</head>',
+    '<body>',
+    '<div class="header">',
+    '<h1>Análise de Acervo</h1>',
+    '<p>Relatório de livros mais emprestados</p>',
+    '</div>',
+    '<div class="container">',
+    '<div class="report-title">',
+    '<h1>Ranking de Popularidade</h1>',
+    '<p>Métricas de demanda por título bibliográfico</p>',
+    '</div>',
+)).encode("utf-8")
+
+
+RELATORIO_LIVROS_TABELA_INICIO = "".join((
+    '<table>',
+    '<thead>',
+    '<tr>',
+    '<th>Posição</th>',
+    '<th>Título do Livro</th>',
+    '<th>Autor</th>',
+    '<th>Total de Empréstimos</th>',
+    '</tr>',
+    '</thead>',
+    '<tbody>',
+)).encode("utf-8")
+
+
+RELATORIO_TABELA_FIM = "".join((
+    '</tbody>',
+    '</table>',
+)).encode("utf-8")
+
+
+RELATORIO_SEM_DADOS = "".join((
+    '<div class="no-data">',
+    '<p>Nenhum empréstimo registrado no sistema ainda.</p>',
+    '<p>Os dados aparecerão aqui após a realização dos primeiros empréstimos.</p>',
+    '</div>',
+)).encode("utf-8")
+
+
+RELATORIO_SUFIXO = "".join((
+    '<div class="actions">',
+    '<a href="/relatorios" class="btn btn-secondary"><i class="fas fa-arrow-left"></i> Retornar aos Relatórios</a>',
+    '<a href="/menu" class="btn btn-primary"><i class="fas fa-home"></i> Ir para o Portal</a>',
+    '</div>',
+    '</div>',
+    '</body>',
+    '</html>',
+)).encode("utf-8")
+
+
+RELATORIO_USUARIOS_PREFIXO = "".join((
+    '<!DOCTYPE html>',
+    '<html lang="pt-BR">',
+    '<head>',
+    '<meta charset="UTF-8">',
+    '<meta name="viewport" content="width=device-width, initial-scale=1.0">',
+    '<title>Perfil dos Usuários - Sistema de Biblioteca</title>',
+    f'<link rel="stylesheet" href="{estaticos.url("icones.css")}">',
+    f'<link rel="stylesheet" href="{estaticos.url("relatorio.css")}">',
+    '</head>',
+    '<body>',
+    '<div class="header">',
+    '<h1>Perfil dos Usuários</h1>',
+    '<p>Relatório de usuários mais ativos</p>',
+    '</div>',
+    '<div class="container">',
+    '<div class="report-title">',
+    '<h1>Ranking de Atividade</h1>',
+    '<p>Métricas de engajamento e frequência de empréstimos</p>',
+    '</div>',
+)).encode("utf-8")
+
+
+RELATORIO_USUARIOS_TABELA_INICIO = "".join((
+    '<table>',
+    '<thead>',
+    '<tr>',
+    '<th>Posição</th>',
+    '<th>Usuário</th>',
+    '<th>Email</th>',
+    '<th>Categoria</th>',
+    '<th>Total de Empréstimos</th>',
+    '</tr>',
+    '</thead>',
+    '<tbody>',
+)).encode("utf-8")
+
+
+# Identifica a versão dos shells: muda sempre que o HTML/CSS acima muda
+HASH_SHELLS = hashlib.sha1(b"".join((
+    RELATORIOS,
+    RELATORIO_LIVROS_PREFIXO,
+    RELATORIO_LIVROS_TABELA_INICIO,
+    RELATORIO_USUARIOS_PREFIXO,
+    RELATORIO_USUARIOS_TABELA_INICIO,
+    RELATORIO_TABELA_FIM,
+    RELATORIO_SEM_DADOS,
+    RELATORIO_SUFIXO,
+))).hexdigest()
@@ -0,0 +1,38 @@
+// Sugestões enquanto o usuário digita na busca do catálogo
+(function () {
+    var campo = document.querySelector('.search-form input[name="q"]');
+    var lista = document.getElementById('sugestoes-livros');
+    if (!campo || !lista) {
+        return;
+    }
+    var espera = null;
+    var pedido = 0;
+
+    campo.addEventListener('input', function () {
+        clearTimeout(espera);
+        espera = setTimeout(function () {
+            var texto = campo.value;
+            var numero = ++pedido;
+            if (!/[\wÀ-ɏ]$/.test(texto)) {
+                lista.innerHTML = '';
+                return;
+            }
+            fetch('/api/livros/sugestoes?q=' + encodeURIComponent(texto))
+                .then(function (resposta) { return resposta.json(); })
+                .then(function (termos) {
+                    if (numero !== pedido) {
+                        return;  // já existe uma consulta mais nova
+                    }
+                    // Completa a última palavra, mantendo o que já foi digitado antes dela
+                    var inicio = texto.replace(/[\wÀ-ɏ]+$/, '');
+                    lista.innerHTML = '';
+                    termos.forEach(function (termo) {
+                        var opcao = document.createElement('option');
+                        opcao.value = inicio + termo;
+                        lista.appendChild(opcao);
+                    });
+                })
+                .catch(function () {});
+        }, 120);
+    });
+})();
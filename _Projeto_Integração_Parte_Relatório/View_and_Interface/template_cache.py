@@ -0,0 +1,82 @@
+"""
+Cache dos templates HTML da View, já divididos e codificados em bytes
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from View_and_Interface.compressao import ShellGzip
+from View_and_Interface.estaticos import estaticos
+
+TEMPLATES_DIR = Path(__file__).resolve().parent
+
+
+class Template(NamedTuple):
+    mtime: float
+    prefixo: bytes
+    sufixo: bytes
+    versao: str  # hash do conteúdo, usado em ETags e no cache de compressão
+
+
+class TemplateCache:
+    """
+    Carrega cada template uma única vez e o divide no marcador <!--...-->
+    em prefixo e sufixo já codificados em UTF-8. As referências a
+    /static/... são trocadas pelas URLs com hash do conteúdo.
+
+    Em modo dev (BIBLIOTECA_DEV=1) o mtime do arquivo é verificado a cada
+    acesso e o template é recarregado quando muda.
+    """
+
+    def __init__(self, diretorio: Path = TEMPLATES_DIR, dev: Optional[bool] = None):
+        self.diretorio = Path(diretorio)
+        self.dev = os.getenv("BIBLIOTECA_DEV") == "1" if dev is None else dev
+        self._cache: Dict[Tuple[str, Optional[str]], Template] = {}
+        self._shells_gzip: Dict[str, ShellGzip] = {}
+
+    def carregar(self, nome: str, marcador: Optional[str] = None) -> Template:
+        chave = (nome, marcador)
+        entrada = self._cache.get(chave)
+        if entrada is not None and not self.dev:
+            return entrada
+
+        caminho = self.diretorio / nome
+        mtime = caminho.stat().st_mtime
+        if entrada is not None and entrada.mtime == mtime:
+            return entrada
+
+        conteudo = estaticos.reescrever(caminho.read_text(encoding="utf-8"))
+        if marcador is None:
+            prefixo, sufixo = conteudo, ""
+        elif marcador in conteudo:
+            prefixo, sufixo = conteudo.split(marcador, 1)
+        else:
+            raise ValueError(f"Marcador {marcador} não encontrado em {nome}")
+
+        # Atribuição única ao dict: threads concorrentes veem a entrada
+        # antiga ou a nova, nunca uma parcial
+        entrada = Template(
+            mtime,
+            prefixo.encode("utf-8"),
+            sufixo.encode("utf-8"),
+            hashlib.sha1(conteudo.encode("utf-8")).hexdigest(),
+        )
+        self._cache[chave] = entrada
+        return entrada
+
+    def partes(self, nome: str, marcador: Optional[str] = None) -> Tuple[bytes, bytes]:
+        """Retorna (prefixo, sufixo) do template; sem marcador o sufixo é vazio"""
+        entrada = self.carregar(nome, marcador)
+        return entrada.prefixo, entrada.sufixo
+
+    def shell_gzip(self, template: Template) -> ShellGzip:
+        """Compressor gzip com o prefixo do template já processado"""
+        shell = self._shells_gzip.get(template.versao)
+        if shell is None:
+            shell = ShellGzip(template.prefixo)
+            self._shells_gzip[template.versao] = shell
+        return shell
+
+
+templates = TemplateCache()
@@ -0,0 +1,199 @@
+"""
+Preparação das respostas para o socket: compressão, Content-Length ou
+Transfer-Encoding: chunked. Compartilhado pelos servidores com threads e asyncio.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from View_and_Interface.compressao import (
+    TAMANHO_MINIMO, CacheComprimidos, CompressorIncremental, comprimir, escolher_codificacao, etag_codificado
+)
+from View_and_Interface.template_cache import templates
+
+# Escritas menores são agrupadas até esse tamanho antes de virar um chunk
+TAMANHO_CHUNK = 16 * 1024
+
+
+class EscritorChunked:
+    """
+    Agrupa escritas pequenas e as envia como chunks HTTP/1.1 de ~TAMANHO_CHUNK bytes.
+
+    Com `chunked=False` (clientes HTTP/1.0) os bytes vão direto e o fim da
+    resposta é sinalizado pelo fechamento da conexão. Com um `compressor`
+    (CompressorIncremental) cada chunk é comprimido e sincronizado antes de sair.
+    """
+
+    def __init__(self, wfile, chunked: bool = True, tamanho_chunk: int = TAMANHO_CHUNK,
+                 compressor=None):
+        self._wfile = wfile
+        self.chunked = chunked
+        self.tamanho_chunk = tamanho_chunk
+        self.compressor = compressor
+        self._buffer = []
+        self._pendente = 0
+        self.enviados = 0
+
+    def write(self, dados: bytes):
+        if not dados:
+            return
+        self._buffer.append(dados)
+        self._pendente += len(dados)
+        if self._pendente >= self.tamanho_chunk:
+            self.flush()
+
+    def flush(self, forcar: bool = False):
+        """Envia o buffer; com `forcar` envia mesmo vazio (o compressor pode ter dados retidos)"""
+        if not self._pendente and not (forcar and self.compressor is not None):
+            return
+        dados = b"".join(self._buffer)
+        self._buffer.clear()
+        self._pendente = 0
+        if self.compressor is not None:
+            dados = self.compressor.comprimir(dados)
+        self._enviar(dados)
+
+    def _enviar(self, dados: bytes):
+        if not dados:
+            return
+        if self.chunked:
+            # Um único write por chunk: tamanho, dados e CRLF no mesmo segmento
+            self._wfile.write(b"%x\r\n%s\r\n" % (len(dados), dados))
+        else:
+            self._wfile.write(dados)
+        self.enviados += len(dados)
+
+    def close(self):
+        """Envia o que restou e, em modo chunked, o chunk final de tamanho zero"""
+        if self.compressor is not None:
+            dados = b"".join(self._buffer)
+            self._buffer.clear()
+            self._pendente = 0
+            self._enviar(self.compressor.finalizar(dados))
+        else:
+            self.flush()
+        if self.chunked:
+            self._wfile.write(b"0\r\n\r\n")
+
+
+def _json_padrao(valor: Any):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    raise TypeError(f"{type(valor).__name__} não é serializável em JSON")
+
+
+def json_array(itens: Iterable[dict]) -> Iterator[bytes]:
+    """Codifica `itens` como um array JSON, um item por vez"""
+    separador = b"["
+    for item in itens:
+        yield separador + json.dumps(item, ensure_ascii=False, default=_json_padrao).encode("utf-8")
+        separador = b","
+    yield b"[]" if separador == b"[" else b"]"
+
+
+# Variantes comprimidas das páginas identificadas por ETag
+comprimidos = CacheComprimidos()
+
+
+class Envio(NamedTuple):
+    """
+    O que o servidor escreve: status, cabeçalhos e corpo inteiro, blocos já
+    enquadrados ou um arquivo a ser enviado com sendfile
+    """
+    status: int
+    cabecalhos: List[Tuple[str, str]]
+    corpo: bytes = b""
+    blocos: Optional[Iterator[bytes]] = None
+    fechar: bool = False  # sem chunked (HTTP/1.0) o fim do corpo é o fim da conexão
+    arquivo: Optional[Path] = None
+
+
+class _Coletor:
+    def __init__(self):
+        self.blocos = []
+
+    def write(self, dados: bytes):
+        self.blocos.append(dados)
+
+
+def _blocos(resposta, inicio: bytes, chunked: bool, compressor) -> Iterator[bytes]:
+    """Bytes prontos para o socket; cada next() produz no máximo ~TAMANHO_CHUNK"""
+    coletor = _Coletor()
+    escritor = EscritorChunked(coletor, chunked, compressor=compressor)
+
+    def drenar():
+        blocos, coletor.blocos = coletor.blocos, []
+        return blocos
+
+    # O início vai já, antes da consulta ao banco: é o que o navegador
+    # precisa para começar a baixar CSS e desenhar o cabeçalho
+    escritor.write(inicio)
+    escritor.flush(forcar=True)
+    yield from drenar()
+    for parte in resposta.partes:
+        escritor.write(parte)
+        yield from drenar()
+    if resposta.template is not None:
+        escritor.write(resposta.template.sufixo)
+    escritor.close()
+    yield from drenar()
+
+
+def preparar(resposta, accept_encoding: Optional[str], http10: bool = False) -> Envio:
+    """
+    Converte uma paginas.Resposta em um Envio para o cliente que mandou
+    `accept_encoding`. Se a resposta é transmitida, os blocos consomem
+    `resposta.partes` preguiçosamente.
+    """
+    if resposta.status == 304:
+        return Envio(304, [("ETag", resposta.etag),
+                           ("Cache-Control", resposta.cabecalhos.get("Cache-Control", "no-cache"))])
+
+    if resposta.arquivo is not None:
+        # Estáticos saem do disco sem compressão: são pequenos, e comprimir
+        # exigiria ler o arquivo para a memória, o que o sendfile evita
+        arquivo = resposta.arquivo
+        cabecalhos = [("Content-type", resposta.content_type), ("Content-Length", str(arquivo.tamanho)),
+                      ("ETag", arquivo.etag)]
+        cabecalhos.extend(resposta.cabecalhos.items())
+        return Envio(resposta.status, cabecalhos, arquivo=arquivo.caminho)
+
+    cabecalhos = [("Content-type", resposta.content_type), ("Vary", "Accept-Encoding")]
+    cabecalhos.extend(resposta.cabecalhos.items())
+
+    if resposta.partes is not None:
+        codificacao = escolher_codificacao(accept_encoding)
+        compressor = None
+        inicio = resposta.template.prefixo if resposta.template is not None else b""
+        if codificacao == "gzip" and resposta.template is not None:
+            # O estado do zlib após o prefixo vem pronto do shell
+            compressor = CompressorIncremental(codificacao, templates.shell_gzip(resposta.template))
+            inicio = b""
+        elif codificacao:
+            compressor = CompressorIncremental(codificacao)
+
+        if codificacao:
+            cabecalhos.append(("Content-Encoding", codificacao))
+        if http10:
+            cabecalhos.append(("Connection", "close"))
+        else:
+            cabecalhos.append(("Transfer-Encoding", "chunked"))
+        return Envio(resposta.status, cabecalhos, blocos=_blocos(resposta, inicio, not http10, compressor),
+                     fechar=http10)
+
+    corpo = resposta.corpo
+    codificacao = escolher_codificacao(accept_encoding) if len(corpo) >= TAMANHO_MINIMO else None
+    if codificacao:
+        # Mesmo ETag implica mesmo corpo: a variante comprimida é reaproveitada
+        # (e sai com o ETag próprio da codificação)
+        if resposta.etag:
+            corpo = comprimidos.obter(resposta.etag, codificacao, corpo)
+        else:
+            corpo = comprimir(corpo, codificacao)
+        cabecalhos.append(("Content-Encoding", codificacao))
+    cabecalhos.append(("Content-Length", str(len(corpo))))
+    if resposta.etag:
+        # no-cache: o navegador guarda a página mas revalida a cada acesso
+        cabecalhos += [("ETag", etag_codificado(resposta.etag, codificacao)), ("Cache-Control", "no-cache")]
+    return Envio(resposta.status, cabecalhos, corpo)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Teste de carga: HTTPServer, PooledHTTPServer e ServidorAsync
+
+Clientes keep-alive fazem requisições em sequência durante --duracao
+segundos. No segundo cenário, --ociosas conexões keep-alive ficam abertas
+sem enviar nada, como navegadores parados numa página: no pool elas ocupam
+os workers até o timeout; no asyncio custam só uma corrotina cada. O
+HTTPServer original fica fora desse cenário porque a primeira conexão
+ociosa bloqueia o servidor inteiro até o timeout.
+
+Uso:
+    python benchmarks/benchmark_async.py [--rota /relatorios_livros] [--latencia-db 20] [--ociosas 1000]
+"""
+import argparse
+import asyncio
+import http.client
+import socket
+import sys
+import threading
+import time
+from http.server import HTTPServer
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from Model import model as md
+from View_and_Interface import view as vw
+from servidor_pool import PooledHTTPServer
+from servidor_async import ServidorAsync
+from benchmarks.benchmark_servidor import _simular_latencia
+
+
+class _Threaded:
+    def __init__(self, servidor):
+        self.servidor = servidor
+        self.endereco = servidor.server_address
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    def parar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+class _Async:
+    def __init__(self, workers):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.servidor = ServidorAsync("127.0.0.1", 0, workers=workers)
+        asyncio.run_coroutine_threadsafe(self.servidor.iniciar(), self.loop).result()
+        self.endereco = self.servidor.endereco
+
+    def parar(self):
+        asyncio.run_coroutine_threadsafe(self.servidor.encerrar(prazo=2), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def _cliente(endereco, rota, fim, contagem):
+    ok = erros = 0
+    conexao = http.client.HTTPConnection(*endereco, timeout=30)
+    while time.time() < fim:
+        try:
+            conexao.request("GET", rota)
+            resposta = conexao.getresponse()
+            resposta.read()
+            if resposta.status == 200:
+                ok += 1
+            else:
+                erros += 1
+        except (OSError, http.client.HTTPException):
+            erros += 1
+            conexao.close()
+    conexao.close()
+    contagem.append((ok, erros))
+
+
+def medir(endereco, rota, clientes, duracao):
+    contagem = []
+    fim = time.time() + duracao
+    threads = [
+        threading.Thread(target=_cliente, args=(endereco, rota, fim, contagem))
+        for _ in range(clientes)
+    ]
+    inicio = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    decorrido = time.time() - inicio
+    return sum(c[0] for c in contagem) / decorrido, sum(c[1] for c in contagem)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rota", default="/relatorios_livros")
+    parser.add_argument("--duracao", type=float, default=3.0)
+    parser.add_argument("--latencia-db", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--ociosas", type=int, default=1000)
+    args = parser.parse_args()
+
+    md.db_manager.connect()
+    if args.latencia_db:
+        _simular_latencia(args.latencia_db)
+    vw.BibliotecaController.log_message = lambda *a: None
+
+    fabricas = {
+        "HTTPServer": lambda: _Threaded(HTTPServer(("127.0.0.1", 0), vw.BibliotecaController)),
+        f"Pooled({args.workers})": lambda: _Threaded(PooledHTTPServer(
+            ("127.0.0.1", 0), vw.BibliotecaController, workers=args.workers)),
+        f"Async({args.workers})": lambda: _Async(args.workers),
+    }
+
+    print(f"Rota {args.rota}, latência simulada do banco {args.latencia_db} ms, {args.duracao}s por medição")
+    print(f"{'servidor':<14}{'ociosas':>9}{'clientes':>10}{'req/s':>10}{'erros':>8}")
+    for nome, fabrica in fabricas.items():
+        cenarios = [(0, 1), (0, 8), (0, 32)]
+        if nome != "HTTPServer":
+            cenarios.append((args.ociosas, 8))
+        for ociosas, clientes in cenarios:
+            servidor = fabrica()
+            abertas = [socket.create_connection(servidor.endereco) for _ in range(ociosas)]
+            rps, erros = medir(servidor.endereco, args.rota, clientes, args.duracao)
+            for conexao in abertas:
+                conexao.close()
+            servidor.parar()
+            print(f"{nome:<14}{ociosas:>9}{clientes:>10}{rps:>10.1f}{erros:>8}")
+
+
+if __name__ == "__main__":
+    main()
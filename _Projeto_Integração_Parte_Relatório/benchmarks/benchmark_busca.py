@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Latência da busca do acervo: montagem do índice, inserção incremental,
+consultas BM25 e sugestões por prefixo sobre um catálogo sintético
+
+Os títulos combinam palavras de um vocabulário com acentos ("Cálculo",
+"Introdução"...), e as consultas são palavras sorteadas de títulos
+existentes, sem acento. A consulta "pior caso" usa o termo mais frequente
+do vocabulário.
+
+Uso:
+    python benchmarks/benchmark_busca.py [--livros 1000000] [--consultas 2000]
+"""
+import argparse
+import itertools
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from Model.busca import IndiceBusca, dobrar
+
+_RADICAIS = [
+    "cálculo", "introdução", "programação", "álgebra", "estatística", "física", "química",
+    "história", "geografia", "economia", "administração", "computação", "redes", "sistemas",
+    "dados", "engenharia", "software", "arquitetura", "gestão", "projetos", "métodos",
+    "análise", "teoria", "prática", "fundamentos", "avançado", "aplicações", "modelagem",
+]
+
+
+def _vocabulario(tamanho, semente):
+    aleatorio = random.Random(semente)
+    palavras = list(_RADICAIS)
+    silabas = ["ca", "lo", "ri", "ção", "ma", "te", "má", "ti", "co", "pro", "gra", "é", "ba", "se", "nu"]
+    while len(palavras) < tamanho:
+        palavras.append("".join(aleatorio.choice(silabas) for _ in range(aleatorio.randint(2, 4))))
+    return palavras
+
+
+def _catalogo(total, vocabulario, semente):
+    aleatorio = random.Random(semente)
+    # Distribuição de Zipf aproximada: poucas palavras muito comuns, cauda longa
+    acumulados = list(itertools.accumulate(1 / (i + 1) for i in range(len(vocabulario))))
+    autores = [f"{aleatorio.choice(vocabulario).title()} {aleatorio.choice(vocabulario).title()}"
+               for _ in range(max(total // 50, 10))]
+    for i in range(total):
+        titulo = " ".join(aleatorio.choices(vocabulario, cum_weights=acumulados, k=aleatorio.randint(2, 6))).title()
+        yield f"b{i}", titulo, aleatorio.choice(autores), f"978-{i:010d}"
+
+
+def _percentis(amostras):
+    ordenadas = sorted(amostras)
+    def p(q):
+        return ordenadas[min(int(q * len(ordenadas)), len(ordenadas) - 1)] * 1000
+    return f"p50 {p(0.5):7.3f} ms   p95 {p(0.95):7.3f} ms   p99 {p(0.99):7.3f} ms"
+
+
+def _medir(funcao, entradas):
+    tempos = []
+    for entrada in entradas:
+        inicio = time.perf_counter()
+        funcao(entrada)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--livros", type=int, default=200_000)
+    parser.add_argument("--vocabulario", type=int, default=50_000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    vocabulario = _vocabulario(args.vocabulario, args.semente)
+    livros = list(_catalogo(args.livros, vocabulario, args.semente))
+    indice = IndiceBusca()
+
+    inicio = time.perf_counter()
+    for chave, titulo, autor, isbn in livros:
+        indice.adicionar(chave, chave, titulo, autor, isbn=isbn)
+    montagem = time.perf_counter() - inicio
+    print(f"{args.livros} livros indexados em {montagem:.1f} s "
+          f"({montagem / args.livros * 1e6:.1f} µs por livro)")
+
+    novos = list(_catalogo(1000, vocabulario, args.semente + 1))
+    tempos = _medir(lambda l: indice.adicionar("novo" + l[0], l[0], l[1], l[2], isbn=l[3]), novos)
+    print(f"{'adicionar (incremental)':<26}{_percentis(tempos)}")
+
+    aleatorio = random.Random(args.semente + 2)
+    amostra = [aleatorio.choice(livros)[1].split() for _ in range(args.consultas)]
+    uma = [dobrar(aleatorio.choice(palavras)) for palavras in amostra]
+    duas = [dobrar(" ".join(aleatorio.sample(palavras, min(2, len(palavras))))) for palavras in amostra]
+    prefixos = [termo[:3] for termo in uma]
+    isbns = [aleatorio.choice(livros)[3] for _ in range(args.consultas)]
+
+    print(f"{'buscar (1 termo)':<26}{_percentis(_medir(indice.buscar, uma))}")
+    print(f"{'buscar (2 termos)':<26}{_percentis(_medir(indice.buscar, duas))}")
+    print(f"{'buscar (ISBN)':<26}{_percentis(_medir(indice.buscar, isbns))}")
+    print(f"{'sugerir (3 letras)':<26}{_percentis(_medir(indice.sugerir, prefixos))}")
+
+    comum = dobrar(vocabulario[0])
+    tempos = _medir(indice.buscar, [comum] * 20)
+    print(f"{'pior caso: ' + comum:<26}{_percentis(tempos)}   "
+          f"({len(indice._postings[comum])} livros com o termo)")
+
+
+if __name__ == "__main__":
+    main()
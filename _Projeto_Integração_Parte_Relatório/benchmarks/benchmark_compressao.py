@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Bytes transferidos, tempo até o primeiro byte e latência de
+/listar_livros (página de 200 livros, o máximo) com 5.000 livros cadastrados
+
+Compara conexão nova por requisição (comportamento HTTP/1.0 anterior),
+keep-alive sem compressão, gzip e brotli (se instalado). Com --latencia-db
+a consulta da página fica mais lenta, o que evidencia que o início do
+template sai antes dela.
+
+Uso:
+    python benchmarks/benchmark_compressao.py [--livros 5000] [--requisicoes 50]
+"""
+import argparse
+import http.client
+import statistics
+import sys
+import threading
+import time
+from http.server import HTTPServer
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from Model import model as md
+from View_and_Interface import view as vw
+from View_and_Interface import compressao
+
+
+def popular(n_livros):
+    md.db_manager.using_memory = True
+    md.db_manager.connect()
+    md.db_manager.memory_books = [
+        md.Book(f"b{i}", f"Livro de Python volume {i}", f"Autor {i % 300}", f"978-{i:010d}", True)
+        for i in range(n_livros)
+    ]
+
+
+def medir(endereco, requisicoes, headers, keep_alive):
+    primeiros_bytes = []
+    latencias = []
+    tamanho = 0
+    conexao = http.client.HTTPConnection(*endereco, timeout=30)
+    for _ in range(requisicoes):
+        if not keep_alive:
+            conexao.close()
+            conexao = http.client.HTTPConnection(*endereco, timeout=30)
+        inicio = time.perf_counter()
+        conexao.request("GET", "/listar_livros?size=200", headers=headers)
+        resposta = conexao.getresponse()
+        corpo = resposta.read1()
+        primeiros_bytes.append((time.perf_counter() - inicio) * 1000)
+        corpo += resposta.read()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        tamanho = len(corpo)
+    conexao.close()
+    return tamanho, statistics.median(primeiros_bytes), statistics.median(latencias), max(latencias)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--livros", type=int, default=5000)
+    parser.add_argument("--requisicoes", type=int, default=50)
+    parser.add_argument("--latencia-db", type=float, default=0.0,
+                        help="atraso simulado (ms) na consulta da página")
+    args = parser.parse_args()
+
+    popular(args.livros)
+    if args.latencia_db:
+        consulta = md.db_manager.get_livros_pagina
+
+        def consulta_lenta(*a, **kw):
+            time.sleep(args.latencia_db / 1000)
+            return consulta(*a, **kw)
+
+        md.db_manager.get_livros_pagina = consulta_lenta
+    vw.BibliotecaController.log_message = lambda *a: None
+    servidor = HTTPServer(("127.0.0.1", 0), vw.BibliotecaController)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    cenarios = [
+        ("conexão nova, sem compressão", {"Connection": "close"}, False),
+        ("keep-alive, sem compressão", {}, True),
+        ("keep-alive, gzip", {"Accept-Encoding": "gzip"}, True),
+    ]
+    if compressao.BROTLI_AVAILABLE:
+        cenarios.append(("keep-alive, br", {"Accept-Encoding": "br"}, True))
+
+    print(f"/listar_livros com {args.livros} livros, {args.requisicoes} requisições por cenário")
+    print(f"{'cenário':<32}{'bytes':>10}{'1º byte ms':>12}{'mediana ms':>12}{'máx ms':>10}")
+    for nome, headers, keep_alive in cenarios:
+        tamanho, primeiro, mediana, maximo = medir(servidor.server_address, args.requisicoes, headers, keep_alive)
+        print(f"{nome:<32}{tamanho:>10}{primeiro:>12.2f}{mediana:>12.2f}{maximo:>10.2f}")
+
+    servidor.shutdown()
+    servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Teste de carga: requisições por segundo do HTTPServer original vs PooledHTTPServer
+
+Uso:
+    python benchmarks/benchmark_servidor.py [--rota /relatorios_livros] [--duracao 3] [--latencia-db 20]
+
+--latencia-db simula o round trip do MongoDB (ms) em cada consulta do controller.
+"""
+import argparse
+import http.client
+import os
+import sys
+import threading
+import time
+from http.server import HTTPServer
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.chdir(BASE_DIR)
+
+from Model import model as md
+from View_and_Interface import view as vw
+from servidor_pool import PooledHTTPServer
+
+
+def _simular_latencia(ms):
+    for nome in ("get_usuarios", "get_livros", "get_emprestimos", "get_emprestimos_desde", "get_devolucoes_desde"):
+        original = getattr(vw.controller, nome)
+
+        def lento(*args, _original=original, **kwargs):
+            time.sleep(ms / 1000)
+            return _original(*args, **kwargs)
+
+        setattr(vw.controller, nome, lento)
+
+
+def _cliente(endereco, rota, fim, contagem):
+    ok = rejeitadas = 0
+    while time.time() < fim:
+        conexao = http.client.HTTPConnection(*endereco, timeout=30)
+        try:
+            conexao.request("GET", rota)
+            resposta = conexao.getresponse()
+            resposta.read()
+            if resposta.status == 200:
+                ok += 1
+            else:
+                rejeitadas += 1
+        except OSError:
+            rejeitadas += 1
+        finally:
+            conexao.close()
+    contagem.append((ok, rejeitadas))
+
+
+def medir(servidor, rota, clientes, duracao):
+    contagem = []
+    fim = time.time() + duracao
+    threads = [
+        threading.Thread(target=_cliente, args=(servidor.server_address, rota, fim, contagem))
+        for _ in range(clientes)
+    ]
+    inicio = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    decorrido = time.time() - inicio
+    ok = sum(c[0] for c in contagem)
+    rejeitadas = sum(c[1] for c in contagem)
+    return ok / decorrido, rejeitadas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rota", default="/relatorios_livros")
+    parser.add_argument("--duracao", type=float, default=3.0)
+    parser.add_argument("--latencia-db", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--fila", type=int, default=64)
+    args = parser.parse_args()
+
+    md.db_manager.connect()
+    if args.latencia_db:
+        _simular_latencia(args.latencia_db)
+    vw.BibliotecaController.log_message = lambda *a: None
+
+    fabricas = {
+        "HTTPServer": lambda: HTTPServer(("127.0.0.1", 0), vw.BibliotecaController),
+        f"Pooled({args.workers}/{args.fila})": lambda: PooledHTTPServer(
+            ("127.0.0.1", 0), vw.BibliotecaController, workers=args.workers, tamanho_fila=args.fila),
+    }
+
+    print(f"Rota {args.rota}, latência simulada do banco {args.latencia_db} ms, {args.duracao}s por medição")
+    print(f"{'servidor':<18}{'clientes':>10}{'req/s':>10}{'503':>8}")
+    for nome, fabrica in fabricas.items():
+        for clientes in (1, 8, 32):
+            servidor = fabrica()
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            rps, rejeitadas = medir(servidor, args.rota, clientes, args.duracao)
+            servidor.shutdown()
+            servidor.server_close()
+            print(f"{nome:<18}{clientes:>10}{rps:>10.1f}{rejeitadas:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,18 @@ class Controler():
         """Retorna todos os empréstimos"""
         return md.get_emprestimos()
 
+    def iter_usuarios(self):
+        """Percorre os usuários um a um (para respostas em streaming)"""
+        return md.iter_usuarios()
+
+    def iter_livros(self):
+        """Percorre os livros um a um (para respostas em streaming)"""
+        return md.iter_livros()
+
+    def iter_emprestimos(self):
+        """Percorre os empréstimos um a um (para respostas em streaming)"""
+        return md.iter_emprestimos()
+
     def get_livros_disponiveis(self):
         """Retorna livros disponíveis"""
         return md.get_livros_disponiveis()
@@ -30,6 +42,46 @@ class Controler():
         """Retorna empréstimos de um usuário"""
         return md.get_emprestimos_por_usuario(user_id)
 
+    def get_emprestimos_desde(self, since):
+        """Retorna empréstimos feitos a partir de uma data"""
+        return md.get_emprestimos_desde(since)
+
+    def get_devolucoes_desde(self, since):
+        """Retorna empréstimos devolvidos a partir de uma data"""
+        return md.get_devolucoes_desde(since)
+
+    def get_usuarios_pagina(self, tamanho, cursor=None, pagina=1, tipo=None):
+        """Retorna uma página de usuários (paginação feita no banco)"""
+        return md.get_usuarios_pagina(tamanho, cursor, pagina, tipo)
+
+    def get_livros_pagina(self, tamanho, cursor=None, pagina=1, autor=None, categoria=None):
+        """Retorna uma página de livros (paginação feita no banco)"""
+        return md.get_livros_pagina(tamanho, cursor, pagina, autor, categoria)
+
+    def buscar_livros(self, consulta, limite=md.TAMANHO_PAGINA_PADRAO):
+        """Retorna os livros que correspondem à busca, por relevância"""
+        return md.buscar_livros(consulta, limite)
+
+    def sugerir_termos_livros(self, prefixo, limite=8):
+        """Retorna termos para completar a busca enquanto o usuário digita"""
+        return md.sugerir_termos_livros(prefixo, limite)
+
+    def indice_busca_pronto(self):
+        """Retorna se a busca de livros já pode ser usada"""
+        return md.indice_busca_pronto()
+
+    def get_ids_livros_emprestados(self, book_ids):
+        """Retorna quais dos livros informados estão emprestados"""
+        return md.get_ids_livros_emprestados(book_ids)
+
+    def get_emprestimos_ativos_pagina(self, tamanho, cursor=None, pagina=1, usuario=None):
+        """Retorna uma página de empréstimos ativos com livro e usuário"""
+        return md.get_emprestimos_ativos_pagina(tamanho, cursor, pagina, usuario)
+
+    def get_versao_dados(self):
+        """Retorna a versão atual dos dados (para ETags)"""
+        return md.get_versao_dados()
+
     def get_usuario_por_id(self, user_id):
         """Busca usuário por ID"""
         return md.db_manager.get_usuario_por_id(user_id)
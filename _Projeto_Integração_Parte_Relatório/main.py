@@ -3,11 +3,22 @@ from View_and_Interface import view as vw
 import controler as ctl
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from urllib.parse import parse_qs
+from servidor_pool import PooledHTTPServer
+import os
 
 
 def main():
     print("SISTEMA DE GESTÃO DE BIBLIOTECA")
-    servidor = HTTPServer(("localhost", 8000), vw.BibliotecaController)
+    md.db_manager.connect()
+
+    # SERVER_WORKERS=0 mantém o servidor single-thread original
+    workers = int(os.getenv("SERVER_WORKERS", "8"))
+    tamanho_fila = int(os.getenv("SERVER_QUEUE", "64"))
+    if workers > 0:
+        servidor = PooledHTTPServer(("localhost", 8000), vw.BibliotecaController,
+                                    workers=workers, tamanho_fila=tamanho_fila)
+    else:
+        servidor = HTTPServer(("localhost", 8000), vw.BibliotecaController)
     servidor.serve_forever()
 
 
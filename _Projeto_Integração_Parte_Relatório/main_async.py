@@ -0,0 +1,39 @@
+from Model import model as md
+from servidor_async import ServidorAsync
+import asyncio
+import os
+import signal
+
+
+async def executar():
+    servidor = ServidorAsync("localhost", 8000, workers=int(os.getenv("SERVER_WORKERS", "8")))
+    await servidor.iniciar()
+    print("Servidor asyncio em http://localhost:8000 (Ctrl+C para encerrar)")
+
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sinal, parar.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: Ctrl+C chega como KeyboardInterrupt em asyncio.run
+            pass
+
+    try:
+        await parar.wait()
+    finally:
+        print("Encerrando: aguardando respostas em andamento...")
+        await servidor.encerrar()
+
+
+def main():
+    print("SISTEMA DE GESTÃO DE BIBLIOTECA (asyncio)")
+    md.db_manager.connect()
+    try:
+        asyncio.run(executar())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Servidor HTTP/1.1 em asyncio para as mesmas páginas do BibliotecaController
+
+Cada conexão é uma corrotina: conexões keep-alive ociosas custam só o
+buffer do StreamReader, não uma thread. O trabalho bloqueante (rotas que
+consultam o banco e o consumo das partes transmitidas) roda num
+ThreadPoolExecutor, então o loop nunca espera pelo MongoDB.
+"""
+import asyncio
+import contextvars
+import http.client
+import io
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http import HTTPStatus
+
+from View_and_Interface import paginas
+from View_and_Interface.metricas import registro as metricas
+from View_and_Interface.transmissao import preparar
+
+# Linha de requisição + cabeçalhos maiores que isso são recusados
+LIMITE_CABECALHOS = 64 * 1024
+
+_FIM = object()
+
+
+def _linha_status(status):
+    try:
+        frase = HTTPStatus(status).phrase
+    except ValueError:
+        frase = ""
+    return f"HTTP/1.1 {status} {frase}\r\n"
+
+
+def _montar_cabecalhos(status, cabecalhos):
+    linhas = [_linha_status(status), "Server: BibliotecaAsync\r\n",
+              f"Date: {formatdate(usegmt=True)}\r\n"]
+    linhas.extend(f"{nome}: {valor}\r\n" for nome, valor in cabecalhos)
+    linhas.append("\r\n")
+    return "".join(linhas).encode("latin-1")
+
+
+class ServidorAsync:
+    """
+    Servidor asyncio com keep-alive, executor para chamadas ao banco e
+    encerramento gracioso (encerrar() deixa terminar as respostas em curso).
+    """
+
+    def __init__(self, host="localhost", porta=8000, workers=8, timeout=15):
+        self.host = host
+        self.porta = porta
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self._servidor = None
+        self.endereco = None  # (host, porta) efetivos, conhecidos após iniciar()
+        self._encerrando = False
+        # writer -> True enquanto uma resposta está sendo produzida
+        self._conexoes = {}
+        self._tarefas = set()
+
+    @property
+    def conexoes_abertas(self):
+        return len(self._conexoes)
+
+    async def iniciar(self):
+        self._servidor = await asyncio.start_server(
+            self._atender, self.host, self.porta, limit=LIMITE_CABECALHOS
+        )
+        self.endereco = self._servidor.sockets[0].getsockname()[:2]
+
+    async def encerrar(self, prazo=10.0):
+        """Para de aceitar conexões, fecha as ociosas e espera as ocupadas por até `prazo` segundos"""
+        self._encerrando = True
+        self._servidor.close()
+        for writer, ocupada in list(self._conexoes.items()):
+            if not ocupada:
+                writer.close()
+        if self._tarefas:
+            _, pendentes = await asyncio.wait(self._tarefas, timeout=prazo)
+            for tarefa in pendentes:
+                tarefa.cancel()
+        await self._servidor.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    async def _ler_requisicao(self, reader):
+        """(método, caminho, versão, cabeçalhos) ou None se o cliente fechou a conexão"""
+        try:
+            dados = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError):
+            return None
+
+        linha, _, resto = dados.partition(b"\r\n")
+        partes = linha.decode("latin-1").split()
+        if len(partes) != 3:
+            raise ValueError(f"Linha de requisição inválida: {linha!r}")
+        metodo, caminho, versao = partes
+        cabecalhos = http.client.parse_headers(io.BytesIO(resto))
+
+        # Corpo de GET é permitido mas ignorado; precisa ser consumido
+        # para não ser lido como a próxima requisição
+        tamanho = int(cabecalhos.get("Content-Length") or 0)
+        if tamanho:
+            await reader.readexactly(tamanho)
+        return metodo, caminho, versao, cabecalhos
+
+    async def _atender(self, reader, writer):
+        tarefa = asyncio.current_task()
+        self._tarefas.add(tarefa)
+        self._conexoes[writer] = False
+        loop = asyncio.get_running_loop()
+        try:
+            while not self._encerrando:
+                try:
+                    requisicao = await self._ler_requisicao(reader)
+                except ValueError:
+                    writer.write(_montar_cabecalhos(400, [("Content-Length", "0"), ("Connection", "close")]))
+                    break
+                if requisicao is None:
+                    break
+                metodo, caminho, versao, cabecalhos = requisicao
+
+                self._conexoes[writer] = True
+                fechar = (versao == "HTTP/1.0" or self._encerrando
+                          or cabecalhos.get("Connection", "").lower() == "close")
+                if metodo != "GET":
+                    writer.write(_montar_cabecalhos(501, [("Content-Length", "0")]))
+                else:
+                    fechar = await self._responder(loop, writer, caminho, versao, cabecalhos) or fechar
+                await writer.drain()
+                self._conexoes[writer] = False
+                if fechar:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._conexoes.pop(writer, None)
+            self._tarefas.discard(tarefa)
+            writer.close()
+
+    def _no_executor(self, loop, funcao, *args):
+        # run_in_executor não propaga contextvars; sem a cópia as consultas
+        # feitas na thread do executor não chegariam ao contador da requisição
+        return loop.run_in_executor(self.executor, contextvars.copy_context().run, funcao, *args)
+
+    async def _responder(self, loop, writer, caminho, versao, cabecalhos):
+        """Escreve a resposta; retorna True se a conexão precisa ser fechada depois"""
+        with metricas.medir() as medicao:
+            medicao.rota = caminho.partition("?")[0]
+            resposta = await self._no_executor(loop, paginas.responder, caminho, cabecalhos)
+            envio = preparar(resposta, cabecalhos.get("Accept-Encoding"), versao == "HTTP/1.0")
+            medicao.status = envio.status
+            writer.write(_montar_cabecalhos(envio.status, envio.cabecalhos))
+            if envio.arquivo is not None:
+                # Os cabeçalhos precisam sair antes: sendfile escreve direto no socket
+                await writer.drain()
+                with open(envio.arquivo, "rb") as arquivo:
+                    medicao.bytes = await loop.sendfile(writer.transport, arquivo)
+                return envio.fechar
+            if envio.blocos is None:
+                writer.write(envio.corpo)
+                medicao.bytes = len(envio.corpo)
+                return envio.fechar
+
+            try:
+                while True:
+                    # Cada bloco pode consultar o banco: produzido no executor
+                    bloco = await self._no_executor(loop, next, envio.blocos, _FIM)
+                    if bloco is _FIM:
+                        break
+                    writer.write(bloco)
+                    medicao.bytes += len(bloco)
+                    await writer.drain()
+            except Exception as e:
+                # Status já enviado: encerra sem o chunk final
+                print(f"ERRO: Resposta interrompida em {caminho}: {e!r}")
+                return True
+            return envio.fechar
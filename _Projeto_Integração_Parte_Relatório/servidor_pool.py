@@ -0,0 +1,141 @@
+"""
+Servidor HTTP com pool fixo de workers e fila limitada
+"""
+import queue
+import selectors
+import socket
+import threading
+import time
+from http.server import HTTPServer
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer que atende conexões em um pool de threads.
+
+    A thread de accept apenas enfileira a conexão; se a fila estiver cheia
+    o cliente recebe 503 imediatamente em vez de esperar indefinidamente.
+    """
+
+    # Por quanto tempo uma conexão rejeitada ainda tem a requisição lida
+    # antes de ser fechada (segundos)
+    ESPERA_REJEITADA = 0.05
+
+    CORPO_503 = "Servidor ocupado, tente novamente.".encode("utf-8")
+    RESPOSTA_503 = (
+        b"HTTP/1.1 503 Service Unavailable\r\n"
+        b"Content-Type: text/plain; charset=utf-8\r\n"
+        b"Retry-After: 1\r\n"
+        + f"Content-Length: {len(CORPO_503)}\r\n".encode("ascii")
+        + b"Connection: close\r\n\r\n"
+        + CORPO_503
+    )
+
+    def __init__(self, server_address, RequestHandlerClass, workers=8, tamanho_fila=64,
+                 bind_and_activate=True):
+        if workers < 1 or tamanho_fila < 1:
+            raise ValueError("workers e tamanho_fila devem ser positivos")
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+        self.workers = workers
+        self.tamanho_fila = tamanho_fila
+        self.rejeitadas = 0
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._threads = [
+            threading.Thread(target=self._trabalhar, name=f"worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        # Conexões rejeitadas são fechadas por outra thread, sem travar o accept
+        self._a_encerrar = queue.Queue()
+        self._encerrador = threading.Thread(target=self._encerrar_rejeitadas, name="encerrador",
+                                            daemon=True)
+        self._encerrador.start()
+
+    def process_request(self, request, client_address):
+        try:
+            self._fila.put_nowait((request, client_address))
+        except queue.Full:
+            self.rejeitadas += 1
+            self._rejeitar(request)
+
+    def ha_espera(self) -> bool:
+        """True se alguma conexão aguarda um worker na fila"""
+        return not self._fila.empty()
+
+    def _trabalhar(self):
+        while True:
+            item = self._fila.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def _rejeitar(self, request):
+        """Envia o 503 sem bloquear o accept e deixa o fechamento para o encerrador"""
+        try:
+            request.setblocking(False)
+            try:
+                request.recv(65536)
+            except BlockingIOError:
+                pass
+            # Resposta curta: cabe inteira no buffer do socket recém-aberto
+            request.send(self.RESPOSTA_503)
+            request.shutdown(socket.SHUT_WR)
+        except OSError:
+            request.close()
+            return
+        self._a_encerrar.put(request)
+
+    def _encerrar_rejeitadas(self):
+        """
+        Lê o resto das requisições rejeitadas por até ESPERA_REJEITADA e só
+        então fecha os sockets: fechar um socket com dados não lidos gera
+        RST, e o cliente perderia o próprio 503.
+        """
+        seletor = selectors.DefaultSelector()
+        prazos = {}
+
+        def fechar(request):
+            seletor.unregister(request)
+            del prazos[request]
+            request.close()
+
+        while True:
+            try:
+                request = self._a_encerrar.get(timeout=None if not prazos else 0)
+                if request is None:
+                    for request in list(prazos):
+                        fechar(request)
+                    return
+                prazos[request] = time.monotonic() + self.ESPERA_REJEITADA
+                seletor.register(request, selectors.EVENT_READ)
+                continue
+            except queue.Empty:
+                pass
+
+            for chave, _ in seletor.select(timeout=0.01):
+                try:
+                    if not chave.fileobj.recv(65536):
+                        fechar(chave.fileobj)  # cliente já fechou a conexão
+                except BlockingIOError:
+                    pass
+                except OSError:
+                    fechar(chave.fileobj)
+            agora = time.monotonic()
+            for request, prazo in list(prazos.items()):
+                if prazo <= agora:
+                    fechar(request)
+
+    def server_close(self):
+        super().server_close()
+        self._a_encerrar.put(None)
+        for _ in self._threads:
+            self._fila.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
@@ -1,6 +1,10 @@
 from collections import Counter
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+import json
+import os
 import sys
+import threading
 from pathlib import Path
 
 # Adicionar o diretório raiz ao path
@@ -9,9 +13,28 @@ if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
 from Model.model import User, Book, Loan
+from src.sketches import HeavyHitters, HyperLogLog
 
 
 class ReportService:
+
+    def __init__(self):
+        # Protege o estado incremental quando o serviço é compartilhado
+        # entre as threads do servidor
+        self._lock = threading.RLock()
+
+        # Estado acumulado do modo incremental (apply/apply_returns/refresh)
+        self.book_counts: Counter = Counter()
+        self.user_counts: Counter = Counter()
+        self.active_book_counts: Counter = Counter()
+        self.active_user_counts: Counter = Counter()
+        self.active_loans: Dict[str, Tuple[str, str]] = {}
+
+        # High-water marks: maior data já processada e ids vistos nessa data
+        self.loan_watermark: Optional[datetime] = None
+        self.loan_ids_at_watermark: Set[str] = set()
+        self.return_watermark: Optional[datetime] = None
+        self.return_ids_at_watermark: Set[str] = set()
     
     def get_most_borrowed_books(self, loans: List[Loan], books: List[Book] = None) -> List[Dict[str, Any]]:
         if not loans or loans is None:
@@ -69,3 +92,212 @@ class ReportService:
             "user_id": user_id,
             "loan_count": count
         }
+
+    # ========================================
+    # MODO APROXIMADO - SKETCHES PROBABILÍSTICOS
+    # ========================================
+
+    def get_most_borrowed_books_approx(self, loans: Iterable[Loan], books: List[Book] = None,
+                                       top_k: int = 10, epsilon: float = 0.001, delta: float = 0.01,
+                                       error_rate: float = 0.02) -> List[Dict[str, Any]]:
+        """
+        Top-k de livros em uma única passada, com memória limitada.
+
+        `loan_count` é a estimativa do Count-Min Sketch (excede o real em no
+        máximo epsilon * total com probabilidade 1 - delta). Os borrowers
+        distintos são contados por HyperLogLog apenas para os candidatos do
+        top-k, a partir do momento em que entraram no ranking.
+        """
+        if loans is None:
+            return []
+
+        heavy_hitters = HeavyHitters(top_k, epsilon, delta)
+        borrowers: Dict[str, HyperLogLog] = {}
+
+        for loan in loans:
+            if not heavy_hitters.add(loan.book_id):
+                continue
+            if loan.book_id not in borrowers:
+                # Libera os contadores de livros que saíram do top-k
+                for book_id in [b for b in borrowers if b not in heavy_hitters]:
+                    del borrowers[book_id]
+                borrowers[loan.book_id] = HyperLogLog(error_rate)
+            borrowers[loan.book_id].add(loan.user_id)
+
+        top = heavy_hitters.most_common()
+        top_ids = {book_id for book_id, _ in top}
+        books_dict = self._create_books_dict(book for book in (books or []) if book.id in top_ids)
+
+        report = []
+        for book_id, count in top:
+            item = self._format_book_report(book_id, count, books_dict)
+            item["distinct_borrowers"] = borrowers[book_id].count() if book_id in borrowers else 0
+            report.append(item)
+        return report
+
+    def get_distinct_borrowers_by_user_type(self, loans: Iterable[Loan], users: List[User] = None,
+                                            error_rate: float = 0.02) -> Dict[str, int]:
+        """Usuários distintos com empréstimo, por tipo de usuário (HyperLogLog)."""
+        if loans is None:
+            return {}
+
+        user_types = {user.id: user.type for user in (users or [])}
+        sketches: Dict[str, HyperLogLog] = {}
+
+        for loan in loans:
+            user_type = user_types.get(loan.user_id, "Desconhecido")
+            if user_type not in sketches:
+                sketches[user_type] = HyperLogLog(error_rate)
+            sketches[user_type].add(loan.user_id)
+
+        return {user_type: sketch.count() for user_type, sketch in sketches.items()}
+
+    # ========================================
+    # MODO INCREMENTAL - DELTAS E WATERMARKS
+    # ========================================
+
+    def apply(self, new_loans: Iterable[Loan]) -> int:
+        """Acumula empréstimos posteriores ao watermark; retorna quantos foram aplicados"""
+        with self._lock:
+            applied = 0
+            for loan in sorted(new_loans, key=lambda l: l.loan_date):
+                if not self._advance_watermark("loan", loan.loan_date, loan.id):
+                    continue
+
+                self.book_counts[loan.book_id] += 1
+                self.user_counts[loan.user_id] += 1
+                if loan.return_date is None:
+                    self.active_loans[loan.id] = (loan.book_id, loan.user_id)
+                    self.active_book_counts[loan.book_id] += 1
+                    self.active_user_counts[loan.user_id] += 1
+                applied += 1
+            return applied
+
+    def apply_returns(self, returned_loans: Iterable[Loan]) -> int:
+        """Encerra empréstimos ativos devolvidos após o watermark de devoluções"""
+        with self._lock:
+            applied = 0
+            for loan in sorted(returned_loans, key=lambda l: l.return_date):
+                if loan.return_date is None:
+                    continue
+                if not self._advance_watermark("return", loan.return_date, loan.id):
+                    continue
+
+                # Empréstimos já aplicados como devolvidos não estão em active_loans
+                active = self.active_loans.pop(loan.id, None)
+                if active is None:
+                    continue
+                book_id, user_id = active
+                self._decrement(self.active_book_counts, book_id)
+                self._decrement(self.active_user_counts, user_id)
+                applied += 1
+            return applied
+
+    def refresh(self, source) -> int:
+        """
+        Processa apenas o que mudou desde a última execução.
+        `source` é qualquer objeto com get_emprestimos_desde/get_devolucoes_desde
+        (DatabaseManager ou Controller).
+        """
+        # A consulta ao banco roda fora do lock; refreshes concorrentes que
+        # tragam o mesmo delta são descartados pelo watermark em apply().
+        with self._lock:
+            loan_watermark, return_watermark = self.loan_watermark, self.return_watermark
+        applied = self.apply(source.get_emprestimos_desde(loan_watermark))
+        applied += self.apply_returns(source.get_devolucoes_desde(return_watermark))
+        return applied
+
+    def _advance_watermark(self, kind: str, moment: datetime, loan_id: str) -> bool:
+        watermark = getattr(self, f"{kind}_watermark")
+        ids_at_watermark = getattr(self, f"{kind}_ids_at_watermark")
+
+        if watermark is not None:
+            if moment < watermark:
+                return False
+            if moment == watermark:
+                if loan_id in ids_at_watermark:
+                    return False
+                ids_at_watermark.add(loan_id)
+                return True
+
+        setattr(self, f"{kind}_watermark", moment)
+        setattr(self, f"{kind}_ids_at_watermark", {loan_id})
+        return True
+
+    @staticmethod
+    def _decrement(counter: Counter, key: str) -> None:
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+    def get_current_most_borrowed_books(self, books: List[Book] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            books_dict = self._create_books_dict(books or [])
+            report = []
+            for book_id, count in self.book_counts.most_common():
+                item = self._format_book_report(book_id, count, books_dict)
+                item["active_loans"] = self.active_book_counts.get(book_id, 0)
+                report.append(item)
+            return report
+
+    def get_current_most_active_users(self, users: List[User] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            users_dict = self._create_users_dict(users or [])
+            report = []
+            for user_id, count in self.user_counts.most_common():
+                item = self._format_user_report(user_id, count, users_dict)
+                item["active_loans"] = self.active_user_counts.get(user_id, 0)
+                report.append(item)
+            return report
+
+    # ========================================
+    # CHECKPOINT - SERIALIZAÇÃO DO ESTADO
+    # ========================================
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte o estado incremental para dicionário (JSON)"""
+        with self._lock:
+            return {
+                "book_counts": dict(self.book_counts),
+                "user_counts": dict(self.user_counts),
+                "active_loans": {loan_id: list(ids) for loan_id, ids in self.active_loans.items()},
+                "loan_watermark": self.loan_watermark.isoformat() if self.loan_watermark else None,
+                "loan_ids_at_watermark": sorted(self.loan_ids_at_watermark),
+                "return_watermark": self.return_watermark.isoformat() if self.return_watermark else None,
+                "return_ids_at_watermark": sorted(self.return_ids_at_watermark),
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReportService":
+        """Recria o serviço a partir de um checkpoint"""
+        service = cls()
+        service.book_counts = Counter(data.get("book_counts", {}))
+        service.user_counts = Counter(data.get("user_counts", {}))
+        for loan_id, (book_id, user_id) in data.get("active_loans", {}).items():
+            service.active_loans[loan_id] = (book_id, user_id)
+            service.active_book_counts[book_id] += 1
+            service.active_user_counts[user_id] += 1
+
+        if data.get("loan_watermark"):
+            service.loan_watermark = datetime.fromisoformat(data["loan_watermark"])
+        service.loan_ids_at_watermark = set(data.get("loan_ids_at_watermark", []))
+        if data.get("return_watermark"):
+            service.return_watermark = datetime.fromisoformat(data["return_watermark"])
+        service.return_ids_at_watermark = set(data.get("return_ids_at_watermark", []))
+        return service
+
+    def save_checkpoint(self, path: str) -> None:
+        # Grava em arquivo temporário e troca atomicamente para não deixar
+        # um checkpoint pela metade se o processo cair durante a escrita.
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_checkpoint(cls, path: str) -> "ReportService":
+        """Carrega o checkpoint ou retorna um serviço vazio se ele não existir"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
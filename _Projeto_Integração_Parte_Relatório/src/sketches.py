@@ -0,0 +1,161 @@
+import heapq
+import math
+from array import array
+from hashlib import blake2b
+from typing import Dict, Hashable, List, Tuple
+
+
+def _hash64(key: Hashable, salt: bytes = b"") -> int:
+    # hash() do Python é aleatorizado por processo; blake2b mantém os
+    # sketches reproduzíveis entre execuções.
+    digest = blake2b(str(key).encode("utf-8"), digest_size=8, salt=salt).digest()
+    return int.from_bytes(digest, "big")
+
+
+class CountMinSketch:
+    """
+    Contador aproximado de frequências com memória fixa.
+
+    A estimativa nunca fica abaixo do valor real e, com probabilidade
+    1 - delta, excede-o em no máximo epsilon * total.
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01):
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon e delta devem estar entre 0 e 1")
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.total = 0
+        self._rows = [array("Q", bytes(8 * self.width)) for _ in range(self.depth)]
+
+    def _indexes(self, key: Hashable) -> List[int]:
+        # Double hashing (Kirsch-Mitzenmacher): um único digest gera as
+        # posições de todas as linhas.
+        h = _hash64(key)
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        estimate = None
+        for row, index in zip(self._rows, self._indexes(key)):
+            row[index] += count
+            if estimate is None or row[index] < estimate:
+                estimate = row[index]
+        self.total += count
+        return estimate
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def memory_bytes(self) -> int:
+        return sum(row.itemsize * len(row) for row in self._rows)
+
+
+class HyperLogLog:
+    """
+    Contador aproximado de elementos distintos.
+
+    O erro padrão relativo é ~1.04 / sqrt(2^p); `error_rate` escolhe o
+    menor p que atende ao erro pedido.
+    """
+
+    def __init__(self, error_rate: float = 0.02):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate deve estar entre 0 e 1")
+        self.p = min(16, max(4, math.ceil(math.log2((1.04 / error_rate) ** 2))))
+        self.m = 1 << self.p
+        self.error_rate = 1.04 / math.sqrt(self.m)
+        self._registers = bytearray(self.m)
+
+    def add(self, key: Hashable) -> None:
+        h = _hash64(key, salt=b"hll")
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def count(self) -> int:
+        if self.m == 16:
+            alpha = 0.673
+        elif self.m == 32:
+            alpha = 0.697
+        elif self.m == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / self.m)
+
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # Correção para cardinalidades pequenas (linear counting)
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def memory_bytes(self) -> int:
+        return len(self._registers)
+
+
+class HeavyHitters:
+    """
+    Top-k aproximado: Count-Min Sketch para as frequências e um heap
+    mínimo com no máximo k candidatos.
+    """
+
+    def __init__(self, k: int = 10, epsilon: float = 0.001, delta: float = 0.01):
+        if k <= 0:
+            raise ValueError("k deve ser positivo")
+        self.k = k
+        self.sketch = CountMinSketch(epsilon, delta)
+        self._top: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, str, Hashable]] = []
+
+    def add(self, key: Hashable, count: int = 1) -> bool:
+        """Conta `key`; retorna True se ela está entre os candidatos top-k."""
+        estimate = self.sketch.add(key, count)
+
+        if key not in self._top and len(self._top) >= self.k:
+            if estimate <= self._min_estimate():
+                return False
+            self._evict_min()
+
+        self._top[key] = estimate
+        heapq.heappush(self._heap, (estimate, str(key), key))
+        if len(self._heap) > 4 * self.k:
+            self._rebuild_heap()
+        return True
+
+    def _min_estimate(self) -> int:
+        self._discard_stale()
+        return self._heap[0][0]
+
+    def _evict_min(self) -> Hashable:
+        self._discard_stale()
+        _, _, key = heapq.heappop(self._heap)
+        del self._top[key]
+        return key
+
+    def _discard_stale(self) -> None:
+        # O heap guarda entradas antigas de chaves já atualizadas;
+        # elas são descartadas só quando chegam ao topo.
+        while self._heap:
+            estimate, _, key = self._heap[0]
+            if self._top.get(key) == estimate:
+                return
+            heapq.heappop(self._heap)
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(estimate, str(key), key) for key, estimate in self._top.items()]
+        heapq.heapify(self._heap)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._top
+
+    def most_common(self) -> List[Tuple[Hashable, int]]:
+        return sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+
+    def memory_bytes(self) -> int:
+        return self.sketch.memory_bytes()
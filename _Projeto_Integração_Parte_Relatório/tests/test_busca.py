@@ -0,0 +1,93 @@
+from Model.busca import IndiceBusca, dobrar, termos
+
+
+def _indice():
+    indice = IndiceBusca()
+    indice.adicionar("b1", "calculo", "Cálculo I", "James Stewart", isbn="978-85-221-0660-8")
+    indice.adicionar("b2", "python", "Python para Iniciantes", "Ana Souza", isbn="978-1234567890")
+    indice.adicionar("b3", "python_dados", "Python e Banco de Dados com Python", "Carlos Lima", isbn="978-1")
+    indice.adicionar("b4", "calculo_num", "Cálculo Numérico Computacional Avançado", "Ana Souza", isbn="978-2")
+    return indice
+
+
+def test_dobra_acentos_e_remove_stopwords():
+    assert dobrar("Cálculo Ção") == "calculo cao"
+    assert termos("Introdução à Programação de Computadores") == ["introducao", "programacao", "computadores"]
+
+
+def test_busca_sem_acento_encontra_titulo_acentuado():
+    assert [livro for livro, _ in _indice().buscar("calculo")] == ["calculo", "calculo_num"]
+
+
+def test_bm25_prefere_maior_frequencia_e_todos_os_termos():
+    indice = _indice()
+    assert [livro for livro, _ in indice.buscar("python")] == ["python_dados", "python"]
+    assert [livro for livro, _ in indice.buscar("ana calculo")] == ["calculo_num"]
+    assert indice.buscar("python inexistente") == []
+    assert indice.buscar("de com") == []  # só stopwords
+
+
+def test_busca_por_isbn_com_ou_sem_hifens():
+    indice = _indice()
+    assert [livro for livro, _ in indice.buscar("9788522106608")] == ["calculo"]
+    assert [livro for livro, _ in indice.buscar("978-85-221-0660-8")] == ["calculo"]
+
+
+def test_numeros_que_nao_sao_isbn_viram_termos():
+    indice = IndiceBusca()
+    indice.adicionar("b1", "receitas", "As 100 Melhores Receitas de 2020", "Chef", isbn="978-85-000-0000-1")
+    assert [livro for livro, _ in indice.buscar("100 2020")] == ["receitas"]
+    assert [livro for livro, _ in indice.buscar("2020")] == ["receitas"]
+    assert [livro for livro, _ in indice.buscar("978 85 000 0000 1")] == ["receitas"]
+
+
+def test_readicionar_substitui_documento():
+    indice = _indice()
+    indice.adicionar("b2", "python_2ed", "Python Fluente", "Ana Souza")
+    assert len(indice) == 4
+    assert [livro for livro, _ in indice.buscar("iniciantes")] == []
+    assert [livro for livro, _ in indice.buscar("fluente")] == ["python_2ed"]
+
+
+def test_sugestoes_por_prefixo_e_frequencia():
+    indice = _indice()
+    assert indice.sugerir("calc") == ["cálculo"]
+    assert indice.sugerir("banco de da") == ["dados"]
+    assert indice.sugerir("c")[:2] == ["cálculo", "carlos"]
+    assert indice.sugerir("python ") == []
+    assert indice.sugerir("xyz") == []
+
+    indice.remover("b1")
+    indice.remover("b4")
+    assert indice.sugerir("calc") == []
+
+
+def test_resultado_igual_ao_calculo_direto_do_bm25():
+    import math
+    import random
+    aleatorio = random.Random(7)
+    vocabulario = ["alfa", "beta", "gama", "delta", "epsilon", "zeta", "eta", "teta"]
+    textos = [" ".join(aleatorio.choices(vocabulario, k=aleatorio.randint(1, 6))) for _ in range(300)]
+    indice = IndiceBusca()
+    for i, texto in enumerate(textos):
+        indice.adicionar(f"d{i}", i, texto)
+
+    media = sum(len(t.split()) for t in textos) / len(textos)
+
+    def bm25(consulta):
+        pontos = {}
+        for i, texto in enumerate(textos):
+            palavras = texto.split()
+            if not all(q in palavras for q in consulta):
+                continue
+            soma = 0.0
+            for q in consulta:
+                df = sum(q in t.split() for t in textos)
+                peso = math.log(1 + (len(textos) - df + 0.5) / (df + 0.5))
+                f = palavras.count(q)
+                soma += peso * f * 2.2 / (f + 1.2 * (0.25 + 0.75 * len(palavras) / media))
+            pontos[i] = soma
+        return sorted(pontos, key=lambda i: (-round(pontos[i], 9), i))[:10]
+
+    for consulta in (["alfa"], ["beta", "gama"], ["teta", "alfa", "zeta"]):
+        assert [i for i, _ in indice.buscar(" ".join(consulta), 10)] == bm25(consulta)
@@ -0,0 +1,37 @@
+import json
+from Model.categorias import CATEGORIA_PADRAO, Classificador, carregar_tabela
+from Model.model import Book
+
+
+def test_prioridade_da_tabela_e_nao_da_posicao():
+    c = Classificador()
+    assert c.classificar("Banco de Dados com Python") == "Programação"
+    assert c.classificar("Algoritmos e Estruturas de Dados") == "Ciência da Computação"
+    assert c.classificar("Poemas") == CATEGORIA_PADRAO
+
+
+def test_ignora_maiusculas_e_exige_inicio_de_palavra():
+    c = Classificador([("BD", ["SQL"]), ("CC", ["Estrutura"])])
+    assert c.classificar("introdução ao sql") == "BD"
+    assert c.classificar("PostgreSQL avançado") == CATEGORIA_PADRAO
+    assert c.classificar("Estruturas discretas") == "CC"
+
+
+def test_autor_tambem_e_considerado():
+    assert Classificador().classificar("Memórias Póstumas", "Machado de Assis") == "Literatura"
+
+
+def test_tabela_configuravel_por_json(tmp_path):
+    arquivo = tmp_path / "categorias.json"
+    arquivo.write_text(json.dumps([["Física", ["Mecânica", "Óptica"]]]), encoding="utf-8")
+    c = Classificador(carregar_tabela(str(arquivo)))
+    assert c.classificar("Óptica Geométrica") == "Física"
+    assert c.classificar("Python") == CATEGORIA_PADRAO
+
+
+def test_book_guarda_categoria():
+    livro = Book("b1", "Cálculo I", "Autor", "978-1", True)
+    assert livro.category == "Matemática"
+    assert livro.to_dict()["category"] == "Matemática"
+    # Valor gravado tem precedência sobre a classificação
+    assert Book.from_dict({**livro.to_dict(), "category": "Outra"}).category == "Outra"
@@ -0,0 +1,48 @@
+import gzip
+import zlib
+import pytest
+from View_and_Interface import compressao
+from View_and_Interface.compressao import (
+    CacheComprimidos, CompressorIncremental, ShellGzip, escolher_codificacao
+)
+
+
+@pytest.mark.parametrize("header, esperado", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.8", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("identity", None),
+])
+def test_escolher_codificacao(monkeypatch, header, esperado):
+    monkeypatch.setattr(compressao, "BROTLI_AVAILABLE", False)
+    assert escolher_codificacao(header) == esperado
+
+
+def test_shell_gzip_reaproveita_prefixo():
+    prefixo = "<html><body>Catálogo".encode("utf-8") * 50
+    shell = ShellGzip(prefixo)
+
+    for conteudo in (b"<p>um</p>", b"<p>dois</p>"):
+        assert gzip.decompress(shell.comprimir(conteudo, b"</body></html>")) == prefixo + conteudo + b"</body></html>"
+
+
+def test_cache_comprimidos_limita_itens():
+    cache = CacheComprimidos(max_itens=2)
+    for i in range(3):
+        corpo = f"pagina {i}".encode("utf-8")
+        assert gzip.decompress(cache.obter(f'"{i}"', "gzip", corpo)) == corpo
+    assert len(cache._itens) == 2
+
+
+def test_compressor_incremental_entrega_blocos_decodificaveis():
+    shell = ShellGzip(b"<html><body>")
+    compressor = CompressorIncremental("gzip", shell)
+    descompressor = zlib.decompressobj(31)
+
+    assert descompressor.decompress(compressor.comprimir(b"<p>um</p>")) == b"<html><body><p>um</p>"
+    assert descompressor.decompress(compressor.comprimir(b"<p>dois</p>")) == b"<p>dois</p>"
+    assert descompressor.decompress(compressor.finalizar(b"</body></html>")) == b"</body></html>"
+    assert descompressor.eof
@@ -0,0 +1,18 @@
+import re
+from View_and_Interface.estaticos import Estaticos
+
+
+def test_nome_publicado_muda_com_conteudo(tmp_path):
+    (tmp_path / "a.css").write_text("body{}", encoding="utf-8")
+    antes = Estaticos(tmp_path).url("a.css")
+    (tmp_path / "a.css").write_text("body{margin:0}", encoding="utf-8")
+    depois = Estaticos(tmp_path).url("a.css")
+    assert re.fullmatch(r"/static/a\.[0-9a-f]{12}\.css", antes)
+    assert antes != depois
+
+
+def test_reescrever_troca_so_nomes_conhecidos(tmp_path):
+    (tmp_path / "a.css").write_text("body{}", encoding="utf-8")
+    indice = Estaticos(tmp_path)
+    html = '<link href="/static/a.css"><link href="/static/b.css">'
+    assert indice.reescrever(html) == f'<link href="{indice.url("a.css")}"><link href="/static/b.css">'
@@ -0,0 +1,111 @@
+import pytest
+from datetime import datetime
+from Model.model import User, Book, Loan, DatabaseManager
+from src.report_service import ReportService
+
+
+def _memory_db(loans):
+    db = DatabaseManager()
+    db.using_memory = True
+    db.memory_loans = list(loans)
+    return db
+
+
+def test_apply_accumulates_counts():
+    service = ReportService()
+    applied = service.apply([
+        Loan("1", "user1", "book1", datetime(2024, 1, 1)),
+        Loan("2", "user2", "book1", datetime(2024, 1, 2)),
+        Loan("3", "user2", "book2", datetime(2024, 1, 3)),
+    ])
+
+    assert applied == 3
+    result = service.get_current_most_borrowed_books()
+    assert result[0]["book_id"] == "book1"
+    assert result[0]["loan_count"] == 2
+    assert result[0]["active_loans"] == 2
+
+
+def test_apply_skips_loans_before_watermark():
+    service = ReportService()
+    service.apply([Loan("1", "user1", "book1", datetime(2024, 1, 10))])
+
+    applied = service.apply([
+        Loan("1", "user1", "book1", datetime(2024, 1, 10)),  # já processado
+        Loan("0", "user1", "book1", datetime(2024, 1, 5)),   # anterior ao watermark
+        Loan("2", "user2", "book1", datetime(2024, 1, 10)),  # mesma data, id novo
+    ])
+
+    assert applied == 1
+    assert service.book_counts["book1"] == 2
+
+
+def test_apply_returns_closes_active_loans():
+    service = ReportService()
+    service.apply([
+        Loan("1", "user1", "book1", datetime(2024, 1, 1)),
+        Loan("2", "user1", "book2", datetime(2024, 1, 2)),
+    ])
+
+    returned = Loan("1", "user1", "book1", datetime(2024, 1, 1), datetime(2024, 1, 5))
+    assert service.apply_returns([returned]) == 1
+    assert service.apply_returns([returned]) == 0
+
+    users = [User("user1", "João Silva", "joao@email.com", "Estudante")]
+    result = service.get_current_most_active_users(users)
+    assert result[0]["loan_count"] == 2
+    assert result[0]["active_loans"] == 1
+
+
+def test_refresh_processes_only_new_loans():
+    db = _memory_db([
+        Loan("1", "user1", "book1", datetime(2024, 1, 1)),
+        Loan("2", "user2", "book1", datetime(2024, 1, 2)),
+    ])
+    service = ReportService()
+    assert service.refresh(db) == 2
+    assert service.refresh(db) == 0
+
+    db.memory_loans.append(Loan("3", "user3", "book2", datetime(2024, 1, 3)))
+    db.memory_loans[0].return_date = datetime(2024, 1, 4)
+    assert service.refresh(db) == 2
+    assert service.book_counts == {"book1": 2, "book2": 1}
+    assert service.active_book_counts == {"book1": 1, "book2": 1}
+
+
+def test_refresh_matches_full_recount():
+    loans = [Loan(str(i), f"user{i % 3}", f"book{i % 4}", datetime(2024, 1, 1 + i)) for i in range(20)]
+    books = [Book(f"book{i}", f"Livro {i}", "Autor", str(i), True) for i in range(4)]
+    db = _memory_db(loans[:10])
+
+    service = ReportService()
+    service.refresh(db)
+    db.memory_loans.extend(loans[10:])
+    service.refresh(db)
+
+    current = service.get_current_most_borrowed_books(books)
+    exact = service.get_most_borrowed_books(loans, books)
+    assert [(i["title"], i["loan_count"]) for i in current] == [(i["title"], i["loan_count"]) for i in exact]
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    db = _memory_db([
+        Loan("1", "user1", "book1", datetime(2024, 1, 1)),
+        Loan("2", "user2", "book2", datetime(2024, 1, 2), datetime(2024, 1, 3)),
+    ])
+    service = ReportService()
+    service.refresh(db)
+
+    path = str(tmp_path / "relatorios.json")
+    service.save_checkpoint(path)
+    restored = ReportService.load_checkpoint(path)
+
+    assert restored.to_dict() == service.to_dict()
+    assert restored.refresh(db) == 0
+    assert restored.active_book_counts == {"book1": 1}
+
+
+def test_load_checkpoint_missing_file(tmp_path):
+    service = ReportService.load_checkpoint(str(tmp_path / "inexistente.json"))
+    assert service.loan_watermark is None
+    assert service.get_current_most_borrowed_books() == []
@@ -0,0 +1,37 @@
+import pytest
+from Model.model import DatabaseManager
+from View_and_Interface import metricas as mt
+from View_and_Interface.metricas import Histograma, Metricas
+
+
+def test_histograma_cumulativo_e_quantil():
+    h = Histograma((1, 2, 4))
+    for valor in (0.5, 1, 1.5, 3, 10):
+        h.observar(valor)
+
+    assert list(h.cumulativos()) == [(1, 2), (2, 3), (4, 4), (float("inf"), 5)]
+    assert h.quantil(0.5) == pytest.approx(1.5)
+    assert h.media == pytest.approx(3.2)
+
+
+def test_medicao_conta_consultas_uma_vez_por_chamada_externa():
+    registro = Metricas()
+    db = DatabaseManager()
+    db.using_memory = True
+
+    with registro.medir() as medicao:
+        medicao.rota, medicao.status = "/x", 200
+        db.get_usuarios()
+        db.get_emprestimos_desde(None)  # chama get_emprestimos internamente
+    db.get_livros()  # fora da medição
+
+    assert medicao.consultas.total == 2
+    assert 'biblioteca_consultas_db_sum{rota="/x"} 2.0' in registro.texto_prometheus()
+
+
+def test_404_usa_rotulo_unico():
+    registro = Metricas()
+    for caminho in ("/a", "/b"):
+        with registro.medir() as medicao:
+            medicao.rota, medicao.status = caminho, 404
+    assert 'biblioteca_requisicoes_total{rota="desconhecida",status="404"} 2' in registro.texto_prometheus()
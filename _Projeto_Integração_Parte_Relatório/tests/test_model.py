@@ -0,0 +1,107 @@
+from datetime import datetime
+import threading
+import pytest
+from Model.busca import IndiceNaoPronto
+from Model.model import User, Book, Loan, DatabaseManager
+
+
+def test_emprestimos_ativos_pagina_em_memoria():
+    db = DatabaseManager()
+    db.using_memory = True
+    db.memory_users = [User("user1", "Ana", "ana@x.com", "aluno")]
+    db.memory_books = [
+        Book("book1", "Livro 1", "Autor", "978-1", False),
+        Book("book2", "Livro 2", "Autor", "978-2", False),
+    ]
+    db.memory_loans = [
+        Loan("1", "user1", "book1", datetime(2024, 1, 1)),
+        Loan("2", "user1", "book2", datetime(2024, 1, 2), datetime(2024, 1, 3)),  # devolvido
+        Loan("3", "sumido", "book2", datetime(2024, 1, 4)),                       # usuário removido
+        Loan("4", "user1", "inexistente", datetime(2024, 1, 5)),                  # livro removido
+    ]
+
+    resultado = db.get_emprestimos_ativos_pagina().itens
+
+    assert [(loan.id, livro.id, usuario and usuario.name) for loan, livro, usuario in resultado] == [
+        ("1", "book1", "Ana"),
+        ("3", "book2", None),
+    ]
+
+
+def _db_paginacao():
+    db = DatabaseManager()
+    db.using_memory = True
+    db.memory_users = [User(f"u{i:03d}", f"Nome {i}", f"u{i}@x.com", "Professor" if i % 3 == 0 else "Estudante")
+                       for i in range(10)]
+    db.memory_users.append(User("u999", " ", "vazio@x.com", "Estudante"))  # nome em branco
+    return db
+
+
+def test_pagina_por_numero_e_por_cursor():
+    db = _db_paginacao()
+
+    primeira = db.get_usuarios_pagina(4)
+    assert [u.id for u in primeira.itens] == ["u000", "u001", "u002", "u003"]
+    assert primeira.pagina == 1 and primeira.proximo_cursor == "u003"
+
+    terceira = db.get_usuarios_pagina(4, pagina=3)
+    assert [u.id for u in terceira.itens] == ["u008", "u009"]
+    assert terceira.proximo_cursor is None  # u999 é inválido
+
+    seguinte = db.get_usuarios_pagina(4, cursor=primeira.proximo_cursor)
+    assert [u.id for u in seguinte.itens] == ["u004", "u005", "u006", "u007"]
+    assert seguinte.pagina is None
+
+
+def test_pagina_filtrada_por_tipo():
+    pagina = _db_paginacao().get_usuarios_pagina(50, tipo="Professor")
+    assert [u.id for u in pagina.itens] == ["u000", "u003", "u006", "u009"]
+
+
+def test_livros_filtrados_por_categoria():
+    db = DatabaseManager()
+    db.using_memory = True
+    db.memory_books = [
+        Book("b1", "Python Fluente", "Autor", "978-1", True),
+        Book("b2", "Cálculo II", "Autor", "978-2", True),
+        Book("b3", "JavaScript Moderno", "Autor", "978-3", True),
+    ]
+
+    pagina = db.get_livros_pagina(10, categoria="Programação")
+
+    assert [livro.id for livro in pagina.itens] == ["b1", "b3"]
+
+
+def test_busca_atualizada_ao_adicionar_livro():
+    db = DatabaseManager()
+    db.using_memory = True
+    db.memory_books = [Book("b1", "Cálculo I", "Autor", "978-1", True)]
+    db.montar_indice_busca()
+
+    assert [livro.id for livro in db.buscar_livros("calculo")] == ["b1"]
+
+    db.adicionar_livro(Book("b2", "Cálculo Vetorial", "Outro Autor", "978-2", True))
+
+    assert [livro.id for livro in db.buscar_livros("calculo")] == ["b1", "b2"]
+    assert db.sugerir_termos_livros("veto") == ["vetorial"]
+
+
+def test_busca_responde_nao_pronto_durante_a_montagem():
+    db = DatabaseManager()
+    db.using_memory = True
+    liberar = threading.Event()
+
+    def livros_lentos():
+        yield Book("b1", "Cálculo I", "Autor", "978-1", True)
+        liberar.wait(timeout=5)
+
+    db.iter_livros = livros_lentos
+    montagem = db.montar_indice_em_segundo_plano()
+    with pytest.raises(IndiceNaoPronto):
+        db.buscar_livros("calculo")
+    db.adicionar_livro(Book("b2", "Cálculo Vetorial", "Outro", "978-2", True))  # durante a montagem
+
+    liberar.set()
+    montagem.join(timeout=5)
+    assert db.indice_busca_pronto()
+    assert [livro.id for livro in db.buscar_livros("calculo")] == ["b1", "b2"]
@@ -0,0 +1,130 @@
+import asyncio
+import gzip
+import http.client
+import socket
+import threading
+import time
+import pytest
+from Model import model as md
+from servidor_async import ServidorAsync
+
+
+class _Loop:
+    """Loop asyncio numa thread, para exercitar o servidor com clientes síncronos"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def rodar(self, corrotina, timeout=15):
+        return asyncio.run_coroutine_threadsafe(corrotina, self.loop).result(timeout)
+
+    def parar(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+@pytest.fixture
+def servidor():
+    md.db_manager.using_memory = True
+    md.db_manager.connect()
+    md.db_manager.aguardar_indice_busca(timeout=10)
+    loop = _Loop()
+    servidor = ServidorAsync("127.0.0.1", 0, workers=4, timeout=5)
+    loop.rodar(servidor.iniciar())
+    servidor.loop = loop
+    yield servidor
+    if not servidor._encerrando:
+        loop.rodar(servidor.encerrar(prazo=2))
+    loop.parar()
+
+
+def test_keep_alive_e_respostas_compartilhadas(servidor):
+    conexao = http.client.HTTPConnection(*servidor.endereco, timeout=10)
+    for rota in ["/menu", "/listar_livros", "/relatorios_livros", "/api/usuarios"]:
+        conexao.request("GET", rota, headers={"Accept-Encoding": "gzip"})
+        resposta = conexao.getresponse()
+        corpo = resposta.read()
+        assert resposta.status == 200
+        assert not resposta.will_close
+        assert resposta.getheader("Content-Encoding") == "gzip"
+        assert gzip.decompress(corpo)
+    conexao.close()
+
+
+def test_etag_304_e_404(servidor):
+    conexao = http.client.HTTPConnection(*servidor.endereco, timeout=10)
+    conexao.request("GET", "/relatorios")
+    resposta = conexao.getresponse()
+    resposta.read()
+    conexao.request("GET", "/relatorios", headers={"If-None-Match": resposta.getheader("ETag")})
+    resposta = conexao.getresponse()
+    assert resposta.status == 304
+    assert resposta.read() == b""
+
+    conexao.request("GET", "/nao_existe")
+    resposta = conexao.getresponse()
+    resposta.read()
+    assert resposta.status == 404
+    conexao.close()
+
+
+def test_conexoes_ociosas_nao_bloqueiam(servidor):
+    ociosas = [socket.create_connection(servidor.endereco) for _ in range(200)]
+    try:
+        conexao = http.client.HTTPConnection(*servidor.endereco, timeout=5)
+        conexao.request("GET", "/menu")
+        assert conexao.getresponse().status == 200
+        conexao.close()
+    finally:
+        for s in ociosas:
+            s.close()
+
+
+def test_encerrar_fecha_conexoes_ociosas(servidor):
+    ociosa = socket.create_connection(servidor.endereco)
+    ociosa.settimeout(5)
+    conexao = http.client.HTTPConnection(*servidor.endereco, timeout=5)
+    conexao.request("GET", "/menu")
+    conexao.getresponse().read()
+
+    servidor.loop.rodar(servidor.encerrar(prazo=2))
+
+    assert ociosa.recv(1) == b""
+    assert servidor.conexoes_abertas == 0
+    with pytest.raises(OSError):
+        socket.create_connection(servidor.endereco, timeout=1)
+    ociosa.close()
+
+
+def test_consultas_no_executor_entram_nas_metricas(servidor, monkeypatch):
+    import servidor_async
+    from View_and_Interface.metricas import Metricas
+    registro = Metricas()
+    monkeypatch.setattr(servidor_async, "metricas", registro)
+
+    conexao = http.client.HTTPConnection(*servidor.endereco, timeout=10)
+    conexao.request("GET", "/listar_livros")
+    conexao.getresponse().read()
+    conexao.close()
+
+    # A medição é registrada logo depois do último byte sair
+    esperado = 'biblioteca_consultas_db_sum{rota="/listar_livros"} 2.0'
+    for _ in range(100):
+        if esperado in registro.texto_prometheus():
+            break
+        time.sleep(0.01)
+    assert esperado in registro.texto_prometheus()
+
+
+def test_estatico_por_sendfile(servidor):
+    from View_and_Interface.estaticos import estaticos
+    conexao = http.client.HTTPConnection(*servidor.endereco, timeout=10)
+    for _ in range(2):  # a conexão continua utilizável depois do sendfile
+        conexao.request("GET", estaticos.url("icones.css"))
+        resposta = conexao.getresponse()
+        assert resposta.status == 200
+        assert "immutable" in resposta.getheader("Cache-Control")
+        assert resposta.read() == (estaticos.diretorio / "icones.css").read_bytes()
+    conexao.close()
@@ -0,0 +1,127 @@
+import http.client
+import socket
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler
+from servidor_pool import PooledHTTPServer
+
+
+class _HandlerLento(BaseHTTPRequestHandler):
+    liberar = threading.Event()
+    em_atendimento = []
+
+    def do_GET(self):
+        _HandlerLento.em_atendimento.append(threading.current_thread().name)
+        _HandlerLento.liberar.wait(timeout=5)
+        corpo = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def servidor_factory():
+    servidores = []
+
+    def criar(workers, tamanho_fila):
+        _HandlerLento.liberar.clear()
+        _HandlerLento.em_atendimento.clear()
+        servidor = PooledHTTPServer(("127.0.0.1", 0), _HandlerLento, workers=workers, tamanho_fila=tamanho_fila)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        servidores.append(servidor)
+        return servidor
+
+    yield criar
+
+    _HandlerLento.liberar.set()
+    for servidor in servidores:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def _get(servidor, resultados):
+    conexao = http.client.HTTPConnection(*servidor.server_address, timeout=10)
+    conexao.request("GET", "/")
+    resposta = conexao.getresponse()
+    resultados.append(resposta.status)
+    resposta.read()
+    conexao.close()
+
+
+def _esperar(condicao, timeout=5):
+    limite = time.time() + timeout
+    while not condicao() and time.time() < limite:
+        time.sleep(0.01)
+
+
+def test_workers_atendem_em_paralelo(servidor_factory):
+    servidor = servidor_factory(workers=4, tamanho_fila=4)
+    resultados = []
+    clientes = [threading.Thread(target=_get, args=(servidor, resultados)) for _ in range(4)]
+    for cliente in clientes:
+        cliente.start()
+
+    _esperar(lambda: len(_HandlerLento.em_atendimento) == 4)
+    assert len(set(_HandlerLento.em_atendimento)) == 4
+
+    _HandlerLento.liberar.set()
+    for cliente in clientes:
+        cliente.join()
+    assert resultados == [200] * 4
+
+
+def test_fila_cheia_responde_503(servidor_factory):
+    servidor = servidor_factory(workers=1, tamanho_fila=1)
+    resultados = []
+
+    ocupando = threading.Thread(target=_get, args=(servidor, resultados))
+    ocupando.start()
+    _esperar(lambda: len(_HandlerLento.em_atendimento) == 1)
+
+    na_fila = threading.Thread(target=_get, args=(servidor, resultados))
+    na_fila.start()
+    _esperar(lambda: servidor._fila.qsize() == 1)
+
+    _get(servidor, resultados)
+    assert resultados == [503]
+    assert servidor.rejeitadas == 1
+
+    _HandlerLento.liberar.set()
+    ocupando.join()
+    na_fila.join()
+    assert sorted(resultados) == [200, 200, 503]
+
+
+def test_rejeicoes_nao_travam_o_accept(servidor_factory):
+    servidor = servidor_factory(workers=1, tamanho_fila=1)
+    resultados = []
+    ocupando = threading.Thread(target=_get, args=(servidor, resultados))
+    ocupando.start()
+    _esperar(lambda: len(_HandlerLento.em_atendimento) == 1)
+    na_fila = threading.Thread(target=_get, args=(servidor, resultados))
+    na_fila.start()
+    _esperar(lambda: servidor._fila.qsize() == 1)
+
+    # Clientes que conectam e não mandam nada: cada um custava 50 ms do accept
+    inicio = time.monotonic()
+    respostas = []
+    for _ in range(40):
+        with socket.create_connection(servidor.server_address, timeout=5) as cliente:
+            respostas.append(cliente.makefile("rb").readline())
+    assert time.monotonic() - inicio < 1
+    assert respostas == [b"HTTP/1.1 503 Service Unavailable\r\n"] * 40
+
+    _HandlerLento.liberar.set()
+    ocupando.join()
+    na_fila.join()
+    assert resultados == [200, 200]
+
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError):
+        PooledHTTPServer(("127.0.0.1", 0), _HandlerLento, workers=0)
@@ -0,0 +1,110 @@
+import random
+import pytest
+from datetime import datetime
+from Model.model import User, Book, Loan
+from src.report_service import ReportService
+from src.sketches import CountMinSketch, HyperLogLog, HeavyHitters
+
+
+def _zipf_loans(n_loans, n_books, n_users, seed=42):
+    rng = random.Random(seed)
+    weights = [1 / (rank ** 1.2) for rank in range(1, n_books + 1)]
+    book_ids = rng.choices([f"b{i}" for i in range(n_books)], weights=weights, k=n_loans)
+    now = datetime.now()
+    return [
+        Loan(f"l{i}", f"u{rng.randrange(n_users)}", book_id, now)
+        for i, book_id in enumerate(book_ids)
+    ]
+
+
+def test_count_min_never_underestimates():
+    sketch = CountMinSketch(epsilon=0.01, delta=0.01)
+    exact = {}
+    rng = random.Random(1)
+    for _ in range(5000):
+        key = f"k{rng.randrange(500)}"
+        sketch.add(key)
+        exact[key] = exact.get(key, 0) + 1
+
+    for key, count in exact.items():
+        estimate = sketch.estimate(key)
+        assert estimate >= count
+        assert estimate - count <= sketch.epsilon * sketch.total * 3
+
+
+def test_count_min_memory_does_not_grow_with_stream():
+    sketch = CountMinSketch(epsilon=0.01, delta=0.01)
+    before = sketch.memory_bytes()
+    for i in range(20000):
+        sketch.add(f"k{i}")
+    assert sketch.memory_bytes() == before
+
+
+@pytest.mark.parametrize("error_rate", [0.1, 0.05, 0.02])
+def test_hyperloglog_accuracy_vs_memory(error_rate):
+    sketch = HyperLogLog(error_rate)
+    for i in range(20000):
+        sketch.add(f"user{i}")
+        sketch.add(f"user{i}")  # duplicados não contam
+
+    assert abs(sketch.count() - 20000) / 20000 <= 3 * sketch.error_rate
+    assert sketch.memory_bytes() == 2 ** sketch.p
+
+
+def test_hyperloglog_small_cardinality():
+    sketch = HyperLogLog(0.02)
+    for user_id in ["u1", "u2", "u3", "u1"]:
+        sketch.add(user_id)
+    assert sketch.count() == 3
+
+
+def test_heavy_hitters_keeps_at_most_k_candidates():
+    heavy_hitters = HeavyHitters(k=5, epsilon=0.01)
+    for i in range(1000):
+        heavy_hitters.add(f"k{i % 50}")
+    assert len(heavy_hitters.most_common()) == 5
+
+
+def test_approx_top_books_matches_exact_report():
+    loans = _zipf_loans(n_loans=20000, n_books=2000, n_users=500)
+    books = [Book(f"b{i}", f"Livro {i}", f"Autor {i}", str(i), True) for i in range(2000)]
+
+    service = ReportService()
+    exact = service.get_most_borrowed_books(loans, books)[:10]
+    approx = service.get_most_borrowed_books_approx(loans, books, top_k=10, epsilon=0.001)
+
+    assert [item["title"] for item in approx[:5]] == [item["title"] for item in exact[:5]]
+    exact_counts = {item["title"]: item["loan_count"] for item in service.get_most_borrowed_books(loans, books)}
+    for item in approx:
+        assert item["loan_count"] >= exact_counts[item["title"]]
+        assert item["loan_count"] - exact_counts[item["title"]] <= 0.001 * len(loans) * 3
+
+
+def test_approx_top_books_distinct_borrowers():
+    loans = _zipf_loans(n_loans=20000, n_books=200, n_users=3000)
+    service = ReportService()
+    approx = service.get_most_borrowed_books_approx(loans, top_k=3, error_rate=0.02)
+
+    top_book = approx[0]["book_id"]
+    exact_distinct = len({loan.user_id for loan in loans if loan.book_id == top_book})
+    assert abs(approx[0]["distinct_borrowers"] - exact_distinct) / exact_distinct <= 0.1
+
+
+def test_distinct_borrowers_by_user_type():
+    users = [User(f"u{i}", f"Nome {i}", f"u{i}@email.com", "Professor" if i % 4 == 0 else "Estudante")
+             for i in range(4000)]
+    loans = _zipf_loans(n_loans=30000, n_books=100, n_users=4000)
+
+    service = ReportService()
+    result = service.get_distinct_borrowers_by_user_type(loans, users, error_rate=0.02)
+
+    types = {user.id: user.type for user in users}
+    for user_type in ("Professor", "Estudante"):
+        exact = len({loan.user_id for loan in loans if types[loan.user_id] == user_type})
+        assert abs(result[user_type] - exact) / exact <= 0.1
+
+
+def test_approx_reports_with_none_inputs():
+    service = ReportService()
+    assert service.get_most_borrowed_books_approx(None) == []
+    assert service.get_distinct_borrowers_by_user_type(None) == {}
@@ -0,0 +1,62 @@
+import os
+import pytest
+from View_and_Interface.template_cache import TemplateCache
+
+
+def _template(tmp_path, conteudo):
+    caminho = tmp_path / "pagina.html"
+    caminho.write_text(conteudo, encoding="utf-8")
+    return caminho
+
+
+def test_divide_no_marcador(tmp_path):
+    _template(tmp_path, "<ul>Ação<!--ITENS--></ul>")
+    cache = TemplateCache(tmp_path, dev=False)
+
+    prefixo, sufixo = cache.partes("pagina.html", "<!--ITENS-->")
+    assert prefixo == "<ul>Ação".encode("utf-8")
+    assert sufixo == b"</ul>"
+
+
+def test_sem_marcador_retorna_template_inteiro(tmp_path):
+    _template(tmp_path, "<p>menu</p>")
+    cache = TemplateCache(tmp_path, dev=False)
+    assert cache.partes("pagina.html") == (b"<p>menu</p>", b"")
+
+
+def test_carrega_uma_vez_fora_do_modo_dev(tmp_path):
+    caminho = _template(tmp_path, "<ul><!--ITENS--></ul>")
+    cache = TemplateCache(tmp_path, dev=False)
+    cache.partes("pagina.html", "<!--ITENS-->")
+
+    caminho.unlink()
+    assert cache.partes("pagina.html", "<!--ITENS-->") == (b"<ul>", b"</ul>")
+
+
+def test_modo_dev_recarrega_quando_mtime_muda(tmp_path):
+    caminho = _template(tmp_path, "<ul><!--ITENS--></ul>")
+    cache = TemplateCache(tmp_path, dev=True)
+    cache.partes("pagina.html", "<!--ITENS-->")
+
+    caminho.write_text("<ol><!--ITENS--></ol>", encoding="utf-8")
+    mtime = os.stat(caminho).st_mtime + 10
+    os.utime(caminho, (mtime, mtime))
+    assert cache.partes("pagina.html", "<!--ITENS-->") == (b"<ol>", b"</ol>")
+
+
+def test_marcador_inexistente(tmp_path):
+    _template(tmp_path, "<ul></ul>")
+    cache = TemplateCache(tmp_path, dev=False)
+    with pytest.raises(ValueError):
+        cache.partes("pagina.html", "<!--ITENS-->")
+
+
+@pytest.mark.parametrize("nome, marcador", [
+    ("listar_usuarios.html", "<!--USUARIOS-->"),
+    ("listar_livros.html", "<!--LIVROS-->"),
+    ("listar_emprestimos.html", "<!--EMPRESTIMOS-->"),
+])
+def test_templates_da_view_tem_marcador(nome, marcador):
+    prefixo, sufixo = TemplateCache(dev=False).partes(nome, marcador)
+    assert prefixo.startswith(b"<!DOCTYPE html>")
+    assert sufixo.rstrip().endswith(b"</html>")
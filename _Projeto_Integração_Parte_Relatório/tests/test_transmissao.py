@@ -0,0 +1,33 @@
+import io
+import json
+from datetime import datetime
+from View_and_Interface.transmissao import EscritorChunked, json_array
+
+
+def test_agrupa_escritas_em_chunks():
+    saida = io.BytesIO()
+    escritor = EscritorChunked(saida, tamanho_chunk=8)
+    for parte in [b"abc", b"def", b"ghi", b"j"]:
+        escritor.write(parte)
+    escritor.close()
+
+    assert saida.getvalue() == b"9\r\nabcdefghi\r\n1\r\nj\r\n0\r\n\r\n"
+    assert escritor.enviados == 10
+
+
+def test_sem_chunked_escreve_corpo_cru():
+    saida = io.BytesIO()
+    escritor = EscritorChunked(saida, chunked=False, tamanho_chunk=4)
+    escritor.write(b"abc")
+    escritor.write(b"def")
+    escritor.close()
+    assert saida.getvalue() == b"abcdef"
+
+
+def test_json_array():
+    assert b"".join(json_array([])) == b"[]"
+
+    itens = [{"nome": "Ação"}, {"data": datetime(2024, 1, 2, 3, 4)}]
+    assert json.loads(b"".join(json_array(itens))) == [
+        {"nome": "Ação"}, {"data": "2024-01-02T03:04:00"}
+    ]
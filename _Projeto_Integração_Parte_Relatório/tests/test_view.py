@@ -0,0 +1,378 @@
+import gzip
+import json
+import re
+import socket
+import http.client
+import threading
+import time
+import pytest
+from http.server import HTTPServer
+from Model import model as md
+from View_and_Interface import view as vw
+from View_and_Interface import metricas as mt
+from View_and_Interface.estaticos import estaticos
+
+
+@pytest.fixture(scope="module")
+def servidor():
+    md.db_manager.using_memory = True
+    md.db_manager.connect()
+    md.db_manager.aguardar_indice_busca(timeout=10)
+    vw.BibliotecaController.log_message = lambda *args: None
+    servidor = HTTPServer(("127.0.0.1", 0), vw.BibliotecaController)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _get(servidor, rota, headers=None):
+    conexao = http.client.HTTPConnection(*servidor.server_address, timeout=10)
+    conexao.request("GET", rota, headers=headers or {})
+    resposta = conexao.getresponse()
+    corpo = resposta.read()
+    conexao.close()
+    return resposta, corpo
+
+
+@pytest.mark.parametrize("rota", ["/relatorios", "/relatorios_livros", "/relatorios_usuarios"])
+def test_relatorios_enviam_etag(servidor, rota):
+    resposta, corpo = _get(servidor, rota)
+    assert resposta.status == 200
+    assert resposta.getheader("ETag").startswith('"')
+    assert corpo.startswith(b"<!DOCTYPE html>")
+    assert corpo.endswith(b"</html>")
+
+
+@pytest.mark.parametrize("rota", ["/relatorios", "/relatorios_livros", "/relatorios_usuarios"])
+def test_if_none_match_retorna_304_sem_corpo(servidor, rota):
+    etag = _get(servidor, rota)[0].getheader("ETag")
+    resposta, corpo = _get(servidor, rota, {"If-None-Match": etag})
+    assert resposta.status == 304
+    assert resposta.getheader("ETag") == etag
+    assert corpo == b""
+
+
+def test_304_nao_consulta_o_banco(servidor, monkeypatch):
+    etag = _get(servidor, "/relatorios_livros")[0].getheader("ETag")
+
+    def falhar(*args, **kwargs):
+        raise AssertionError("consulta ao banco durante revalidação")
+
+    monkeypatch.setattr(vw.controller, "get_livros", falhar)
+    monkeypatch.setattr(vw.controller, "get_emprestimos_desde", falhar)
+    resposta, _ = _get(servidor, "/relatorios_livros", {"If-None-Match": f'"outro", {etag}'})
+    assert resposta.status == 304
+
+
+def test_etag_muda_com_versao_dos_dados(servidor):
+    antes = _get(servidor, "/relatorios_usuarios")[0].getheader("ETag")
+    md.db_manager._bump_version()
+    resposta, _ = _get(servidor, "/relatorios_usuarios", {"If-None-Match": antes})
+    assert resposta.status == 200
+    assert resposta.getheader("ETag") != antes
+
+
+def test_etag_muda_com_reinicio_do_processo(servidor, monkeypatch):
+    # Outro processo (ou o mesmo reiniciado) com o contador no mesmo valor
+    antes = _get(servidor, "/relatorios_usuarios")[0].getheader("ETag")
+    monkeypatch.setattr(md.db_manager, "data_epoch", "reinicio")
+    resposta, _ = _get(servidor, "/relatorios_usuarios", {"If-None-Match": antes})
+    assert resposta.status == 200
+
+
+def test_relatorio_livros_lista_emprestimos(servidor):
+    _, corpo = _get(servidor, "/relatorios_livros")
+    html = corpo.decode("utf-8")
+    assert "<table>" in html
+    assert "Algoritmos e Estruturas de Dados" in html
+
+
+def test_keep_alive_reutiliza_conexao(servidor):
+    conexao = http.client.HTTPConnection(*servidor.server_address, timeout=10)
+    for rota in ["/menu", "/listar_livros", "/relatorios", "/api/livros", "/menu"]:
+        conexao.request("GET", rota)
+        resposta = conexao.getresponse()
+        corpo = resposta.read()
+        assert resposta.status == 200
+        if resposta.getheader("Transfer-Encoding") != "chunked":
+            assert int(resposta.getheader("Content-Length")) == len(corpo)
+        assert not resposta.will_close
+    conexao.close()
+
+
+def test_conexoes_ociosas_nao_prendem_o_pool(servidor):
+    from servidor_pool import PooledHTTPServer
+    pool = PooledHTTPServer(("127.0.0.1", 0), vw.BibliotecaController, workers=2, tamanho_fila=4)
+    threading.Thread(target=pool.serve_forever, daemon=True).start()
+    try:
+        # Uma conexão keep-alive ociosa por worker
+        ociosas = []
+        for _ in range(2):
+            conexao = http.client.HTTPConnection(*pool.server_address, timeout=10)
+            conexao.request("GET", "/relatorios")
+            conexao.getresponse().read()
+            ociosas.append(conexao)
+
+        inicio = time.monotonic()
+        resposta, _ = _get(pool, "/relatorios")
+        assert resposta.status == 200
+        assert time.monotonic() - inicio < vw.BibliotecaController.ocioso / 2
+        for conexao in ociosas:
+            conexao.close()
+    finally:
+        pool.shutdown()
+        pool.server_close()
+
+
+@pytest.mark.parametrize("rota", ["/menu", "/listar_livros", "/listar_usuarios", "/relatorios_livros"])
+def test_gzip_negociado(servidor, rota):
+    _, original = _get(servidor, rota)
+    resposta, comprimido = _get(servidor, rota, {"Accept-Encoding": "gzip"})
+
+    assert resposta.getheader("Content-Encoding") == "gzip"
+    assert len(comprimido) < len(original)
+    assert gzip.decompress(comprimido) == original
+
+
+def test_etag_proprio_por_codificacao(servidor):
+    identidade = _get(servidor, "/relatorios")[0]
+    comprimida = _get(servidor, "/relatorios", {"Accept-Encoding": "gzip"})[0]
+    etag_gzip = comprimida.getheader("ETag")
+
+    assert etag_gzip == identidade.getheader("ETag")[:-1] + '-gzip"'
+    assert comprimida.getheader("Vary") == "Accept-Encoding"
+    for etag in (etag_gzip, "W/" + etag_gzip):
+        resposta, _ = _get(servidor, "/relatorios", {"If-None-Match": etag, "Accept-Encoding": "gzip"})
+        assert resposta.status == 304
+        assert resposta.getheader("ETag") == etag_gzip
+
+
+def test_relatorios_comprimidos_nao_se_misturam(servidor):
+    # Mesma versão dos dados nas duas rotas: cada uma precisa do seu ETag
+    etags = set()
+    for rota in ("/relatorios_livros", "/relatorios_usuarios"):
+        _, original = _get(servidor, rota)
+        resposta, comprimido = _get(servidor, rota, {"Accept-Encoding": "gzip"})
+        assert gzip.decompress(comprimido) == original
+        etags.add(resposta.getheader("ETag"))
+    assert len(etags) == 2
+
+
+def test_sem_accept_encoding_nao_comprime(servidor):
+    resposta, corpo = _get(servidor, "/listar_livros", {"Accept-Encoding": "gzip;q=0"})
+    assert resposta.getheader("Content-Encoding") is None
+    assert corpo.startswith(b"<!DOCTYPE html>")
+
+
+def test_redirect_e_rota_inexistente(servidor):
+    resposta, corpo = _get(servidor, "/")
+    assert resposta.status == 302
+    assert resposta.getheader("Location") == "/menu"
+    assert corpo == b""
+
+    resposta, _ = _get(servidor, "/nao_existe")
+    assert resposta.status == 404
+
+
+def test_listar_emprestimos_faz_uma_consulta(servidor, monkeypatch):
+    chamadas = []
+    original = vw.controller.get_emprestimos_ativos_pagina
+
+    def contar(*args, **kwargs):
+        chamadas.append(args)
+        return original(*args, **kwargs)
+
+    def falhar(*args, **kwargs):
+        raise AssertionError("consulta por item na listagem de empréstimos")
+
+    monkeypatch.setattr(vw.controller, "get_emprestimos_ativos_pagina", contar)
+    for nome in ["get_emprestimos", "get_livros", "get_usuario_por_id"]:
+        monkeypatch.setattr(vw.controller, nome, falhar)
+
+    resposta, corpo = _get(servidor, "/listar_emprestimos")
+    assert resposta.status == 200
+    assert len(chamadas) == 1
+    assert corpo.count(b'class="loan-card"') == len(md.get_emprestimos_ativos_pagina().itens)
+
+
+def test_listagens_paginadas(servidor):
+    _, corpo = _get(servidor, "/listar_usuarios?size=2")
+    html = corpo.decode("utf-8")
+    assert html.count('class="user-card"') == 2
+    assert '<a href="/listar_usuarios?size=2&amp;page=2">' in html
+
+    _, corpo = _get(servidor, "/listar_usuarios?size=2&page=3")
+    html = corpo.decode("utf-8")
+    assert html.count('class="user-card"') == 1
+    assert "page=2" in html and "Próxima" not in html
+
+
+def test_listagem_com_cursor_e_filtro(servidor):
+    _, corpo = _get(servidor, "/listar_livros?cursor=b3&size=500")
+    html = corpo.decode("utf-8")
+    assert "Engenharia de Software" in html and "Banco de Dados" not in html
+    assert "← Início" in html
+
+    _, corpo = _get(servidor, "/listar_usuarios?tipo=Professor")
+    html = corpo.decode("utf-8")
+    assert html.count('class="user-card"') == 2
+    assert 'class="pagination"' not in html
+
+
+def test_listar_livros_por_categoria(servidor):
+    corpo = _get(servidor, "/listar_livros?categoria=Matem%C3%A1tica")[1].decode("utf-8")
+    assert "Cálculo I" in corpo
+    assert "Python para Iniciantes" not in corpo
+    assert '<div class="book-category">Matemática</div>' in corpo
+
+
+def test_buscar_livros(servidor):
+    corpo = _get(servidor, "/buscar?q=calculo")[1].decode("utf-8")
+    assert "Cálculo I" in corpo
+    assert "Python para Iniciantes" not in corpo
+    assert "1 livro encontrado" in corpo
+
+    corpo = _get(servidor, "/buscar?q=%3Cinexistente%3E")[1].decode("utf-8")
+    assert "Nenhum livro encontrado para “&lt;inexistente&gt;”" in corpo
+
+
+def test_sugestoes_de_busca(servidor):
+    resposta, corpo = _get(servidor, "/api/livros/sugestoes?q=alg")
+    assert resposta.getheader("Content-Type").startswith("application/json")
+    assert json.loads(corpo) == ["algoritmos"]
+
+
+def test_busca_antes_do_indice_pronto_responde_503(servidor, monkeypatch):
+    monkeypatch.setattr(vw.controller, "indice_busca_pronto", lambda: False)
+    resposta, corpo = _get(servidor, "/buscar?q=calculo")
+    assert resposta.status == 503
+    assert resposta.getheader("Retry-After") == "5"
+    assert "índice de busca ainda está sendo montado" in corpo.decode("utf-8")
+    resposta, corpo = _get(servidor, "/api/livros/sugestoes?q=alg")
+    assert resposta.status == 503
+    assert "erro" in json.loads(corpo)
+
+
+@pytest.mark.parametrize("rota, total", [
+    ("/api/usuarios", lambda: len(md.get_usuarios())),
+    ("/api/livros", lambda: len(md.get_livros())),
+    ("/api/emprestimos", lambda: len(md.get_emprestimos())),
+])
+def test_api_transmite_json_em_chunks(servidor, rota, total):
+    resposta, corpo = _get(servidor, rota)
+    assert resposta.status == 200
+    assert resposta.getheader("Transfer-Encoding") == "chunked"
+    assert resposta.getheader("Content-Type").startswith("application/json")
+    assert len(json.loads(corpo)) == total()
+
+
+def test_api_relatorios(servidor):
+    _, corpo = _get(servidor, "/api/relatorios/livros")
+    livros = json.loads(corpo)
+    assert livros and {"title", "loan_count", "active_loans"} <= set(livros[0])
+
+    _, corpo = _get(servidor, "/api/relatorios/usuarios")
+    assert json.loads(corpo)[0]["loan_count"] >= 1
+
+
+def test_api_http10_fecha_conexao(servidor):
+    with socket.create_connection(servidor.server_address, timeout=10) as conexao:
+        conexao.sendall(b"GET /api/livros HTTP/1.0\r\n\r\n")
+        dados = b""
+        while True:
+            parte = conexao.recv(65536)
+            if not parte:
+                break
+            dados += parte
+    cabecalhos, _, corpo = dados.partition(b"\r\n\r\n")
+    assert b"Transfer-Encoding" not in cabecalhos
+    assert len(json.loads(corpo)) == len(md.get_livros())
+
+
+@pytest.mark.parametrize("rota", ["/listar_usuarios", "/listar_livros", "/listar_emprestimos"])
+def test_listagens_transmitidas_em_chunks(servidor, rota):
+    resposta, corpo = _get(servidor, rota)
+    assert resposta.getheader("Transfer-Encoding") == "chunked"
+    assert resposta.getheader("Content-Length") is None
+    assert corpo.startswith(b"<!DOCTYPE html>")
+    assert corpo.rstrip().endswith(b"</html>")
+
+
+def test_prefixo_sai_antes_da_consulta(servidor, monkeypatch):
+    liberar = threading.Event()
+    original = vw.controller.get_usuarios_pagina
+
+    def consulta_lenta(*args, **kwargs):
+        liberar.wait(10)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(vw.controller, "get_usuarios_pagina", consulta_lenta)
+    with socket.create_connection(servidor.server_address, timeout=10) as conexao:
+        conexao.sendall(b"GET /listar_usuarios HTTP/1.1\r\nHost: x\r\nAccept-Encoding: gzip\r\n\r\n")
+        recebido = b""
+        while b"\r\n\r\n" not in recebido or len(recebido.partition(b"\r\n\r\n")[2]) < 20:
+            recebido += conexao.recv(65536)
+        # Cabeçalhos e o início comprimido chegaram com a consulta ainda bloqueada
+        assert b"Content-Encoding: gzip" in recebido
+        liberar.set()
+
+
+def test_metrics_por_rota(servidor, monkeypatch):
+    registro = mt.Metricas()
+    monkeypatch.setattr(mt, "registro", registro)
+    monkeypatch.setattr(vw, "metricas", registro)
+
+    _get(servidor, "/listar_livros")
+    _get(servidor, "/listar_emprestimos?page=1")
+    # A medição é registrada logo depois do último byte sair
+    for _ in range(100):
+        if 'rota="/listar_emprestimos"' in registro.texto_prometheus():
+            break
+        time.sleep(0.01)
+    resposta, corpo = _get(servidor, "/metrics")
+    texto = corpo.decode("utf-8")
+
+    assert resposta.getheader("Content-Type").startswith("text/plain; version=0.0.4")
+    assert 'biblioteca_requisicoes_total{rota="/listar_livros",status="200"} 1' in texto
+    assert 'biblioteca_consultas_db_sum{rota="/listar_livros"} 2.0' in texto
+    assert 'biblioteca_consultas_db_sum{rota="/listar_emprestimos"} 1.0' in texto
+    assert 'biblioteca_requisicao_segundos_bucket{rota="/listar_livros",le="+Inf"} 1' in texto
+
+    _, corpo = _get(servidor, "/debug/stats")
+    assert "<td>/metrics</td>" in corpo.decode("utf-8")
+
+
+def test_estatico_com_hash_e_imutavel(servidor):
+    url = estaticos.url("menu.css")
+    resposta, corpo = _get(servidor, url, {"Accept-Encoding": "gzip"})
+    assert resposta.status == 200
+    assert resposta.getheader("Content-Type") == "text/css; charset=utf-8"
+    assert "immutable" in resposta.getheader("Cache-Control")
+    assert resposta.getheader("Content-Encoding") is None
+    assert int(resposta.getheader("Content-Length")) == len(corpo)
+    assert corpo == (estaticos.diretorio / "menu.css").read_bytes()
+
+    resposta, corpo = _get(servidor, url, {"If-None-Match": resposta.getheader("ETag")})
+    assert resposta.status == 304
+    assert corpo == b""
+
+
+def test_estatico_sem_hash_revalida(servidor):
+    resposta, _ = _get(servidor, "/static/menu.css")
+    assert resposta.status == 200
+    assert resposta.getheader("Cache-Control") == "no-cache"
+
+
+@pytest.mark.parametrize("rota", ["/static/nao_existe.css", "/static/../view.py", "/static/%2e%2e/view.py"])
+def test_estatico_desconhecido_404(servidor, rota):
+    assert _get(servidor, rota)[0].status == 404
+
+
+@pytest.mark.parametrize("rota", ["/menu", "/listar_livros", "/relatorios", "/relatorios_livros"])
+def test_paginas_referenciam_estaticos_com_hash(servidor, rota):
+    corpo = _get(servidor, rota)[1].decode("utf-8")
+    assert "googleapis" not in corpo and "cdnjs" not in corpo
+    urls = re.findall(r'href="(/static/[^"]+)"', corpo)
+    assert estaticos.url("icones.css") in urls
+    assert all(re.fullmatch(r"/static/[\w-]+\.[0-9a-f]{12}\.css", url) for url in urls)